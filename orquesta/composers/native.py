@@ -12,7 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 import logging
+import networkx as nx
 from six.moves import queue
 
 from orquesta.composers import base as comp_base
@@ -43,6 +45,7 @@ class WorkflowComposer(comp_base.WorkflowComposer):
 
         q = queue.Queue()
         wf_graph = graphing.WorkflowGraph()
+        split_tasks, cycle_tasks = cls._get_split_and_cycle_tasks(wf_spec)
 
         for task_name, condition, task_transition_item_idx in wf_spec.tasks.get_start_tasks():
             q.put((task_name, []))
@@ -59,12 +62,20 @@ class WorkflowComposer(comp_base.WorkflowComposer):
 
             # Determine if the task is a split task and if it is in a cycle. If the task is a
             # split task, keep track of where the split(s) occurs.
-            if wf_spec.tasks.is_split_task(task_name) and not wf_spec.tasks.in_cycle(task_name):
+            if task_name in split_tasks and task_name not in cycle_tasks:
                 splits.append(task_name)
 
             if splits:
                 wf_graph.update_task(task_name, splits=splits)
 
+            # Record whether the task is a split task and if it is in a cycle so the flags
+            # can be looked up from the graph without traversing the graph.
+            if task_name in split_tasks:
+                wf_graph.update_task(task_name, split=True)
+
+            if task_name in cycle_tasks:
+                wf_graph.update_task(task_name, cycle=True)
+
             # Update task attributes if task spec has retry criteria.
             task_spec = wf_spec.tasks.get_task(task_name)
 
@@ -86,9 +97,7 @@ class WorkflowComposer(comp_base.WorkflowComposer):
                     wf_graph.update_task(task_name, retry=retry_spec)
                     continue
 
-                if not wf_graph.has_task(next_task_name) or not wf_spec.tasks.in_cycle(
-                    next_task_name
-                ):
+                if not wf_graph.has_task(next_task_name) or next_task_name not in cycle_tasks:
                     q.put((next_task_name, list(splits)))
 
                 crta = [condition] if condition else []
@@ -112,3 +121,35 @@ class WorkflowComposer(comp_base.WorkflowComposer):
                     )
 
         return wf_graph
+
+    @classmethod
+    def _get_split_and_cycle_tasks(cls, wf_spec):
+        # Identify the split tasks and the tasks in cycles from the task transitions at once.
+        # A task is a split task if it is not a join task and it is referenced by more than
+        # one task transition. A task is in a cycle if the strongly connected component of the
+        # task has more than one task or if the task transitions to itself.
+        g = nx.DiGraph()
+        inbound_counts = collections.Counter()
+
+        for task_name in wf_spec.tasks.keys():
+            g.add_node(task_name)
+
+            for next_task in wf_spec.tasks.get_next_tasks(task_name):
+                g.add_edge(task_name, next_task[0])
+                inbound_counts[next_task[0]] += 1
+
+        split_tasks = set(
+            task_name
+            for task_name, count in inbound_counts.items()
+            if count > 1
+            and wf_spec.tasks.has_task(task_name)
+            and not wf_spec.tasks.is_join_task(task_name)
+        )
+
+        cycle_tasks = set(t for t in g.nodes() if g.has_edge(t, t))
+
+        for component in nx.strongly_connected_components(g):
+            if len(component) > 1:
+                cycle_tasks.update(component)
+
+        return split_tasks, cycle_tasks
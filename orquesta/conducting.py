@@ -13,17 +13,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import bisect
+import collections
+import functools
+import hashlib
 import logging
 import six
+import threading
+import ujson
 
 from six.moves import queue
 
 from orquesta import constants
+from orquesta import encoding
 from orquesta import events
 from orquesta import exceptions as exc
 from orquesta.expressions import base as expr_base
 from orquesta import graphing
 from orquesta import machines
+from orquesta import planning
+from orquesta import results as results_util
 from orquesta.specs import base as spec_base
 from orquesta.specs import loader as spec_loader
 from orquesta import statuses
@@ -36,45 +45,725 @@ from orquesta.utils import plugin as plugin_util
 LOG = logging.getLogger(__name__)
 
 
+def synchronized(func):
+    # Run the conductor method while holding the conductor lock if thread-safe mode is enabled.
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not self._lock:
+            return func(self, *args, **kwargs)
+
+        with self._lock:
+            return func(self, *args, **kwargs)
+
+    return wrapper
+
+
+class TaskItemsTracker(object):
+    # Tracks the execution status of the items of a with items task. The number of items in
+    # each status and the sorted list of items that are not run yet are kept up to date as the
+    # item statuses change so the items don't need to be scanned to assess the task status.
+
+    def __init__(self, items):
+        self.items = items
+        self.counts = collections.Counter()
+        self.notrun = []
+
+        for item_id, item in enumerate(items):
+            status = item.get("status", statuses.UNSET)
+            self.counts[status] += 1
+
+            if status == statuses.UNSET:
+                self.notrun.append(item_id)
+
+    def get_status(self, item_id):
+        return self.items[item_id].get("status", statuses.UNSET)
+
+    def set_status(self, item_id, status):
+        old_status = self.get_status(item_id)
+        self.items[item_id] = {"status": status}
+        self.counts[old_status] -= 1
+        self.counts[status] += 1
+
+        if old_status == statuses.UNSET and status != statuses.UNSET:
+            self.notrun.pop(bisect.bisect_left(self.notrun, item_id))
+        elif old_status != statuses.UNSET and status == statuses.UNSET:
+            bisect.insort(self.notrun, item_id)
+
+    def count(self, item_statuses, exclude=None):
+        # Count the items in the given statuses. The item to exclude is usually the item
+        # under evaluation which is not counted toward the status of the other items.
+        total = sum(self.counts[status] for status in item_statuses)
+
+        if exclude is not None and self.get_status(exclude) in item_statuses:
+            total -= 1
+
+        return total
+
+    def get_notrun_items(self, limit=None, end=None):
+        notrun = self.notrun
+
+        if end is not None:
+            notrun = notrun[: bisect.bisect_left(notrun, end)]
+
+        return notrun[:limit] if limit is not None else list(notrun)
+
+    @staticmethod
+    def encode(items):
+        # Encode the list of items as runs of the same status. The items of a task usually
+        # complete in order so the statuses of thousands of items are encoded in a few runs.
+        runs = []
+
+        for item in items:
+            status = item.get("status", statuses.UNSET)
+
+            if runs and runs[-1][0] == status:
+                runs[-1][1] += 1
+            else:
+                runs.append([status, 1])
+
+        return {"runs": runs}
+
+    @staticmethod
+    def decode(encoded):
+        items = []
+
+        for status, length in encoded["runs"]:
+            items.extend({"status": status} for _ in range(0, length))
+
+        return items
+
+
+class RouteTrie(object):
+    # The routes are stored as a trie where each route refers to the parent route it splits
+    # from and the task transition where the split occurs. A new route is added in constant
+    # time and the ancestors of a route are walked in the order of the depth of the route. The
+    # list of task transitions of a route is built from the ancestors when the route is read
+    # so the routes are still read and serialized as the list of lists of task transitions.
+
+    def __init__(self, routes=None):
+        self._parents = []
+        self._tails = []
+        self._children = {}
+
+        for route_details in routes or []:
+            self.append(route_details)
+
+    def __len__(self):
+        return len(self._parents)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(0, len(self))[idx]]
+
+        if idx < 0:
+            idx += len(self)
+
+        tails = []
+
+        while idx is not None:
+            tails.append(self._tails[idx])
+            idx = self._parents[idx]
+
+        return [t for tail in reversed(tails) for t in tail]
+
+    def __setitem__(self, idx, route_details):
+        parent, tail = self._locate(route_details)
+        self._parents[idx] = parent
+        self._tails[idx] = tail
+
+    def __iter__(self):
+        for idx in range(0, len(self)):
+            yield self[idx]
+
+    def __eq__(self, other):
+        return self.serialize() == (other.serialize() if isinstance(other, RouteTrie) else other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.serialize())
+
+    def _locate(self, route_details):
+        # Identify the parent route where the last task transition in the route is split
+        # from. If there is no such parent route, the route is stored with all the task
+        # transitions as is.
+        if not route_details or not self._parents or self._tails[0]:
+            return None, tuple(route_details)
+
+        parent = 0
+
+        for transition_id in route_details[:-1]:
+            parent = self._children.get((parent, transition_id))
+
+            if parent is None:
+                return None, tuple(route_details)
+
+        return parent, (route_details[-1],)
+
+    def _add(self, parent, tail):
+        idx = len(self._parents)
+        self._parents.append(parent)
+        self._tails.append(tail)
+
+        if parent is not None and len(tail) == 1:
+            self._children.setdefault((parent, tail[0]), idx)
+
+        return idx
+
+    def append(self, route_details):
+        return self._add(*self._locate(route_details))
+
+    def split(self, parent, transition_id):
+        # Add a new route that splits from the parent route at the task transition.
+        return self._add(parent, (transition_id,))
+
+    def get_ancestors(self, idx):
+        # Returns the routes where the route is split from starting from the nearest one.
+        ancestors = []
+        parent = self._parents[idx]
+
+        while parent is not None:
+            ancestors.append(parent)
+            parent = self._parents[parent]
+
+        return ancestors
+
+    def has_transition(self, idx, transition_id):
+        while idx is not None:
+            if transition_id in self._tails[idx]:
+                return True
+
+            idx = self._parents[idx]
+
+        return False
+
+    def serialize(self):
+        return [self[idx] for idx in range(0, len(self))]
+
+    def copy(self):
+        # The routes are copied by reference to the parent and tail of each route so the copy
+        # takes linear time of the number of routes without building the task transitions.
+        instance = RouteTrie()
+        instance._parents = list(self._parents)
+        instance._tails = list(self._tails)
+        instance._children = dict(self._children)
+
+        return instance
+
+
 class WorkflowState(object):
+    # The maximum number of merged contexts to keep in the cache.
+    CONTEXT_CACHE_SIZE = 256
+
     def __init__(self, conductor=None):
         self.conductor = conductor
         self.contexts = list()
-        self.routes = list()
-        self.sequence = list()
+        self.routes = RouteTrie()
+        self._sequence = list()
+        self._tasks = dict()
+        self._status = statuses.UNSET
         self.staged = list()
-        self.status = statuses.UNSET
-        self.tasks = dict()
         self.reruns = list()
+        self._outbound_transitions = dict()
+        self._inbound_task_counts = dict()
+        self._index_tasks()
+        self.reset_changes()
+
+    def serialize(self, compact_items=False, copy=True, dedup_size=None):
+        # If copy is disabled, the sections share the live structures of the workflow state.
+        # The serialized state is read only and is valid until the workflow state is changed.
+        # If dedup size is set, the large values of the contexts are stored once in the blobs.
+        copier = json_util.deepcopy if copy else lambda x: x
 
-    def serialize(self):
         data = {
-            "contexts": json_util.deepcopy(self.contexts),
-            "routes": json_util.deepcopy(self.routes),
-            "sequence": json_util.deepcopy(self.sequence),
-            "staged": json_util.deepcopy(self.staged),
+            "contexts": copier(self.contexts),
+            "routes": self.routes.serialize(),
+            "sequence": copier(self.sequence),
+            "staged": [self._serialize_staged_task(e, compact_items, copy) for e in self.staged],
             "status": self.status,
-            "tasks": json_util.deepcopy(self.tasks),
+            "tasks": copier(self.tasks),
         }
 
         if self.reruns:
-            data["reruns"] = json_util.deepcopy(self.reruns)
+            data["reruns"] = copier(self.reruns)
+
+        if dedup_size is not None:
+            contexts, refs, blobs = self._dedup_contexts(data["contexts"], dedup_size)
+
+            if refs:
+                data["contexts"] = contexts
+                data["context_refs"] = refs
+                data["blobs"] = blobs
 
         return data
 
+    def snapshot(self):
+        # Copy the parts of the workflow state that are read by the expression functions which
+        # are the task state pointers, the status of the task state entries, and the routes.
+        # The copy takes linear time of the number of task state entries and routes and does
+        # not copy the contexts so it is cheap enough to take while holding the lock.
+        return {
+            "routes": self.routes.copy(),
+            "sequence": [{"status": e.get("status")} for e in self.sequence],
+            "status": self.status,
+            "tasks": dict(self.tasks),
+        }
+
+    @staticmethod
+    def _dedup_contexts(contexts, dedup_size):
+        # The values of the contexts that are at least the dedup size in bytes when encoded are
+        # stored once in the blobs by the sha1 of the encoded value. The value in the context is
+        # replaced with the hash and the refs record the context index and key of the value.
+        # The context entries with replaced values are copied so the contexts are not changed.
+        # The hash is memoized by object id since the same value is often carried as is into
+        # many context entries.
+        blobs = {}
+        digests = {}
+        refs = []
+        result = []
+
+        for idx, ctx in enumerate(contexts):
+            entry = ctx
+
+            for key, value in sorted(six.iteritems(ctx)) if isinstance(ctx, dict) else []:
+                if not isinstance(value, (dict, list, six.string_types)):
+                    continue
+
+                if id(value) not in digests:
+                    encoded = ujson.dumps(value, sort_keys=True)  # pylint: disable=no-member
+                    large = len(encoded) >= dedup_size
+                    digest = hashlib.sha1(encoded.encode("utf-8")).hexdigest() if large else None
+                    digests[id(value)] = digest
+
+                digest = digests[id(value)]
+
+                if digest is None:
+                    continue
+
+                if entry is ctx:
+                    entry = dict(ctx)
+
+                blobs.setdefault(digest, value)
+                entry[key] = digest
+                refs.append([idx, key, digest])
+
+            result.append(entry)
+
+        return result, refs, blobs
+
+    def _serialize_staged_task(self, entry, compact_items=False, copy=True):
+        if compact_items and entry.get("items"):
+            # The items are encoded in the compact form instead of the list of items.
+            entry = dict(entry)
+            entry["items"] = TaskItemsTracker.encode(entry["items"])
+
+        return json_util.deepcopy(entry) if copy else entry
+
     @classmethod
-    def deserialize(cls, data):
+    def deserialize(cls, data, copy=True):
+        # If copy is disabled, the data is owned by the workflow state afterwards such as the
+        # data that is just decoded and the caller must not modify the data.
+        copier = json_util.deepcopy if copy else lambda x: x
+
         instance = cls()
-        instance.contexts = json_util.deepcopy(data.get("contexts", list()))
-        instance.routes = json_util.deepcopy(data.get("routes", list()))
-        instance.sequence = json_util.deepcopy(data.get("sequence", list()))
-        instance.staged = json_util.deepcopy(data.get("staged", list()))
+        instance.contexts = copier(data.get("contexts", list()))
+        instance.routes = RouteTrie(data.get("routes", list()))
+        instance.sequence = copier(data.get("sequence", list()))
+        instance.staged = copier(data.get("staged", list()))
         instance.status = data.get("status", statuses.UNSET)
-        instance.tasks = json_util.deepcopy(data.get("tasks", dict()))
-        instance.reruns = json_util.deepcopy(data.get("reruns", list()))
+        instance.tasks = copier(data.get("tasks", dict()))
+        instance.reruns = copier(data.get("reruns", list()))
+
+        # Rehydrate the values of the contexts that are stored once in the blobs. The value is
+        # shared by the context entries like the merged contexts share the values of the entries.
+        blobs = copier(data.get("blobs", dict()))
+
+        for idx, key, digest in data.get("context_refs", list()):
+            instance.contexts[idx][key] = blobs[digest]
+
+        instance.reset_changes()
 
         return instance
 
+    def reset_changes(self):
+        # The change tracker records the latest version at which each part of the workflow
+        # state is changed. The changes are ordered by version so the changes since a given
+        # version can be identified without going through the entire workflow state.
+        self.version = 0
+        self._changes = collections.OrderedDict()
+        self._tracking = True
+
+    def track_change(self, section, key=None):
+        if not self._tracking:
+            return
+
+        self.version += 1
+        self._changes.pop((section, key), None)
+        self._changes[(section, key)] = self.version
+
+    def get_changes(self, since=0):
+        changes = []
+
+        for change, version in reversed(self._changes.items()):
+            if version <= since:
+                break
+
+            changes.append(change)
+
+        return list(reversed(changes))
+
+    def serialize_delta(self, since=0, compact_items=False):
+        delta = {"version": self.version}
+
+        for section, key in self.get_changes(since=since):
+            if section in ["contexts", "routes", "reruns"]:
+                value = getattr(self, section)[key]
+                delta.setdefault(section, []).append([key, json_util.deepcopy(value)])
+            elif section == "sequence":
+                value = self.sequence[key]
+                delta.setdefault(section, []).append([key, json_util.deepcopy(value)])
+            elif section == "staged":
+                value = self.get_staged_task(*key)
+                value = self._serialize_staged_task(value, compact_items) if value else None
+                delta.setdefault(section, []).append([key[0], key[1], value])
+            elif section == "tasks":
+                delta.setdefault(section, {})[key] = self.tasks[key]
+            elif section == "status":
+                delta[section] = self.status
+
+        return delta
+
+    def _apply_delta_entries(self, entries, target):
+        for idx, value in sorted(entries, key=lambda x: x[0]):
+            if idx < len(target):
+                target[idx] = value
+            elif idx == len(target):
+                target.append(value)
+            else:
+                raise ValueError("The delta is not contiguous with the workflow state.")
+
+    def apply_delta(self, delta):
+        delta = json_util.deepcopy(delta)
+
+        # The changes applied from the delta are not tracked again since they are
+        # already recorded by the workflow state that produced the delta.
+        self._tracking = False
+
+        try:
+            # The cached merged contexts are only invalid if existing context entries are
+            # replaced since the context entries are otherwise not changed once added.
+            if any(idx < len(self.contexts) for idx, _ in delta.get("contexts", [])):
+                self._context_cache = collections.OrderedDict()
+
+            self._apply_delta_entries(delta.get("contexts", []), self.contexts)
+            self._apply_delta_entries(delta.get("routes", []), self.routes)
+            self._apply_delta_entries(delta.get("reruns", []), self.reruns)
+
+            # Update the task state entries and the pointers to the last occurrences
+            # before the indices are updated for the entries that changed.
+            seq_idxs = []
+
+            for idx, task_state_entry in sorted(delta.get("sequence", []), key=lambda x: x[0]):
+                if idx < len(self._sequence):
+                    self._sequence[idx] = task_state_entry
+                elif idx == len(self._sequence):
+                    self._sequence.append(task_state_entry)
+                    self._task_ids.setdefault(task_state_entry["id"], []).append(idx)
+                    self._index_task_successor(idx)
+                else:
+                    raise ValueError("The delta is not contiguous with the workflow state.")
+
+                seq_idxs.append(idx)
+
+            for task_state_entry_id, idx in six.iteritems(delta.get("tasks", {})):
+                prev_idx = self._tasks.get(task_state_entry_id)
+
+                if prev_idx is not None:
+                    self._unindex_task_status(prev_idx)
+
+                self._tasks[task_state_entry_id] = idx
+
+            for idx in seq_idxs:
+                self.reindex_task(idx)
+
+            # Rebuild the inbound trackers on next use since the task pointers may have moved.
+            self._inbounds = None
+
+            for task_id, route, staged_task in delta.get("staged", []):
+                if staged_task:
+                    self._put_staged_task(staged_task)
+                else:
+                    self._drop_staged_task(task_id, route)
+
+            if "status" in delta:
+                self.status = delta["status"]
+        finally:
+            self._tracking = True
+
+        self.version = max(self.version, delta["version"])
+
+    @property
+    def contexts(self):
+        return self._contexts
+
+    @contexts.setter
+    def contexts(self, value):
+        self._contexts = value
+        self._context_cache = collections.OrderedDict()
+
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, value):
+        self._status = value
+        self.track_change("status")
+
+    @property
+    def sequence(self):
+        return self._sequence
+
+    @sequence.setter
+    def sequence(self, value):
+        self._sequence = value
+        self._index_tasks()
+
+    @property
+    def tasks(self):
+        return self._tasks
+
+    @tasks.setter
+    def tasks(self, value):
+        self._tasks = value
+        self._index_tasks()
+
+    def _index_tasks(self):
+        # The task state entries in the sequence are indexed by task id for all occurrences
+        # and by status for the last occurrence of each task id and route. The list of task
+        # state entries flagged as terminal is also indexed. The successors of each task id
+        # and route are indexed from the backrefs in the prev of the task state entries.
+        self._task_ids = dict()
+        self._task_status = dict()
+        self._status_index = dict()
+        self._successors = dict()
+        self._terminal = set()
+
+        # The inbound trackers are built on first use since the workflow graph is required.
+        self._inbounds = None
+
+        for i, t in enumerate(self._sequence):
+            self._task_ids.setdefault(t["id"], []).append(i)
+            self._index_task_successor(i)
+
+            if t.get("term", False):
+                self._terminal.add(i)
+
+        for i in set(self._tasks.values()):
+            if i < len(self._sequence):
+                self._index_task_status(i)
+
+    def _is_last_occurrence(self, idx):
+        t = self._sequence[idx]
+        task_state_entry_id = constants.TASK_STATE_ROUTE_FORMAT % (t["id"], str(t["route"]))
+
+        return self._tasks.get(task_state_entry_id) == idx
+
+    def _unindex_task_status(self, idx):
+        old_status = self._task_status.pop(idx, None)
+
+        if old_status is not None:
+            self._status_index[old_status].discard(idx)
+
+    def _index_task_status(self, idx):
+        self._unindex_task_status(idx)
+
+        new_status = self._sequence[idx].get("status")
+
+        if new_status is not None:
+            self._task_status[idx] = new_status
+            self._status_index.setdefault(new_status, set()).add(idx)
+
+    def _index_task_successor(self, idx):
+        for prev_idx in six.itervalues(self._sequence[idx].get("prev") or {}):
+            p = self._sequence[prev_idx]
+            self._successors.setdefault((p["id"], p["route"]), []).append(idx)
+
+    def add_task(self, task_state_entry):
+        task_state_entry_id = constants.TASK_STATE_ROUTE_FORMAT % (
+            task_state_entry["id"],
+            str(task_state_entry["route"]),
+        )
+
+        # Only the last occurrence of the task id and route is indexed by status.
+        prev_idx = self._tasks.get(task_state_entry_id)
+
+        if prev_idx is not None:
+            self._unindex_task_status(prev_idx)
+
+        self._sequence.append(task_state_entry)
+        idx = len(self._sequence) - 1
+        self._tasks[task_state_entry_id] = idx
+        self._task_ids.setdefault(task_state_entry["id"], []).append(idx)
+        self._index_task_successor(idx)
+        self.reindex_task(idx)
+        self.track_change("tasks", task_state_entry_id)
+
+        return idx
+
+    def reindex_task(self, idx):
+        # Update the indices after the status or the terminal flag of the
+        # task state entry is changed in place.
+        if self._sequence[idx].get("term", False):
+            self._terminal.add(idx)
+        else:
+            self._terminal.discard(idx)
+
+        if self._is_last_occurrence(idx):
+            self._index_task_status(idx)
+
+            if self._inbounds is not None:
+                self._index_task_inbound(idx)
+
+        self.track_change("sequence", idx)
+
+    def _get_outbound_transitions(self, task_id):
+        # Identify the outbound task transitions of the task grouped by the next task.
+        if task_id not in self._outbound_transitions:
+            outbound_transitions = dict()
+
+            for t in self.conductor.plan.get_next_transitions(task_id):
+                task_transition_id = constants.TASK_STATE_TRANSITION_FORMAT % (t[1], str(t[2]))
+                outbound_transitions.setdefault(t[1], []).append(task_transition_id)
+
+            self._outbound_transitions[task_id] = outbound_transitions
+
+        return self._outbound_transitions[task_id]
+
+    def _index_task_inbound(self, idx):
+        # Update the inbound trackers of the tasks that are next to the task. The task state
+        # entry is the last occurrence of the task id and route so the evaluation of the task
+        # transitions replaces any evaluation from the previous occurrences.
+        t = self._sequence[idx]
+
+        for next_task_id, task_transition_ids in six.iteritems(
+            self._get_outbound_transitions(t["id"])
+        ):
+            inbound = self._inbounds.setdefault(
+                (next_task_id, t["route"]), {"tasks": {}, "satisfied": 0}
+            )
+
+            old_value = inbound["tasks"].get(t["id"], False)
+            new_value = any(t.get("next", {}).get(i) for i in task_transition_ids)
+            inbound["tasks"][t["id"]] = new_value
+            inbound["satisfied"] += int(new_value) - int(old_value)
+
+    def get_inbound_task_count(self, task_id):
+        if task_id not in self._inbound_task_counts:
+            self._inbound_task_counts[task_id] = self.conductor.plan.get_inbound_task_count(task_id)
+
+        return self._inbound_task_counts[task_id]
+
+    def get_inbound_evaluation(self, task_id, route):
+        # The inbound tracker records the evaluation of the inbound task transitions of each
+        # task and route and the number of the inbound tasks where the criteria is met. The
+        # trackers are rebuilt from the last occurrences of the task state entries.
+        if self._inbounds is None:
+            self._inbounds = dict()
+
+            for i in sorted(set(self._tasks.values())):
+                if i < len(self._sequence):
+                    self._index_task_inbound(i)
+
+        return self._inbounds.get((task_id, route), {"tasks": {}, "satisfied": 0})
+
+    def add_context(self, ctx):
+        self.contexts.append(ctx)
+        idx = len(self.contexts) - 1
+        self.track_change("contexts", idx)
+
+        return idx
+
+    def _cache_context(self, key, ctx):
+        self._context_cache.pop(key, None)
+        self._context_cache[key] = ctx
+
+        while len(self._context_cache) > self.CONTEXT_CACHE_SIZE:
+            self._context_cache.popitem(last=False)
+
+    def get_context(self, ctx_idxs):
+        # The merged contexts are cached by the tuple of context indices. Only the merged
+        # context of the full tuple is cached. If it is not cached, the merged context of the
+        # tuple without the last index is reused if cached since the task contexts are mostly
+        # extended by one context entry for each task transition. The merged contexts share
+        # the values that are not changed by the merge with the context entries so the result
+        # must not be modified in place.
+        key = tuple(ctx_idxs)
+
+        if key in self._context_cache:
+            ctx = self._context_cache[key]
+            self._cache_context(key, ctx)
+
+            return ctx
+
+        parent = key[:-1]
+        i = len(parent) if parent and parent in self._context_cache else 0
+        ctx = dict(self._context_cache[parent]) if i > 0 else {}
+        owned = {}
+
+        for j in range(i, len(key)):
+            self._merge_context(ctx, self.contexts[key[j]], owned)
+
+        self._cache_context(key, ctx)
+
+        return ctx
+
+    @classmethod
+    def _merge_context(cls, ctx, entry, owned):
+        # Merge the context entry into the new merged context in place. The nested dicts that
+        # are shared with the context entries are copied once on the first merge into them and
+        # the copies owned by the merged context are tracked by id so the merge of many context
+        # entries costs the size of the entries rather than the size of the merged context.
+        for k, v in six.iteritems(entry):
+            left_v = ctx.get(k)
+
+            if k in ctx and isinstance(left_v, dict) and isinstance(v, dict):
+                if id(left_v) not in owned:
+                    left_v = dict(left_v)
+                    owned[id(left_v)] = left_v
+                    ctx[k] = left_v
+
+                cls._merge_context(left_v, v, owned)
+            else:
+                ctx[k] = v
+
+    @property
+    def routes(self):
+        return self._routes
+
+    @routes.setter
+    def routes(self, value):
+        self._routes = value if isinstance(value, RouteTrie) else RouteTrie(value)
+
+    def add_route(self, route_details):
+        idx = self.routes.append(route_details)
+        self.track_change("routes", idx)
+
+        return idx
+
+    def split_route(self, route, transition_id):
+        idx = self.routes.split(route, transition_id)
+        self.track_change("routes", idx)
+
+        return idx
+
+    def add_rerun(self, rerun_entry):
+        self.reruns.append(rerun_entry)
+        self.track_change("reruns", len(self.reruns) - 1)
+
     def has_task(self, task_id, route):
         return constants.TASK_STATE_ROUTE_FORMAT % (task_id, str(route)) in self.tasks
 
@@ -82,54 +771,72 @@ class WorkflowState(object):
         return self.sequence[self.tasks[constants.TASK_STATE_ROUTE_FORMAT % (task_id, str(route))]]
 
     def get_tasks(self, task_id=None, route=None, last_occurrence=True):
-        if task_id and route is None:
-            result = [(i, t) for i, t in enumerate(self.sequence) if t["id"] == task_id]
-        elif task_id and route is not None:
-            result = [
-                (i, t)
-                for i, t in enumerate(self.sequence)
-                if t["id"] == task_id and t["route"] == route
-            ]
+        if task_id:
+            idxs = self._task_ids.get(task_id, [])
+            result = [(i, self.sequence[i]) for i in idxs]
+
+            if route is not None:
+                result = [s for s in result if s[1]["route"] == route]
+
+            if last_occurrence:
+                result = [s for s in result if self._is_last_occurrence(s[0])]
+        elif last_occurrence:
+            result = [(i, self.sequence[i]) for i in sorted(set(self.tasks.values()))]
         else:
             result = list(enumerate(self.sequence))
 
-        if last_occurrence:
-            result = [s for s in result if s[0] in self.tasks.values()]
-
         return result
 
     def get_tasks_by_status(self, statuses, last_occurrence=True):
-        result = [
-            (i, t) for i, t in enumerate(self.sequence) if "status" in t and t["status"] in statuses
-        ]
+        if isinstance(statuses, six.string_types):
+            statuses = [statuses]
 
-        if last_occurrence:
-            result = [s for s in result if s[0] in self.tasks.values()]
+        if not last_occurrence:
+            return [
+                (i, t)
+                for i, t in enumerate(self.sequence)
+                if "status" in t and t["status"] in statuses
+            ]
 
-        return result
+        idxs = set()
+
+        for status in set(statuses):
+            idxs.update(self._status_index.get(status, set()))
+
+        return [(i, self.sequence[i]) for i in sorted(idxs)]
+
+    def _count_tasks_by_status(self, statuses):
+        return sum(len(self._status_index.get(status, set())) for status in set(statuses))
 
     def get_task_sequence(self, task_id, route):
         idx = self.tasks[constants.TASK_STATE_ROUTE_FORMAT % (task_id, str(route))]
         seq = [(idx, self.sequence[idx])]
 
+        # Traverse the successor index breadth first to identify the subsequent task state
+        # entries. Each task id and route is visited once so the traversal is linear.
+        visited = set([(task_id, route)])
+        descendants = set([idx])
         q = queue.Queue()
         q.put((task_id, route))
 
         while not q.empty():
-            task_id, route = q.get()
+            for i in self._successors.get(q.get(), []):
+                if i in descendants:
+                    continue
+
+                descendants.add(i)
+                seq.append((i, self.sequence[i]))
 
-            for i, t in enumerate(self.sequence):
-                for k, v in six.iteritems(t["prev"]):
-                    p = self.sequence[v]
-                    if p["id"] == task_id and p["route"] == route:
-                        seq.append((i, t))
-                        if (i, t) not in seq:
-                            q.put((t["id"], t["route"]))
+                t = self.sequence[i]
+
+                if (t["id"], t["route"]) not in visited:
+                    visited.add((t["id"], t["route"]))
+                    q.put((t["id"], t["route"]))
 
         return seq
 
     def get_terminal_tasks(self):
-        return [(i, t) for i, t in enumerate(self.sequence) if t.get("term", False)]
+        return [(i, self.sequence[i]) for i in sorted(self._terminal)]
 
     def has_barrier_next(self, task_id, route=None):
         return self.conductor.has_barrier_next(task_id, route=route)
@@ -139,29 +846,29 @@ class WorkflowState(object):
 
     @property
     def has_active_tasks(self):
-        return len(self.get_tasks_by_status(statuses.ACTIVE_STATUSES)) > 0
+        return self._count_tasks_by_status(statuses.ACTIVE_STATUSES) > 0
 
     @property
     def has_pausing_tasks(self):
-        return len(self.get_tasks_by_status([statuses.PAUSING])) > 0
+        return self._count_tasks_by_status([statuses.PAUSING]) > 0
 
     @property
     def has_paused_tasks(self):
-        return len(self.get_tasks_by_status([statuses.PAUSED, statuses.PENDING])) > 0
+        return self._count_tasks_by_status([statuses.PAUSED, statuses.PENDING]) > 0
 
     @property
     def has_canceling_tasks(self):
-        return len(self.get_tasks_by_status([statuses.CANCELING])) > 0
+        return self._count_tasks_by_status([statuses.CANCELING]) > 0
 
     @property
     def has_canceled_tasks(self):
-        return len(self.get_tasks_by_status([statuses.CANCELED])) > 0
+        return self._count_tasks_by_status([statuses.CANCELED]) > 0
 
     def get_unreachable_barriers(self):
         unreachable_barriers = []
 
         # Identify the list of barriers (or join tasks) in the workflow.
-        barriers = self.conductor.graph.get_barriers()
+        barriers = self.conductor.plan.get_barriers()
 
         # Evaluate each task that is already staged.
         for staged_task in self.get_staged_tasks(filtered=False):
@@ -180,15 +887,71 @@ class WorkflowState(object):
 
         return unreachable_barriers
 
+    @property
+    def staged(self):
+        return list(self._staged.values())
+
+    @staged.setter
+    def staged(self, value):
+        # The staged tasks are indexed by task id and route. The index of the staged tasks
+        # that are ready is kept separately with the staging order so the tasks that are
+        # ready can be returned in the same order as the list of staged tasks.
+        self._staged = collections.OrderedDict()
+        self._staged_order = dict()
+        self._staged_ready = dict()
+        self._staged_items = dict()
+        self._staged_count = 0
+
+        for entry in value or []:
+            self._put_staged_task(entry)
+
+    def _put_staged_task(self, entry):
+        key = (entry["id"], entry["route"])
+
+        # Decode the items if the staged task is serialized with the compact form of items.
+        if isinstance(entry.get("items"), dict):
+            entry["items"] = TaskItemsTracker.decode(entry["items"])
+
+        if key not in self._staged_order:
+            self._staged_order[key] = self._staged_count
+            self._staged_count += 1
+
+        self._staged[key] = entry
+        self._index_staged_task(key)
+
+    def _index_staged_task(self, key):
+        entry = self._staged.get(key)
+
+        if entry and entry["ready"] and not entry.get("completed", False):
+            self._staged_ready[key] = self._staged_order[key]
+        else:
+            self._staged_ready.pop(key, None)
+
+        self.track_change("staged", key)
+
+    def _drop_staged_task(self, task_id, route):
+        key = (task_id, route)
+
+        if key not in self._staged:
+            return
+
+        del self._staged[key]
+        del self._staged_order[key]
+        self._staged_ready.pop(key, None)
+        self._staged_items.pop(key, None)
+        self.track_change("staged", key)
+
     def get_staged_tasks(self, filtered=True):
         if not filtered:
             return self.staged
 
-        return [x for x in self.staged if x["ready"] and not x.get("completed", False)]
+        keys = sorted(self._staged_ready, key=lambda k: self._staged_ready[k])
+
+        return [self._staged[k] for k in keys]
 
     @property
     def has_staged_tasks(self):
-        return len(self.get_staged_tasks()) > 0
+        return len(self._staged_ready) > 0
 
     def add_staged_task(self, task_id, route, ctxs=None, prev=None, ready=True, retry=False):
         if not ctxs:
@@ -205,34 +968,192 @@ class WorkflowState(object):
         if retry:
             entry["retry"] = retry
 
-        self.staged.append(entry)
+        self._put_staged_task(entry)
 
         return entry
 
     def get_staged_task(self, task_id, route):
-        staged_tasks = [x for x in self.staged if x["id"] == task_id and x["route"] == route]
+        return self._staged.get((task_id, route))
+
+    def reindex_staged_task(self, task_id, route):
+        # Update the indices after the staged task is changed in place. The items tracker
+        # is rebuilt on next use since the items may have been changed as well.
+        self._staged_items.pop((task_id, route), None)
+        self._index_staged_task((task_id, route))
+
+    def get_staged_task_items(self, task_id, route):
+        key = (task_id, route)
+        entry = self._staged.get(key)
+
+        if not entry or "items" not in entry:
+            return None
+
+        # The tracker is rebuilt if the list of items is replaced in the staged task.
+        tracker = self._staged_items.get(key)
+
+        if not tracker or tracker.items is not entry["items"]:
+            tracker = TaskItemsTracker(entry["items"])
+            self._staged_items[key] = tracker
+
+        return tracker
 
-        return staged_tasks[0] if staged_tasks else None
+    def set_staged_task_item_status(self, task_id, route, item_id, status):
+        self.get_staged_task_items(task_id, route).set_status(item_id, status)
+        self.track_change("staged", (task_id, route))
+
+    def set_staged_task_ready(self, task_id, route, ready=True):
+        key = (task_id, route)
+        self._staged[key]["ready"] = ready
+        self._index_staged_task(key)
+
+    def set_staged_task_completed(self, task_id, route, completed=True):
+        key = (task_id, route)
+
+        if completed:
+            self._staged[key]["completed"] = True
+        else:
+            self._staged[key].pop("completed", None)
+
+        self._index_staged_task(key)
 
     def remove_staged_task(self, task_id, route):
         staged_task = self.get_staged_task(task_id, route)
 
         if staged_task:
-            any_items_running = [
-                item
-                for item in staged_task.get("items", [])
-                if item["status"] in statuses.ACTIVE_STATUSES
-            ]
+            items = self.get_staged_task_items(task_id, route)
+
+            if not items or not items.count(statuses.ACTIVE_STATUSES):
+                self._drop_staged_task(task_id, route)
+
+
+class WorkflowStateView(object):
+    # Read-only view of the workflow state that is passed to the expression functions under
+    # the __state key in the context. Lookups are served from the live workflow state and
+    # the data is only copied when the view is serialized, compared, or deep copied.
+    _keys = ["contexts", "routes", "sequence", "staged", "status", "tasks", "reruns"]
+
+    def __init__(self, workflow_state):
+        self._workflow_state = workflow_state
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+
+        return getattr(self._workflow_state, key)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __eq__(self, other):
+        if isinstance(other, WorkflowStateView):
+            other = other.serialize()
+
+        return self.serialize() == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self.serialize()
+
+    def __repr__(self):
+        return "<%s %s>" % (type(self).__name__, self._workflow_state.status)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def serialize(self):
+        return self._workflow_state.serialize()
+
+
+class WorkflowDefinitionCache(object):
+    # Process-wide cache of the spec, graph, and execution plan of the workflow definitions
+    # keyed by the hash of the serialized spec and graph. The conductors deserialized from the
+    # same definition share the spec, graph, and plan so the spec is not instantiated and the
+    # graph and plan are not rebuilt for each conductor. The shared spec, graph, and plan are
+    # read only and must not be modified.
+    # The least recently used definitions are removed when there are more than the max count.
+
+    def __init__(self, max_count=128):
+        if max_count is not None and max_count < 1:
+            raise ValueError('The value of "max_count" is not a positive integer.')
 
-            if not any_items_running:
-                self.staged.remove(staged_task)
+        self.max_count = max_count
+        self.metrics = {"hits": 0, "misses": 0}
+        self._definitions = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._definitions)
+
+    def __contains__(self, key):
+        return key in self._definitions
+
+    @staticmethod
+    def get_key(spec_data, graph_data):
+        data = ujson.dumps([spec_data, graph_data], sort_keys=True)  # pylint: disable=no-member
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    def get(self, spec_data, graph_data):
+        key = self.get_key(spec_data, graph_data)
+
+        with self._lock:
+            definition = self._definitions.pop(key, None)
+
+            if definition:
+                self.metrics["hits"] += 1
+                self._definitions[key] = definition
+                return definition
+
+            self.metrics["misses"] += 1
+
+        spec_module = spec_loader.get_spec_module(spec_data["catalog"])
+        spec = spec_module.WorkflowSpec.deserialize(json_util.deepcopy(spec_data))
+        graph = graphing.WorkflowGraph.deserialize(graph_data).freeze()
+        plan = planning.ExecutionPlan.compile(spec, graph)
+
+        with self._lock:
+            # Keep the definition cached by another thread in the meantime if any.
+            definition = self._definitions.pop(key, (spec, graph, plan))
+            self._definitions[key] = definition
+
+            while self.max_count is not None and len(self._definitions) > self.max_count:
+                self._definitions.popitem(last=False)
+
+        return definition
+
+    def clear(self):
+        with self._lock:
+            self._definitions.clear()
+
+
+DEFINITIONS = WorkflowDefinitionCache()
 
 
 class WorkflowConductor(object):
-    def __init__(self, spec, context=None, inputs=None):
+    def __init__(
+        self,
+        spec,
+        context=None,
+        inputs=None,
+        log_limits=None,
+        log_result_refs=False,
+        compact_items=False,
+        results_spill_size=None,
+        context_dedup_size=None,
+        thread_safe=False,
+    ):
         if not spec or not isinstance(spec, spec_base.Spec):
             raise ValueError('The value of "spec" is not type of Spec.')
 
+        if log_limits is not None and not isinstance(log_limits, dict):
+            raise ValueError('The value of "log_limits" is not type of dict.')
+
         self.spec = spec
         self.catalog = self.spec.get_catalog()
         self.spec_module = spec_loader.get_spec_module(self.catalog)
@@ -241,13 +1162,58 @@ class WorkflowConductor(object):
         self._errors = []
         self._graph = None
         self._inputs = inputs or {}
+        self._item_results = {}
         self._log = []
+        self._log_evicted = {}
+        self._log_index = None
+        self._log_queues = None
         self._outputs = None
         self._parent_ctx = context or {}
+        self._plan = None
+        self._task_items = {}
         self._workflow_state = None
-
+        self._workflow_state_ready = False
+
+        # The log limits is the maximum number of log entries to retain for each entry type.
+        # The oldest entries of the type are removed when the limit is exceeded. If result
+        # refs is enabled, the result of failed task items kept in the item result store is not
+        # copied into the error log and the error entry refers to the task item instead.
+        self.log_limits = log_limits or {}
+        self.log_result_refs = log_result_refs
+
+        # If compact items is enabled, the item statuses of the with items tasks in staging
+        # are serialized as runs of the same status instead of the list of items.
+        self.compact_items = compact_items
+
+        # If the item events don't include the accumulated result, the results of the items
+        # are appended to the item result store of the task. The results are spilled to a
+        # local file if the size of the results of the task exceeds the spill size in bytes.
+        self.results_spill_size = results_spill_size
+
+        # If context dedup size is set, the values of the workflow contexts that are at least
+        # the dedup size in bytes are stored once by content hash in the serialized conductor
+        # and the context entries refer to the values by hash.
+        self.context_dedup_size = context_dedup_size
+
+        # In thread-safe mode, the methods that access the workflow state are run under a
+        # reentrant lock. The task events from concurrent callers are queued and applied in a
+        # batch by the caller that holds the lock so the callers don't wait on each other to
+        # evaluate the workflow status for each event.
+        self.thread_safe = thread_safe
+        self._lock = threading.RLock() if thread_safe else None
+        self._pending_events = collections.deque()
+
+    @synchronized
     def restore(
-        self, graph, log=None, errors=None, state=None, inputs=None, outputs=None, context=None
+        self,
+        graph,
+        log=None,
+        errors=None,
+        state=None,
+        inputs=None,
+        outputs=None,
+        context=None,
+        item_results=None,
     ):
         if not graph or not isinstance(graph, graphing.WorkflowGraph):
             raise ValueError('The value of "graph" is not type of WorkflowGraph.')
@@ -264,43 +1230,221 @@ class WorkflowConductor(object):
         self._errors = errors or []
         self._graph = graph
         self._inputs = inputs or {}
+        self._item_results = item_results or {}
         self._log = log or []
+        self._log_evicted = {}
+        self._log_index = None
         self._outputs = outputs
         self._parent_ctx = context or {}
         self._workflow_state = state
+        self._workflow_state_ready = True
 
         # Assign a back reference of the conductor to the workflow state.
         # This back reference is needed to help the workflow state machine
         # identify if there are next tasks.
         self._workflow_state.conductor = self
 
-    def serialize(self):
-        return {
+    @synchronized
+    def serialize(self, codec=None, compress=False, copy=True):
+        # If a codec is given, the serialized conductor is encoded to bytes by the codec. The
+        # codec is either a codec instance or the name of the codec such as json or binary.
+        # The sections are not copied for the codec since the data is discarded once encoded.
+        # If copy is disabled, the serialized conductor shares the live structures of the
+        # conductor. It is read only and is valid until the conductor is changed, such as when
+        # the serialized conductor is encoded or written right away on checkpoint.
+        copy = copy and codec is None
+        copier = json_util.deepcopy if copy else lambda x: x
+
+        data = {
             "spec": self.spec.serialize(),
             "graph": self.graph.serialize(),
-            "input": self.get_workflow_input(),
-            "context": self.get_workflow_parent_context(),
-            "state": self.workflow_state.serialize(),
-            "log": json_util.deepcopy(self.log),
-            "errors": json_util.deepcopy(self.errors),
-            "output": self.get_workflow_output(),
+            "input": self.get_workflow_input(copy=copy),
+            "context": self.get_workflow_parent_context(copy=copy),
+            "state": self.workflow_state.serialize(
+                compact_items=self.compact_items, copy=copy, dedup_size=self.context_dedup_size
+            ),
+            "log": copier(self.log),
+            "errors": copier(self.errors),
+            "output": self.get_workflow_output(copy=copy),
         }
 
+        if self.log_limits:
+            data["log_limits"] = copier(self.log_limits)
+
+        if self.log_result_refs:
+            data["log_result_refs"] = self.log_result_refs
+
+        if self.compact_items:
+            data["compact_items"] = self.compact_items
+
+        if self.results_spill_size is not None:
+            data["results_spill_size"] = self.results_spill_size
+
+        if self.context_dedup_size is not None:
+            data["context_dedup_size"] = self.context_dedup_size
+
+        if self._item_results:
+            data["item_results"] = [
+                [task_id, route, copier(store.serialize())]
+                for (task_id, route), store in sorted(six.iteritems(self._item_results))
+            ]
+
+        if codec is not None:
+            return encoding.get_codec(codec, compress=compress).encode(data)
+
+        return data
+
+    @synchronized
+    def serialize_to(self, fp):
+        # Write the serialized conductor to the binary file object as JSON lines of section
+        # and value. The entries of the list sections such as the contexts, the task sequence,
+        # and the log are written one per line directly from the live conductor so the
+        # conductor is not copied and encoded as a whole.
+        def write(key, value):
+            fp.write(ujson.dumps([key, value]).encode("utf-8"))  # pylint: disable=no-member
+            fp.write(b"\n")
+
+        data = self.serialize(copy=False)
+        state = data.pop("state")
+        sections = [("state." + k, v) for k, v in sorted(six.iteritems(state))]
+
+        for key, value in sorted(six.iteritems(data)) + sections:
+            if not isinstance(value, list):
+                write(key, value)
+                continue
+
+            write(key, [])
+
+            for item in value:
+                write(key + "[]", item)
+
     @classmethod
-    def deserialize(cls, data):
-        spec_module = spec_loader.get_spec_module(data["spec"]["catalog"])
-        spec = spec_module.WorkflowSpec.deserialize(data["spec"])
+    def deserialize_from(cls, fp, thread_safe=False):
+        # Read the serialized conductor written by serialize_to. The lines are decoded one at
+        # a time and the decoded values are owned by the conductor without another copy.
+        data = {}
+
+        for line in fp:
+            if not line.strip():
+                continue
+
+            key, value = ujson.loads(line)  # pylint: disable=no-member
+            target = data
+
+            if "." in key:
+                section, key = key.split(".", 1)
+                target = data.setdefault(section, {})
+
+            if key.endswith("[]"):
+                target[key[:-2]].append(value)
+            else:
+                target[key] = value
+
+        return cls.deserialize(data, thread_safe=thread_safe, copy=False)
+
+    @synchronized
+    def serialize_delta(self, since=0):
+        changes = self.workflow_state.get_changes(since=since)
+
+        delta = {
+            "version": self.workflow_state.version,
+            "state": self.workflow_state.serialize_delta(
+                since=since, compact_items=self.compact_items
+            ),
+        }
+
+        # The entire log is included if entries are removed from the log since then.
+        if ("log", None) in changes:
+            changes = [c for c in changes if c[0] != "log"]
+            changes += [("log", i) for i in range(len(self.log))]
+
+        for section, key in changes:
+            if section == "log":
+                delta.setdefault(section, []).append([key, json_util.deepcopy(self.log[key])])
+            elif section == "errors":
+                delta[section] = json_util.deepcopy(self.errors)
+            elif section == "output":
+                delta[section] = self.get_workflow_output()
+            elif section == "item_results":
+                task_id, route, item_id = key
+                store = self._item_results.get((task_id, route))
+
+                if store and item_id in store:
+                    entry = [task_id, route, store.items_count, item_id, store.get(item_id)]
+                    delta.setdefault(section, []).append(json_util.deepcopy(entry))
+
+        return delta
+
+    @synchronized
+    def apply_delta(self, delta):
+        self.workflow_state.apply_delta(delta["state"])
+        self._compact_log()
+        self._log_index = None
+
+        for idx, entry in sorted(delta.get("log", []), key=lambda x: x[0]):
+            if idx < len(self._log):
+                self._log[idx] = json_util.deepcopy(entry)
+            elif idx == len(self._log):
+                self._log.append(json_util.deepcopy(entry))
+            else:
+                raise ValueError("The delta is not contiguous with the workflow log.")
+
+        if "errors" in delta:
+            self._errors = json_util.deepcopy(delta["errors"])
 
-        graph = graphing.WorkflowGraph.deserialize(data["graph"])
-        inputs = json_util.deepcopy(data["input"])
-        context = json_util.deepcopy(data["context"])
-        state = WorkflowState.deserialize(data["state"])
-        log = json_util.deepcopy(data.get("log", []))
-        errors = json_util.deepcopy(data["errors"])
-        outputs = json_util.deepcopy(data["output"])
+        if "output" in delta:
+            self._outputs = json_util.deepcopy(delta["output"])
 
-        instance = cls(spec)
-        instance.restore(graph, log, errors, state, inputs, outputs, context)
+        for task_id, route, items_count, item_id, result in delta.get("item_results", []):
+            store = self._get_item_results(task_id, route, items_count)
+            store.append(item_id, json_util.deepcopy(result))
+
+    def _track_change(self, section, key=None):
+        # Changes made before the workflow state is initialized are part of the initial state.
+        if self._workflow_state:
+            self._workflow_state.track_change(section, key)
+
+    @classmethod
+    def deserialize(cls, data, thread_safe=False, codec=None, compress=False, copy=True):
+        # The data decoded by the codec is not copied since the data is not shared.
+        if codec is not None:
+            data = encoding.get_codec(codec, compress=compress).decode(data)
+            copy = False
+
+        copier = json_util.deepcopy if copy else lambda x: x
+
+        # The spec, graph, and plan are shared with other conductors of the same definition.
+        spec, graph, plan = DEFINITIONS.get(data["spec"], data["graph"])
+
+        inputs = copier(data["input"])
+        context = copier(data["context"])
+        state = WorkflowState.deserialize(data["state"], copy=copy)
+        log = copier(data.get("log", []))
+        errors = copier(data["errors"])
+        outputs = copier(data["output"])
+
+        log_limits = copier(data.get("log_limits", {}))
+        log_result_refs = data.get("log_result_refs", False)
+        compact_items = data.get("compact_items", False)
+        results_spill_size = data.get("results_spill_size")
+        context_dedup_size = data.get("context_dedup_size")
+
+        item_results = {
+            (task_id, route): results_util.ItemResultStore.deserialize(copier(d))
+            for task_id, route, d in data.get("item_results", [])
+        }
+
+        instance = cls(
+            spec,
+            log_limits=log_limits,
+            log_result_refs=log_result_refs,
+            compact_items=compact_items,
+            results_spill_size=results_spill_size,
+            context_dedup_size=context_dedup_size,
+            thread_safe=thread_safe,
+        )
+        instance.restore(graph, log, errors, state, inputs, outputs, context, item_results)
+        instance._plan = plan
 
         return instance
 
@@ -311,8 +1455,23 @@ class WorkflowConductor(object):
 
         return self._graph
 
+    @property
+    def plan(self):
+        if not self._plan:
+            self._plan = planning.ExecutionPlan.compile(self.spec, self.graph)
+
+        return self._plan
+
     @property
     def workflow_state(self):
+        # The workflow state is accessed often and the lock is only needed to initialize it.
+        if self._workflow_state_ready:
+            return self._workflow_state
+
+        return self._init_workflow_state()
+
+    @synchronized
+    def _init_workflow_state(self):
         if not self._workflow_state:
             self._workflow_state = WorkflowState(conductor=self)
 
@@ -338,10 +1497,10 @@ class WorkflowConductor(object):
             # Proceed if there is no issue with rendering of inputs and vars.
             if self.get_workflow_status() not in statuses.ABENDED_STATUSES:
                 # Set the initial workflow context.
-                self._workflow_state.contexts.append(init_ctx)
+                self._workflow_state.add_context(init_ctx)
 
                 # Set the initial execution route.
-                self._workflow_state.routes.append([])
+                self._workflow_state.add_route([])
 
                 # Identify the starting tasks and set the pointer to the initial context entry.
                 for task_node in self.graph.roots:
@@ -350,16 +1509,21 @@ class WorkflowConductor(object):
                         task_node["id"], route, ctxs=ctxs, ready=True
                     )
 
+            self._workflow_state_ready = True
+
         return self._workflow_state
 
     @property
     def errors(self):
+        self._compact_log()
         return self._errors
 
     @property
     def log(self):
+        self._compact_log()
         return self._log
 
+    @synchronized
     def log_entry(
         self,
         entry_type,
@@ -375,8 +1539,9 @@ class WorkflowConductor(object):
         if entry_type not in ["info", "warn", "error"]:
             raise exc.WorkflowLogEntryError('The log entry type "%s" is not valid.' % entry_type)
 
-        # Identify the appropriate log and then log the entry.
-        log = self.errors if entry_type == "error" else self.log
+        # Identify the appropriate log and then log the entry. The entries removed from the log
+        # by the log limits are only compacted out of the log when the log is read.
+        log = self._errors if entry_type == "error" else self._log
 
         # Create the log entry.
         entry = {"type": entry_type, "message": message}
@@ -386,12 +1551,72 @@ class WorkflowConductor(object):
         dict_util.set_dict_value(entry, "result", result, insert_null=False)
         dict_util.set_dict_value(entry, "data", data, insert_null=False)
 
-        # Ignore if this is a duplicate.
-        if len(list(filter(lambda x: x == entry, log))) > 0:
+        # Ignore if this is a duplicate. The existing entries are indexed by digest so
+        # the entry is only compared with the existing entries that have the same digest.
+        if self._log_index is None:
+            self._index_log()
+
+        entry_key = json_util.digest(entry)
+
+        if entry in self._log_index.get(entry_key, []):
             return
 
         # Append the log entry.
         log.append(entry)
+        self._log_index.setdefault(entry_key, []).append(entry)
+        self._log_queues.setdefault(entry_type, collections.deque()).append(entry)
+
+        # Remove the oldest entry of the entry type if the limit is exceeded.
+        evicted = self._evict_log_entry(entry_type)
+
+        # The entire log is tracked as changed if there are entries removed from the log.
+        if entry_type == "error":
+            self._track_change("errors")
+        elif evicted or self._log_evicted:
+            self._track_change("log")
+        else:
+            self._track_change("log", len(log) - 1)
+
+    def _index_log(self):
+        # The entries of each entry type are queued in the order they are logged so the
+        # oldest entry of the type is removed in constant time when the limit is exceeded.
+        self._log_index = {}
+        self._log_queues = {}
+
+        for entry in self.log + self.errors:
+            self._log_index.setdefault(json_util.digest(entry), []).append(entry)
+            self._log_queues.setdefault(entry["type"], collections.deque()).append(entry)
+
+    def _evict_log_entry(self, entry_type):
+        limit = self.log_limits.get(entry_type)
+        queue = self._log_queues[entry_type]
+
+        if limit is None or len(queue) <= limit:
+            return False
+
+        # The entry is marked as evicted and removed from the log in a batch once the evicted
+        # entries are half of the log so the removal costs constant time per entry amortized.
+        entry = queue.popleft()
+        self._log_evicted[id(entry)] = entry
+
+        entry_key = json_util.digest(entry)
+        self._log_index[entry_key] = [e for e in self._log_index[entry_key] if e is not entry]
+
+        if not self._log_index[entry_key]:
+            self._log_index.pop(entry_key)
+
+        if len(self._log_evicted) * 2 > len(self._log) + len(self._errors):
+            self._compact_log()
+
+        return True
+
+    def _compact_log(self):
+        if not self._log_evicted:
+            return
+
+        self._log = [e for e in self._log if id(e) not in self._log_evicted]
+        self._errors = [e for e in self._errors if id(e) not in self._log_evicted]
+        self._log_evicted = {}
 
     def log_error(self, e, task_id=None, route=None, task_transition_id=None):
         self.log_entry(
@@ -408,11 +1633,13 @@ class WorkflowConductor(object):
                 error, task_id=task_id, route=route, task_transition_id=task_transition_id
             )
 
-    def get_workflow_parent_context(self):
-        return json_util.deepcopy(self._parent_ctx)
+    def get_workflow_parent_context(self, copy=True):
+        # If copy is disabled, the live parent context is returned and must not be modified.
+        return json_util.deepcopy(self._parent_ctx) if copy else self._parent_ctx
 
-    def get_workflow_input(self):
-        return json_util.deepcopy(self._inputs)
+    def get_workflow_input(self, copy=True):
+        # If copy is disabled, the live workflow input is returned and must not be modified.
+        return json_util.deepcopy(self._inputs) if copy else self._inputs
 
     def get_workflow_status(self):
         return self.workflow_state.status
@@ -423,6 +1650,7 @@ class WorkflowConductor(object):
 
         self.workflow_state.status = value
 
+    @synchronized
     def request_workflow_status(self, status):
         # Record current workflow status.
         current_status = self.get_workflow_status()
@@ -433,6 +1661,7 @@ class WorkflowConductor(object):
         # Push the event to all the active tasks. The event may trigger status changes to the task.
         for idx, task_state in self.workflow_state.get_tasks_by_status(statuses.ACTIVE_STATUSES):
             machines.TaskStateMachine.process_event(self.workflow_state, task_state, wf_ex_event)
+            self.workflow_state.reindex_task(idx)
 
         # Process the workflow status change event.
         machines.WorkflowStateMachine.process_event(self.workflow_state, wf_ex_event)
@@ -463,6 +1692,7 @@ class WorkflowConductor(object):
     def get_workflow_initial_context(self):
         return json_util.deepcopy(self.workflow_state.contexts[0])
 
+    @synchronized
     def get_workflow_terminal_context(self):
         if self.get_workflow_status() not in statuses.COMPLETED_STATUSES:
             raise exc.WorkflowContextError("Workflow is not in completed status.")
@@ -477,7 +1707,7 @@ class WorkflowConductor(object):
         _, first_term_task = term_tasks[0:1][0]
         other_term_tasks = term_tasks[1:]
 
-        wf_term_ctx = self.get_task_context(first_term_task["ctxs"]["in"])
+        wf_term_ctx = self.get_task_context(first_term_task["ctxs"]["in"], copy=False)
 
         for idx, task in other_term_tasks:
             # Remove the initial context since the first task processed above already
@@ -485,25 +1715,27 @@ class WorkflowConductor(object):
             in_ctx_idxs = json_util.deepcopy(task["ctxs"]["in"])
             in_ctx_idxs.remove(0)
 
-            wf_term_ctx = dict_util.merge_dicts(
-                wf_term_ctx, self.get_task_context(in_ctx_idxs), overwrite=True
+            wf_term_ctx = dict_util.merge_dicts_copy(
+                wf_term_ctx, self.get_task_context(in_ctx_idxs, copy=False), overwrite=True
             )
 
-        return wf_term_ctx
+        return json_util.deepcopy(wf_term_ctx)
 
+    @synchronized
     def render_workflow_output(self):
         wf_status = self.get_workflow_status()
 
         # Render workflow outputs if workflow is completed.
         if wf_status in statuses.COMPLETED_STATUSES and not self._outputs:
             workflow_ctx = self.get_workflow_terminal_context()
-            state_ctx = {"__state": self.workflow_state.serialize()}
+            state_ctx = {"__state": WorkflowStateView(self.workflow_state)}
             workflow_ctx = dict_util.merge_dicts(workflow_ctx, state_ctx, True)
             outputs, errors = self.spec.render_output(workflow_ctx)
 
             # Persist outputs if it is not empty.
             if outputs:
                 self._outputs = outputs
+                self._track_change("output")
 
             # Log errors if any returned and mark workflow as failed.
             if errors:
@@ -512,53 +1744,38 @@ class WorkflowConductor(object):
                 if wf_status not in [statuses.EXPIRED, statuses.ABANDONED, statuses.CANCELED]:
                     self.request_workflow_status(statuses.FAILED)
 
-    def get_workflow_output(self):
-        return json_util.deepcopy(self._outputs) if self._outputs else None
+    def get_workflow_output(self, copy=True):
+        # If copy is disabled, the live workflow output is returned and must not be modified.
+        if not self._outputs:
+            return None
+
+        return json_util.deepcopy(self._outputs) if copy else self._outputs
 
+    @synchronized
     def reset_workflow_output(self):
         self._outputs = None
+        self._track_change("output")
 
     def get_inbound_criteria_status(self, task_id, route):
-        # Get the list of inbound task transitions for the barrier task.
-        inbound_transitions = self.graph.get_prev_transitions(task_id)
-
-        # Setup the result for the evaluation of the criteria for inbound task transitions.
-        inbound_evaluation = {i: None for i in list(set(t[0] for t in inbound_transitions))}
+        # Get the inbound tracker which has the evaluation of the criteria for the inbound
+        # task transitions of each inbound task that has a task state entry for the route.
+        inbound_evaluation = self.workflow_state.get_inbound_evaluation(task_id, route)
+        inbound_count = self.workflow_state.get_inbound_task_count(task_id)
 
         # Identify the join requirement.
-        barrier = self.graph.get_barrier(task_id) or 1
-        requirement = len(inbound_evaluation.keys()) if barrier == "*" else barrier
-
-        # Evaluate the criteria for each inbound task transitions.
-        for prev_transition in inbound_transitions:
-            prev_task_state_entry = self.get_task_state_entry(prev_transition[0], route)
-
-            if not prev_task_state_entry:
-                continue
-
-            prev_task_transition_id = constants.TASK_STATE_TRANSITION_FORMAT % (
-                prev_transition[1],
-                str(prev_transition[2]),
-            )
-
-            satisfied = (
-                prev_task_transition_id in prev_task_state_entry["next"]
-                and prev_task_state_entry["next"][prev_task_transition_id]
-            )
-
-            if not bool(inbound_evaluation[prev_transition[0]]):
-                inbound_evaluation[prev_transition[0]] = satisfied
+        barrier = self.plan.get_barrier(task_id) or 1
+        requirement = inbound_count if barrier == "*" else barrier
 
         # If the count of inbound task(s) where the criteria is True >= requirements,
         # then the join requirement is satisified.
-        if list(inbound_evaluation.values()).count(True) >= requirement:
+        if inbound_evaluation["satisfied"] >= requirement:
             return constants.INBOUND_CRITERIA_SATISFIED
 
-        # If there is an inbound task(s) where the criteria is None and there is still
+        # If there is an inbound task(s) that has not run yet and there is still
         # active task(s) or staged task(s) that is ready,  then this means that the
         # workflow is still active and it is possible that not all inbound branch(es)
         # and subsequent task(s) have run.
-        if None in inbound_evaluation.values() and (
+        if len(inbound_evaluation["tasks"]) < inbound_count and (
             self.workflow_state.has_active_tasks or self.workflow_state.has_staged_tasks
         ):
             return constants.INBOUND_CRITERIA_WIP
@@ -566,30 +1783,183 @@ class WorkflowConductor(object):
         # If reached here, then the requirement is not satisified.
         return constants.INBOUND_CRITERIA_NOT_SATISFIED
 
-    def get_task(self, task_id, route):
+    def _get_task_items(self, task_id, route, staged_task):
+        # The items of the with items task and the action specs rendered for the items are
+        # cached for the staged task. The cache is invalidated if the task is staged again
+        # or if the list of input contexts for the staged task is changed. If the cache is
+        # not valid, a new entry is returned and the items are rendered with the task.
+        ctx_idxs = tuple(staged_task["ctxs"]["in"]) if staged_task else None
+        task_items = self._task_items.get((task_id, route))
+
+        if (
+            staged_task
+            and task_items
+            and task_items["staged"] is staged_task
+            and task_items["ctxs"] == ctx_idxs
+        ):
+            return task_items
+
+        return {"staged": staged_task, "ctxs": ctx_idxs, "items": None, "actions": {}}
+
+    @synchronized
+    def _cache_task_items(self, tasks, stage_items=False):
+        # Add the items and action specs rendered outside of the lock to the cache. The task is
+        # skipped if it is staged again or is no longer staged since the snapshot was taken.
+        # If stage items is set, the staged task is prepared to track the status of the items.
+        for task in tasks:
+            if "task_items" not in task:
+                continue
+
+            task_id, route, task_items = task["id"], task["route"], task["task_items"]
+            staged_task = self.workflow_state.get_staged_task(task_id, route)
+
+            if not staged_task or staged_task is not task_items["staged"]:
+                continue
+
+            if stage_items and "items_count" in task and not staged_task.get("items"):
+                staged_task["items"] = [{"status": statuses.UNSET}] * task["items_count"]
+                self.workflow_state.reindex_staged_task(task_id, route)
+
+            if task_items["items"] is None or task_items["ctxs"] != tuple(
+                staged_task["ctxs"]["in"]
+            ):
+                continue
+
+            cached = self._get_task_items(task_id, route, staged_task)
+
+            if cached["items"] is None:
+                cached = self._task_items[(task_id, route)] = task_items
+
+            cached["actions"].update(task.get("rendered", {}))
+
+    def _render_task_items(self, task, item_ids):
+        # Only the items that are not in the cache are pulled from the renderer. The cache is
+        # only read here and the rendered action specs are kept with the task until cached.
+        task_items = task["task_items"]
+        rendered = task.setdefault("rendered", {})
+        notcached_item_ids = [
+            i for i in item_ids if i not in task_items["actions"] and i not in rendered
+        ]
+
+        for action_spec in task["spec"].render_items(
+            task["ctx"], task_items["items"], notcached_item_ids
+        ):
+            rendered[action_spec["item_id"]] = action_spec
+
+        return [
+            json_util.deepcopy(rendered[i] if i in rendered else task_items["actions"][i])
+            for i in item_ids
+        ]
+
+    # The keys of the task returned to the caller. The other keys of the rendered task are
+    # only used by the conductor to render the task from the snapshot of the workflow state.
+    TASK_EXPORT_KEYS = [
+        "id",
+        "route",
+        "ctx",
+        "spec",
+        "actions",
+        "delay",
+        "items_count",
+        "concurrency",
+    ]
+
+    def get_task(self, task_id, route, item_ids=None):
+        # The task is rendered outside of the lock from a snapshot of the workflow state that
+        # is taken under the lock so the expressions are not evaluated while holding the lock.
+        snapshot = self._snapshot_tasks([(task_id, route)])
+        task = self._render_task(snapshot["tasks"][0], item_ids=item_ids)
+        self._cache_task_items([task])
+
+        return self._export_task(task, self._export_state(snapshot))
+
+    def _export_task(self, task, state):
+        # The context of the task is derived from the context entries of the workflow state
+        # and shares the values with them. The context is copied before the task is returned
+        # to the caller so the workflow state is not changed if the caller modifies the task.
+        # The workflow state for the expression evaluation is replaced with the exported
+        # workflow state so the context is plain JSON.
+        exported = {k: task[k] for k in self.TASK_EXPORT_KEYS if k in task}
+        ctx = {k: v for k, v in six.iteritems(task["ctx"]) if k != "__state"}
+        exported["ctx"] = json_util.deepcopy(ctx)
+        exported["ctx"]["__state"] = state
+
+        return exported
+
+    def _export_state(self, snapshot):
+        # The workflow state in the context of the returned tasks is built once per call and
+        # shared by the tasks. In thread-safe mode, it is the snapshot of the workflow state
+        # that the tasks are rendered from and it is built outside of the lock.
+        if snapshot["state"] is None:
+            return self.workflow_state.serialize()
+
+        state = dict(snapshot["state"])
+        state["routes"] = state["routes"].serialize()
+
+        return state
+
+    @synchronized
+    def _snapshot_tasks(self, tasks):
+        # If thread-safe mode is enabled, the expressions are evaluated against a snapshot of
+        # the parts of the workflow state read by the expression functions so they can be
+        # evaluated outside of the lock. Otherwise, the expressions are evaluated against a
+        # read-only view of the live workflow state.
+        state = self.workflow_state.snapshot() if self.thread_safe else None
+        state_ctx = {"__state": WorkflowStateView(self.workflow_state) if state is None else state}
+
+        return {
+            "state": state,
+            "tasks": [self._snapshot_task(task_id, route, state_ctx) for task_id, route in tasks],
+        }
+
+    def _snapshot_task(self, task_id, route, state_ctx):
+        # The context entries are not changed once they are created so the task context is
+        # derived from the context entries without copying the values.
         try:
-            task_ctx = self.get_task_initial_context(task_id, route)
+            task_ctx = self.get_task_initial_context(task_id, route, copy=False)
         except ValueError:
             task_ctx = self.get_workflow_initial_context()
 
-        state_ctx = {"__state": self.workflow_state.serialize()}
         current_task = {"id": task_id, "route": route}
         task_ctx = ctx_util.set_current_task(task_ctx, current_task)
         task_ctx = dict_util.merge_dicts(task_ctx, state_ctx, True)
         task_spec = self.spec.tasks.get_task(task_id).copy()
-        task_spec, action_specs = task_spec.render(task_ctx)
+        task = {"id": task_id, "route": route, "ctx": task_ctx, "spec": task_spec}
 
-        task = {
-            "id": task_id,
-            "route": route,
-            "ctx": task_ctx,
-            "spec": task_spec,
-            "actions": action_specs,
-        }
+        if not task_spec.has_items():
+            return task
+
+        # Take the cached items of the with items task and the items that have not run yet.
+        staged_task = self.workflow_state.get_staged_task(task_id, route)
+        task["task_items"] = self._get_task_items(task_id, route, staged_task)
+
+        if staged_task and staged_task.get("items"):
+            items = self.workflow_state.get_staged_task_items(task_id, route)
+            task["items_notrun"] = items.get_notrun_items()
+            task["items_active"] = items.count(statuses.ACTIVE_STATUSES)
+
+        return task
+
+    def _render_task(self, task, item_ids=None):
+        task_ctx = task["ctx"]
+        task_spec = task["spec"]
+
+        # For with items task, only render the action specs for the given list of items.
+        if task_spec.has_items():
+            task_items = task["task_items"]
+
+            # The items are only rendered if not cached, in which case the entry is new.
+            if task_items["items"] is None:
+                task_items["items"] = task_spec.get_items(task_ctx)
+
+            item_ids = range(0, len(task_items["items"])) if item_ids is None else item_ids
+            task["actions"] = self._render_task_items(task, item_ids)
+        else:
+            task["spec"], task["actions"] = task_spec.render(task_ctx)
 
         # If there is a task delay specified, evaluate the delay value.
-        if getattr(task_spec, "delay", None):
-            task_delay = task_spec.delay
+        if getattr(task["spec"], "delay", None):
+            task_delay = task["spec"].delay
 
             if isinstance(task_delay, six.string_types):
                 task_delay = expr_base.evaluate(task_delay, task_ctx)
@@ -603,38 +1973,33 @@ class WorkflowConductor(object):
         if task_spec.has_items():
             items_spec = getattr(task_spec, "with")
             concurrency = getattr(items_spec, "concurrency", None)
-            task["items_count"] = len(action_specs)
+            task["items_count"] = len(task_items["items"])
             task["concurrency"] = expr_base.evaluate(concurrency, task_ctx)
 
         return task
 
     def _evaluate_task_actions(self, task):
-        task_id = task["id"]
-        task_route = task["route"]
-
         # Return task if it is not with items.
         if not task["spec"].has_items():
             return task
 
-        # Fetch the task entry from staging.
-        staged_task = self.workflow_state.get_staged_task(task_id, task_route)
+        # Identify the items to run per concurrency policy. If the staged task is not prepared
+        # to track the items in the snapshot, then none of the items has run yet.
+        items_count = task["items_count"]
+        notrun = task.get("items_notrun")
 
-        # Prepare the staging task to track items execution status.
-        if "items" not in staged_task or not staged_task["items"]:
-            staged_task["items"] = [{"status": statuses.UNSET}] * task["items_count"]
-
-        # Trim the list of actions in the task per concurrency policy.
-        all_items = list(zip(task["actions"], staged_task["items"]))
-        notrun_items = list(filter(lambda x: x[1]["status"] == statuses.UNSET, all_items))
-        active_items = list(filter(lambda x: x[1]["status"] in statuses.ACTIVE_STATUSES, all_items))
+        if notrun is None:
+            item_ids = list(range(0, items_count))
+        else:
+            item_ids = notrun[: bisect.bisect_left(notrun, items_count)]
 
         if task["concurrency"] is not None:
-            availability = task["concurrency"] - len(active_items)
-            candidates = list(zip(*notrun_items[:availability]))
-            task["actions"] = list(candidates[0]) if candidates and availability > 0 else []
-        else:
-            candidates = list(zip(*notrun_items))
-            task["actions"] = list(candidates[0]) if candidates else []
+            availability = task["concurrency"] - task.get("items_active", 0)
+            limit = availability if availability > 0 else 0
+            item_ids = item_ids[:limit]
+
+        # Render the action specs only for the items to run.
+        task["actions"] = self._render_task_items(task, item_ids)
 
         return task
 
@@ -647,7 +2012,7 @@ class WorkflowConductor(object):
         ):
             return False
 
-        outbounds = self.graph.get_next_transitions(task_id)
+        outbounds = self.plan.get_next_transitions(task_id)
 
         for next_seq in outbounds:
             next_task_id, seq_key = next_seq[1], next_seq[2]
@@ -666,7 +2031,7 @@ class WorkflowConductor(object):
                 continue
 
             # Evaluate if the next task is a barrier (join) task.
-            if self.graph.has_barrier(next_task_id):
+            if self.plan.has_barrier(next_task_id):
                 # If eval_join_ready is false, then do not determine if the join is ready.
                 if not eval_join_ready:
                     return True
@@ -690,49 +2055,94 @@ class WorkflowConductor(object):
         return self._has_next(task_id, route=route)
 
     def get_next_tasks(self):
-        fail_on_task_rendering = False
-        staged_tasks = self.workflow_state.get_staged_tasks()
-        remediation_tasks = []
-        next_tasks = []
+        # The next tasks are rendered outside of the lock from a snapshot of the workflow state
+        # and the rendered items and any rendering errors are then recorded under the lock.
+        snapshot = self._snapshot_next_tasks()
 
-        # Identify remediation tasks if workflow failed.
-        if self.get_workflow_status() == statuses.FAILED:
-            remediation_tasks = [s for s in staged_tasks if s.get("run_on_fail", False) is True]
+        if not snapshot:
+            return []
 
-        # Return an empty list if the workflow is not running and there is no remediation tasks.
-        if self.get_workflow_status() not in statuses.RUNNING_STATUSES and not remediation_tasks:
-            return next_tasks
+        rendered_tasks = []
+        next_tasks = []
+        errors = []
 
         # Return the list of tasks that are staged and readied. If there is exception on
         # task rendering, then log the error and continue. This allows user to know about
         # all task rendering errors for this task transition instead of getting rendering
         # error one at a time during runtime.
-        for staged_task in remediation_tasks or staged_tasks:
+        for task in snapshot["tasks"]:
             try:
-                next_task = self.get_task(staged_task["id"], staged_task["route"])
+                next_task = self._render_task(task, item_ids=[])
                 next_task = self._evaluate_task_actions(next_task)
+                rendered_tasks.append(next_task)
 
                 # Assign the task retry delay which will overwrite any task delay
                 # specified in the task definition.
-                if "retry" in staged_task:
-                    next_task["delay"] = staged_task["retry"].get("delay") or 0
+                if "retry_delay" in next_task:
+                    next_task["delay"] = next_task["retry_delay"]
 
                 if "actions" in next_task and len(next_task["actions"]) > 0:
                     next_tasks.append(next_task)
                 elif "items_count" in next_task and next_task["items_count"] == 0:
                     next_tasks.append(next_task)
             except Exception as e:
-                fail_on_task_rendering = True
-                self.log_error(e, task_id=staged_task["id"], route=staged_task["route"])
-                continue
+                errors.append((e, task["id"], task["route"]))
 
-        # Return nothing if there is error(s) on determining next tasks.
-        if fail_on_task_rendering:
-            self.request_workflow_status(statuses.FAILED)
+        # Return nothing if there is error(s) on determining next tasks. Only the tasks that
+        # are rendered successfully are staged to track the status of the items.
+        if not self._stage_next_tasks(rendered_tasks, errors):
             return []
 
+        if next_tasks:
+            state = self._export_state(snapshot)
+            next_tasks = [self._export_task(t, state) for t in next_tasks]
+
         return sorted(next_tasks, key=lambda x: (x["id"], x["route"]))
 
+    @synchronized
+    def _snapshot_next_tasks(self):
+        staged_tasks = self.workflow_state.get_staged_tasks()
+        remediation_tasks = []
+
+        # Identify remediation tasks if workflow failed.
+        if self.get_workflow_status() == statuses.FAILED:
+            remediation_tasks = [s for s in staged_tasks if s.get("run_on_fail", False) is True]
+
+        # Remove the cached items for the with items tasks that are no longer staged.
+        for task_id, route in list(self._task_items.keys()):
+            if not self.workflow_state.get_staged_task(task_id, route):
+                self._task_items.pop((task_id, route))
+
+        # Remove the item results for the with items tasks that are no longer staged.
+        for task_id, route in list(self._item_results.keys()):
+            if not self.workflow_state.get_staged_task(task_id, route):
+                self._item_results.pop((task_id, route)).close()
+
+        # Return nothing if the workflow is not running and there is no remediation tasks.
+        if self.get_workflow_status() not in statuses.RUNNING_STATUSES and not remediation_tasks:
+            return None
+
+        staged_tasks = remediation_tasks or staged_tasks
+        snapshot = self._snapshot_tasks([(s["id"], s["route"]) for s in staged_tasks])
+
+        for task, staged_task in zip(snapshot["tasks"], staged_tasks):
+            if "retry" in staged_task:
+                task["retry_delay"] = staged_task["retry"].get("delay") or 0
+
+        return snapshot
+
+    @synchronized
+    def _stage_next_tasks(self, tasks, errors):
+        self._cache_task_items(tasks, stage_items=True)
+
+        for e, task_id, route in errors:
+            self.log_error(e, task_id=task_id, route=route)
+
+        if errors:
+            self.request_workflow_status(statuses.FAILED)
+
+        return not errors
+
     def _get_task_state_idx(self, task_id, route):
         return self.workflow_state.tasks.get(
             constants.TASK_STATE_ROUTE_FORMAT % (task_id, str(route))
@@ -748,7 +2158,7 @@ class WorkflowConductor(object):
 
     def make_task_context(self, task_state_entry, task_result=None):
         in_ctx_idxs = task_state_entry["ctxs"]["in"]
-        in_ctx_val = self.get_task_context(in_ctx_idxs)
+        in_ctx_val = self.get_task_context(in_ctx_idxs, copy=False)
 
         current_task = {
             "id": task_state_entry["id"],
@@ -757,34 +2167,60 @@ class WorkflowConductor(object):
         }
 
         current_ctx = ctx_util.set_current_task(in_ctx_val, current_task)
-        state_ctx = {"__state": self.workflow_state.serialize()}
+        state_ctx = {"__state": WorkflowStateView(self.workflow_state)}
         current_ctx = dict_util.merge_dicts(current_ctx, state_ctx, True)
 
         return current_ctx
 
-    def make_task_result(self, task_spec, event):
+    def _get_item_results(self, task_id, route, items_count):
+        store = self._item_results.get((task_id, route))
+
+        if not store:
+            store = results_util.ItemResultStore(items_count, spill_size=self.results_spill_size)
+            self._item_results[(task_id, route)] = store
+
+        return store
+
+    @synchronized
+    def close(self):
+        # Release the local files where the item results are spilled. The conductor is not
+        # expected to be used after it is closed, such as when it is evicted from the host.
+        for store in self._item_results.values():
+            store.close()
+
+        self._item_results = {}
+
+    def get_task_item_result(self, task_id, route, item_id):
+        # The item results are kept while the with items task is staged, which includes a
+        # failed with items task until the task is rerun.
+        store = self._item_results.get((task_id, route))
+
+        return store.get(item_id) if store else None
+
+    def make_task_result(self, task_spec, event, task_id=None, route=None):
         # Format task result depending on the type of task.
         if not task_spec.has_items():
             task_result = event.result
+        elif getattr(event, "accumulated_result", None) is not None:
+            # For with items task, use the accumulated result from the event if given.
+            task_result = event.accumulated_result
+        elif (task_id, route) in self._item_results:
+            # Otherwise, materialize the accumulated result from the item result store.
+            task_result = self._item_results[(task_id, route)].materialize()
         else:
-            # For with items task, use the accumulated result from the event.
-            task_result = (
-                event.accumulated_result or []
-                if isinstance(event, events.TaskItemActionExecutionEvent)
-                else event.result or []
-            )
+            is_item_event = isinstance(event, events.TaskItemActionExecutionEvent)
+            task_result = [] if is_item_event else event.result or []
 
         return task_result
 
     def setup_retry_in_task_state(self, task_state_entry, in_ctx_idxs):
         # Setup the retry in the task state.
         task_id = task_state_entry["id"]
-        task_retry_spec = self.graph.get_task_retry_spec(task_id)
-        task_state_entry["retry"] = json_util.deepcopy(task_retry_spec)
+        task_state_entry["retry"] = self.plan.get_task_retry_spec(task_id)
         task_state_entry["retry"]["tally"] = 0
 
         # Get task context for evaluating the expression in delay and count.
-        in_ctx = self.get_task_context(in_ctx_idxs)
+        in_ctx = self.get_task_context(in_ctx_idxs, copy=False)
 
         # Evaluate the retry delay value.
         if "delay" in task_state_entry["retry"] and isinstance(
@@ -809,7 +2245,7 @@ class WorkflowConductor(object):
             task_state_entry["retry"]["count"] = count_value
 
     def add_task_state(self, task_id, route, in_ctx_idxs=None, prev=None):
-        if not self.graph.has_task(task_id):
+        if not self.plan.has_task(task_id):
             raise exc.InvalidTask(task_id)
 
         if not in_ctx_idxs:
@@ -824,17 +2260,135 @@ class WorkflowConductor(object):
         }
 
         # If the task has retry spec defined, then setup the retry in the task state entry.
-        if self.graph.task_has_retry(task_id):
+        if self.plan.task_has_retry(task_id):
             self.setup_retry_in_task_state(task_state_entry, in_ctx_idxs)
 
         # Append the task state entry to the list of task execution.
-        task_state_entry_id = constants.TASK_STATE_ROUTE_FORMAT % (task_id, str(route))
-        self.workflow_state.sequence.append(task_state_entry)
-        self.workflow_state.tasks[task_state_entry_id] = len(self.workflow_state.sequence) - 1
+        self.workflow_state.add_task(task_state_entry)
 
         return task_state_entry
 
     def update_task_state(self, task_id, route, event):
+        if not self._lock:
+            return self._update_task_state(task_id, route, event)
+
+        request = {"event": (task_id, route, event)}
+        self._pending_events.append(request)
+
+        with self._lock:
+            self._apply_pending_events()
+
+        if "error" in request:
+            raise request["error"]
+
+        return request["entry"]
+
+    def _apply_pending_events(self):
+        # Apply the queued task events including the ones from the other callers. The result
+        # or error for each event is returned to the caller via the request.
+        deferred = []
+
+        while self._pending_events:
+            request = self._pending_events.popleft()
+
+            try:
+                task_id, route, event = request["event"]
+                request["entry"] = self._update_task_state(task_id, route, event, deferred=deferred)
+            except Exception as e:
+                request["error"] = e
+
+        self._evaluate_deferred_workflow_status(deferred)
+
+    @synchronized
+    def update_task_states(self, task_events):
+        # Apply the batch of (task_id, route, event) in order. The evaluation of the workflow
+        # status is deferred and run once at the end of the batch for the events that can not
+        # change the status of a running workflow. The events that can change how subsequent
+        # events are processed, such as a task failure without remediation, a fail command in
+        # the task transition, or a pause or cancel, are evaluated in place after the events
+        # deferred so far.
+        deferred = []
+        task_state_entries = []
+
+        for task_id, route, event in task_events:
+            task_state_entry = self._update_task_state(task_id, route, event, deferred=deferred)
+            task_state_entries.append(task_state_entry)
+
+        self._evaluate_deferred_workflow_status(deferred)
+
+        return task_state_entries
+
+    def _evaluate_deferred_workflow_status(self, deferred):
+        # The deferred events are the (task_id, route) of the events in order and whether the
+        # event changed the task status. The running workflow can only be completed by the last
+        # event that changed a task status since only the events that don't change any task
+        # status follow. So the workflow status is evaluated once for the task of that event.
+        # If the workflow is completed, the tasks of the events that follow are also marked as
+        # terminal as they would be if the workflow status is evaluated for each event.
+        if not deferred:
+            return
+
+        idx = len(deferred) - 1
+
+        while idx > 0 and not deferred[idx][1]:
+            idx -= 1
+
+        task_keys = [task_key for task_key, _ in deferred[idx:]]
+        del deferred[:]
+
+        self._evaluate_workflow_status(*task_keys[0])
+
+        if self.get_workflow_status() not in statuses.COMPLETED_STATUSES:
+            return
+
+        for task_id, route in task_keys[1:]:
+            task_state_idx = self._get_task_state_idx(task_id, route)
+            self.workflow_state.sequence[task_state_idx]["term"] = True
+            self.workflow_state.reindex_task(task_state_idx)
+
+    def _evaluate_workflow_status(self, task_id, route, engine_event_queue=None):
+        task_state_idx = self._get_task_state_idx(task_id, route)
+        task_state_entry = self.workflow_state.sequence[task_state_idx]
+
+        # Process the task event using the workflow state machine and update the workflow status.
+        task_ex_event = events.TaskExecutionEvent(task_id, route, task_state_entry["status"])
+        machines.WorkflowStateMachine.process_event(self.workflow_state, task_ex_event)
+
+        # Process any engine commands in the queue.
+        while engine_event_queue and not engine_event_queue.empty():
+            next_task_id, next_task_route = engine_event_queue.get()
+            engine_event = events.ENGINE_EVENT_MAP[next_task_id]
+            self._update_task_state(next_task_id, next_task_route, engine_event())
+
+        # Mark the task as a terminal task if workflow execution is completed.
+        if self.get_workflow_status() in statuses.COMPLETED_STATUSES:
+            task_state_entry["term"] = True
+
+        # Update the indices since the task state entry is changed in place above.
+        self.workflow_state.reindex_task(task_state_idx)
+
+    # The task statuses that don't change the status of a running workflow unless the
+    # workflow is completed which is evaluated at the end of the batch.
+    DEFERRABLE_STATUSES = [
+        statuses.REQUESTED,
+        statuses.SCHEDULED,
+        statuses.DELAYED,
+        statuses.RUNNING,
+        statuses.RETRYING,
+        statuses.SUCCEEDED,
+    ]
+
+    def _is_deferrable(self, old_task_status, new_task_status, engine_event_queue):
+        if new_task_status == old_task_status:
+            return True
+
+        return (
+            engine_event_queue.empty()
+            and self.get_workflow_status() == statuses.RUNNING
+            and new_task_status in self.DEFERRABLE_STATUSES
+        )
+
+    def _update_task_state(self, task_id, route, event, deferred=None):
         engine_event_queue = queue.Queue()
 
         # Throw exception if not expected event type.
@@ -842,7 +2396,7 @@ class WorkflowConductor(object):
             raise TypeError("Event is not type of ExecutionEvent.")
 
         # Throw exception if task does not exist in the workflow graph.
-        if not self.graph.has_task(task_id):
+        if not self.plan.has_task(task_id):
             raise exc.InvalidTask(task_id)
 
         # Try to get the task metadata from staging or task state.
@@ -892,14 +2446,36 @@ class WorkflowConductor(object):
         if event.status and staged_task and "items" not in staged_task:
             self.workflow_state.remove_staged_task(task_id, route)
 
+        item_result_stored = False
+
         # If action execution is for a task item, then record the execution status for the item.
         # Result for each item is not recorded in the staged_task because it impacts database
         # write performance if there are a lot of items and/or item result size is huge.
         if staged_task and isinstance(event, events.TaskItemActionExecutionEvent):
-            staged_task["items"][event.item_id] = {"status": event.status}
+            self.workflow_state.set_staged_task_item_status(
+                task_id, route, event.item_id, event.status
+            )
 
-        # Log the error if it is a failed execution event.
-        if event.status == statuses.FAILED:
+            # The action spec rendered for the item is removed from the cache once it is run.
+            if (task_id, route) in self._task_items:
+                self._task_items[(task_id, route)]["actions"].pop(event.item_id, None)
+
+            # Append the result of the completed item to the item result store if the event
+            # doesn't include the accumulated result.
+            if event.status in statuses.COMPLETED_STATUSES and event.accumulated_result is None:
+                store = self._get_item_results(task_id, route, len(staged_task["items"]))
+                store.append(event.item_id, event.result)
+                self._track_change("item_results", (task_id, route, event.item_id))
+                item_result_stored = True
+
+        # Log the error if it is a failed execution event. If result refs is enabled and the
+        # result of the item is kept in the item result store, refer to the item result which
+        # is returned by get_task_item_result instead of copying the result into the log.
+        if event.status == statuses.FAILED and self.log_result_refs and item_result_stored:
+            message = "Execution failed. See item result for details."
+            result_ref = {"task_id": task_id, "route": route, "item_id": event.item_id}
+            self.log_entry("error", message, task_id=task_id, data={"result_ref": result_ref})
+        elif event.status == statuses.FAILED:
             message = "Execution failed. See result for details."
             self.log_entry("error", message, task_id=task_id, result=event.result)
 
@@ -907,6 +2483,7 @@ class WorkflowConductor(object):
         # task state machine and update the task status.
         old_task_status = task_state_entry.get("status", statuses.UNSET)
         machines.TaskStateMachine.process_event(self.workflow_state, task_state_entry, event)
+        self.workflow_state.reindex_task(task_state_idx)
         new_task_status = task_state_entry.get("status", statuses.UNSET)
 
         # If retrying, staged the task to be returned in get_next_tasks.
@@ -933,11 +2510,10 @@ class WorkflowConductor(object):
             if not (task_spec.has_items() and new_task_status in statuses.ABENDED_STATUSES):
                 self.workflow_state.remove_staged_task(task_id, route)
             else:
-                staged_task = self.workflow_state.get_staged_task(task_id, route)
-                staged_task["completed"] = True
+                self.workflow_state.set_staged_task_completed(task_id, route)
 
             # Format task result depending on the type of task.
-            task_result = self.make_task_result(task_spec, event)
+            task_result = self.make_task_result(task_spec, event, task_id=task_id, route=route)
 
             # Set current task in the context.
             current_ctx = self.make_task_context(task_state_entry, task_result=task_result)
@@ -949,7 +2525,7 @@ class WorkflowConductor(object):
             if self.get_workflow_status() in statuses.ACTIVE_STATUSES and self._evaluate_task_retry(
                 task_state_entry, current_ctx
             ):
-                return self.update_task_state(task_id, route, events.TaskRetryEvent())
+                return self._update_task_state(task_id, route, events.TaskRetryEvent())
 
         # Evaluate task transitions if task is completed and status change is not processed.
         if new_task_status in statuses.COMPLETED_STATUSES and new_task_status != old_task_status:
@@ -957,11 +2533,12 @@ class WorkflowConductor(object):
             staged_next_tasks = []
 
             # Identify task transitions for the current completed task.
-            task_transitions = self.graph.get_next_transitions(task_id)
+            task_transitions = self.plan.get_next_transitions(task_id)
 
             # Mark task as terminal when there is no transitions.
             if not task_transitions:
                 task_state_entry["term"] = True
+                self.workflow_state.reindex_task(task_state_idx)
 
             # Iterate thru each outbound task transitions.
             for task_transition in task_transitions:
@@ -981,15 +2558,16 @@ class WorkflowConductor(object):
                     self.request_workflow_status(statuses.FAILED)
                     continue
 
+                # Update the indices since the task transition is evaluated.
+                self.workflow_state.reindex_task(task_state_idx)
+
                 # If criteria met, then mark the next task staged and calculate outgoing context.
                 if task_state_entry["next"][task_transition_id]:
-                    next_task_node = self.graph.get_task(task_transition[1])
-                    next_task_id = next_task_node["id"]
-                    new_ctx_idx = None
+                    next_task_id = task_transition[1]
 
                     # Get and process new context for the task transition.
                     out_ctx, new_ctx, errors = task_spec.finalize_context(
-                        next_task_id, task_transition, json_util.deepcopy(current_ctx)
+                        next_task_id, task_transition, current_ctx
                     )
 
                     if errors:
@@ -999,9 +2577,10 @@ class WorkflowConductor(object):
 
                     out_ctx_idxs = json_util.deepcopy(task_state_entry["ctxs"]["in"])
 
+                    # The published values may refer to the task result given by the caller
+                    # so the new context is copied before it is added to the workflow state.
                     if new_ctx:
-                        self.workflow_state.contexts.append(new_ctx)
-                        new_ctx_idx = len(self.workflow_state.contexts) - 1
+                        new_ctx_idx = self.workflow_state.add_context(json_util.deepcopy(new_ctx))
 
                         # Add to the list of contexts for the next task in this transition.
                         out_ctx_idxs.append(new_ctx_idx)
@@ -1037,7 +2616,9 @@ class WorkflowConductor(object):
 
                         # Clear list of items for with items task.
                         staged_next_task.pop("items", None)
-                        staged_next_task.pop("completed", None)
+                        self.workflow_state.set_staged_task_completed(
+                            next_task_id, next_task_route, completed=False
+                        )
                     else:
                         # Otherwise create a new entry in staging for the next task.
                         staged_next_task = self.workflow_state.add_staged_task(
@@ -1050,9 +2631,13 @@ class WorkflowConductor(object):
 
                     # Check if inbound criteria are met. Must use the original route
                     # to identify the inbound task transitions.
-                    staged_next_task["ready"] = (
-                        self.get_inbound_criteria_status(next_task_id, route)
-                        == constants.INBOUND_CRITERIA_SATISFIED
+                    self.workflow_state.set_staged_task_ready(
+                        next_task_id,
+                        next_task_route,
+                        ready=(
+                            self.get_inbound_criteria_status(next_task_id, route)
+                            == constants.INBOUND_CRITERIA_SATISFIED
+                        ),
                     )
 
                     # Put the next task in the engine event queue if it is an engine command.
@@ -1081,20 +2666,24 @@ class WorkflowConductor(object):
             if has_manual_fail:
                 for staged_next_task in staged_next_tasks:
                     staged_next_task["run_on_fail"] = True
+                    self.workflow_state.reindex_staged_task(
+                        staged_next_task["id"], staged_next_task["route"]
+                    )
 
-        # Process the task event using the workflow state machine and update the workflow status.
-        task_ex_event = events.TaskExecutionEvent(task_id, route, task_state_entry["status"])
-        machines.WorkflowStateMachine.process_event(self.workflow_state, task_ex_event)
-
-        # Process any engine commands in the queue.
-        while not engine_event_queue.empty():
-            next_task_id, next_task_route = engine_event_queue.get()
-            engine_event = events.ENGINE_EVENT_MAP[next_task_id]
-            self.update_task_state(next_task_id, next_task_route, engine_event())
+        # Defer the evaluation of the workflow status if processing a batch of events and the
+        # event can not change the status of the running workflow. Otherwise, evaluate the
+        # deferred events and then the workflow status for this event now.
+        if deferred is not None and self._is_deferrable(
+            old_task_status, new_task_status, engine_event_queue
+        ):
+            deferred.append(((task_id, route), new_task_status != old_task_status))
+            self.workflow_state.reindex_task(task_state_idx)
+        else:
+            if deferred:
+                deferred[:] = [d for d in deferred if d[0] != (task_id, route)]
+                self._evaluate_deferred_workflow_status(deferred)
 
-        # Mark the task as a terminal task if workflow execution is completed.
-        if self.get_workflow_status() in statuses.COMPLETED_STATUSES:
-            task_state_entry["term"] = True
+            self._evaluate_workflow_status(task_id, route, engine_event_queue=engine_event_queue)
 
         return task_state_entry
 
@@ -1106,24 +2695,16 @@ class WorkflowConductor(object):
             str(task_transition[2]),
         )
 
-        is_split_task = self.spec.tasks.is_split_task(task_id)
-        is_in_cycle = self.graph.in_cycle(task_id)
+        is_split_task = self.plan.is_split_task(task_id)
+        is_in_cycle = self.plan.in_cycle(task_id)
 
         if not is_split_task or is_in_cycle:
             return prev_route
 
-        old_route_details = self.workflow_state.routes[prev_route]
-        new_route_details = json_util.deepcopy(old_route_details)
-
-        if prev_task_transition_id not in old_route_details:
-            new_route_details.append(prev_task_transition_id)
-
-        if old_route_details == new_route_details:
+        if self.workflow_state.routes.has_transition(prev_route, prev_task_transition_id):
             return prev_route
 
-        self.workflow_state.routes.append(new_route_details)
-
-        return len(self.workflow_state.routes) - 1
+        return self.workflow_state.split_route(prev_route, prev_task_transition_id)
 
     def _evaluate_task_retry(self, task_state_entry, current_ctx):
         if "retry" not in task_state_entry:
@@ -1144,24 +2725,23 @@ class WorkflowConductor(object):
 
         return False
 
-    def get_task_context(self, ctx_idxs):
-        ctx = {}
+    def get_task_context(self, ctx_idxs, copy=True):
+        # The merged context is cached and shared by the workflow state. Set copy to
+        # False only if the caller does not modify the context returned.
+        ctx = self.workflow_state.get_context(ctx_idxs)
 
-        for ctx_idx in ctx_idxs:
-            ctx = dict_util.merge_dicts(ctx, self.workflow_state.contexts[ctx_idx], overwrite=True)
+        return json_util.deepcopy(ctx) if copy else ctx
 
-        return ctx
-
-    def get_task_initial_context(self, task_id, route):
+    def get_task_initial_context(self, task_id, route, copy=True):
         staged_task = self.workflow_state.get_staged_task(task_id, route)
 
         if staged_task:
-            return self.get_task_context(staged_task["ctxs"]["in"])
+            return self.get_task_context(staged_task["ctxs"]["in"], copy=copy)
 
         task_state_entry = self.get_task_state_entry(task_id, route)
 
         if task_state_entry:
-            return self.get_task_context(task_state_entry["ctxs"]["in"])
+            return self.get_task_context(task_state_entry["ctxs"]["in"], copy=copy)
 
         raise ValueError('Unable to determine context for task "%s".' % task_id)
 
@@ -1173,7 +2753,7 @@ class WorkflowConductor(object):
         if not task_state_entry:
             raise exc.InvalidTaskStateEntry(task_id)
 
-        for t in self.graph.get_next_transitions(task_id):
+        for t in self.plan.get_next_transitions(task_id):
             task_transition_id = constants.TASK_STATE_TRANSITION_FORMAT % (t[1], str(t[2]))
 
             if (
@@ -1185,7 +2765,8 @@ class WorkflowConductor(object):
         return contexts
 
     def _request_task_rerun(self, task_id, route, reset_items=False):
-        task = self.workflow_state.get_task(task_id, route)
+        task_idx = self._get_task_state_idx(task_id, route)
+        task = self.workflow_state.sequence[task_idx]
         task_ctx = json_util.deepcopy(task["ctxs"]["in"])
         task_prev = json_util.deepcopy(task["prev"])
         task_spec = self.spec.tasks.get_task(task_id)
@@ -1193,16 +2774,19 @@ class WorkflowConductor(object):
         # Reset terminal status for the rerunnable candidate.
         task.pop("term", None)
         task.pop("ignore", None)
+        self.workflow_state.reindex_task(task_idx)
 
         # Reset staged task for the rerunnable candidate.
         staged_task = self.workflow_state.get_staged_task(task_id, route)
 
         if staged_task:
-            staged_task.pop("completed", None)
+            self.workflow_state.set_staged_task_completed(task_id, route, completed=False)
 
         # Reset the list of errors for the task.
         for e in [e for e in self.errors if e.get("task_id", None) == task_id]:
             self.errors.remove(e)
+            self._log_index = None
+            self._track_change("errors")
 
         # If task has items, then use existing staged task entry and reset failed items.
         if task_spec.has_items():
@@ -1210,14 +2794,17 @@ class WorkflowConductor(object):
             for item in staged_task.get("items", []):
                 if reset_items or item["status"] in statuses.ABENDED_STATUSES:
                     item["status"] = statuses.UNSET
+
+            self.workflow_state.reindex_staged_task(task_id, route)
         # Otherwise, add a new task state entry and stage task to be returned in get_next_tasks.
         else:
             self.add_task_state(task_id, route, in_ctx_idxs=task_ctx, prev=task_prev)
             self.workflow_state.add_staged_task(task_id, route, ctxs=task_ctx, prev=task_prev)
 
         # Reset terminal status for the task branch which will also be rerun.
-        for _, next_task in self.workflow_state.get_task_sequence(task_id, route):
+        for idx, next_task in self.workflow_state.get_task_sequence(task_id, route):
             next_task.pop("term", None)
+            self.workflow_state.reindex_task(idx)
 
     def _collapse_task_rerun_requests(self, tasks=None):
         # Get the subsequent sequence of tasks that already ran for each task in the task requests.
@@ -1244,6 +2831,7 @@ class WorkflowConductor(object):
 
         return result
 
+    @synchronized
     def request_workflow_rerun(self, task_requests=None):
         # Throw exception if workflow is still active.
         if self.get_workflow_status() not in statuses.COMPLETED_STATUSES:
@@ -1281,7 +2869,7 @@ class WorkflowConductor(object):
 
         # Keep record of which task sequence(s) is being rerun in the workflow state.
         rerun_entry = [i for i, t in rerunnable_candidates.values()]
-        self.workflow_state.reruns.append(rerun_entry)
+        self.workflow_state.add_rerun(rerun_entry)
 
         # Setup task candidates for rerun.
         sorted_rerunnable_candidates = sorted(
@@ -1295,15 +2883,16 @@ class WorkflowConductor(object):
 
         # Get the list of terminal tasks with next or remediation task(s).
         continuable_candidates = {
-            constants.TASK_STATE_ROUTE_FORMAT % (t["id"], str(t["route"])): t
+            constants.TASK_STATE_ROUTE_FORMAT % (t["id"], str(t["route"])): (i, t)
             for i, t in self.workflow_state.get_terminal_tasks()
             if len([k for k, v in six.iteritems(t["next"]) if v]) > 0
         }
 
         # Automatically resume all continuable candidates.
-        for _, task in sorted(six.iteritems(continuable_candidates), key=lambda x: x[0]):
+        for _, (idx, task) in sorted(six.iteritems(continuable_candidates), key=lambda x: x[0]):
             # Reset terminal status for the continuable candidate.
             task.pop("term", None)
+            self.workflow_state.reindex_task(idx)
 
         # Reset the workflow output.
         self.reset_workflow_output()
@@ -0,0 +1,345 @@
+# Copyright 2021 The StackStorm Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import six
+import struct
+import ujson
+import zlib
+
+
+LOG = logging.getLogger(__name__)
+
+
+class Codec(object):
+    # The codec encodes the serialized conductor to bytes and decodes the bytes back to the
+    # serialized conductor. The encoded bytes are compressed with zlib if compress is enabled.
+    name = None
+
+    def __init__(self, compress=False, level=6):
+        self.compress = compress
+        self.level = level
+
+    def encode(self, data):
+        value = self._encode(data)
+
+        return zlib.compress(value, self.level) if self.compress else value
+
+    def decode(self, value):
+        value = zlib.decompress(value) if self.compress else value
+
+        return self._decode(value)
+
+    def _encode(self, data):
+        raise NotImplementedError()
+
+    def _decode(self, value):
+        raise NotImplementedError()
+
+
+class JSONCodec(Codec):
+    name = "json"
+
+    def _encode(self, data):
+        return ujson.dumps(data).encode("utf-8")  # pylint: disable=no-member
+
+    def _decode(self, value):
+        return ujson.loads(value.decode("utf-8"))  # pylint: disable=no-member
+
+
+class BinaryCodec(Codec):
+    # The binary encoding writes a tag byte for the type of each value. The integers and the
+    # lengths are written as varints. The strings up to the intern size such as the keys,
+    # task ids, statuses, and task transition ids are written once and referred to by index
+    # in the string table afterwards. The keys of the dicts with string keys are written once
+    # to the key table and the dicts with the same keys such as the task state entries only
+    # refer to the keys by index. The lists of integers such as the indexes of the contexts
+    # are written as the varints of the differences between the integers. The header records
+    # whether the bytes are compressed so the bytes can be decoded regardless of the compress
+    # option of the codec.
+    name = "binary"
+
+    MAGIC = b"OQB"
+    VERSION = 1
+    FLAG_ZLIB = 1
+    INTERN_SIZE = 128
+
+    NONE, FALSE, TRUE, INT, FLOAT, STR, STR_NEW, STR_REF, LIST, DICT = range(0, 10)
+    INT_LIST, KEYS_NEW, KEYS_REF = range(10, 13)
+
+    def encode(self, data):
+        value = self._encode(data)
+        flags = 0
+
+        if self.compress:
+            value = zlib.compress(value, self.level)
+            flags |= self.FLAG_ZLIB
+
+        return self.MAGIC + bytearray([self.VERSION, flags]) + value
+
+    def decode(self, value):
+        value = bytearray(value)
+
+        if bytes(value[:3]) != self.MAGIC:
+            raise ValueError("The value is not encoded with the binary codec.")
+
+        if value[3] != self.VERSION:
+            raise ValueError('The version "%s" of the binary codec is not supported.' % value[3])
+
+        body = value[5:]
+
+        if value[4] & self.FLAG_ZLIB:
+            body = bytearray(zlib.decompress(bytes(body)))
+
+        return self._decode(body)
+
+    @staticmethod
+    def _write_varint(buf, n):
+        while n > 0x7F:
+            buf.append((n & 0x7F) | 0x80)
+            n >>= 7
+
+        buf.append(n)
+
+    @classmethod
+    def _write_int(cls, buf, n):
+        # The signed integer is zigzag encoded so small negative integers stay small.
+        cls._write_varint(buf, n * 2 if n >= 0 else -n * 2 - 1)
+
+    @staticmethod
+    def _is_str(value):
+        return isinstance(value, six.string_types)
+
+    @staticmethod
+    def _is_int(value):
+        return isinstance(value, six.integer_types) and not isinstance(value, bool)
+
+    def _encode(self, data):
+        buf = bytearray()
+        self._write(buf, ({}, {}), data)
+
+        return bytes(buf)
+
+    def _write(self, buf, tables, value):
+        strings, keys = tables
+
+        if value is None:
+            buf.append(self.NONE)
+        elif value is True:
+            buf.append(self.TRUE)
+        elif value is False:
+            buf.append(self.FALSE)
+        elif isinstance(value, six.integer_types):
+            buf.append(self.INT)
+            self._write_int(buf, value)
+        elif isinstance(value, float):
+            buf.append(self.FLOAT)
+            buf.extend(struct.pack(">d", value))
+        elif isinstance(value, six.string_types):
+            self._write_str(buf, strings, value)
+        elif isinstance(value, (list, tuple)) and value and all(self._is_int(v) for v in value):
+            buf.append(self.INT_LIST)
+            self._write_varint(buf, len(value))
+            prev = 0
+
+            for item in value:
+                self._write_int(buf, item - prev)
+                prev = item
+        elif isinstance(value, (list, tuple)):
+            buf.append(self.LIST)
+            self._write_varint(buf, len(value))
+
+            for item in value:
+                self._write(buf, tables, item)
+        elif isinstance(value, dict) and value and all(map(self._is_str, value.keys())):
+            self._write_keys(buf, tables, tuple(value.keys()))
+
+            for v in value.values():
+                self._write(buf, tables, v)
+        elif isinstance(value, dict):
+            buf.append(self.DICT)
+            self._write_varint(buf, len(value))
+
+            for k, v in six.iteritems(value):
+                self._write(buf, tables, k)
+                self._write(buf, tables, v)
+        else:
+            raise ValueError('The value of type "%s" is not supported.' % type(value).__name__)
+
+    def _write_keys(self, buf, tables, value):
+        strings, keys = tables
+
+        if value in keys:
+            buf.append(self.KEYS_REF)
+            self._write_varint(buf, keys[value])
+            return
+
+        keys[value] = len(keys)
+        buf.append(self.KEYS_NEW)
+        self._write_varint(buf, len(value))
+
+        for k in value:
+            self._write_str(buf, strings, k)
+
+    def _write_str(self, buf, strings, value):
+        if value in strings:
+            buf.append(self.STR_REF)
+            self._write_varint(buf, strings[value])
+            return
+
+        data = value.encode("utf-8") if isinstance(value, six.text_type) else value
+
+        if len(value) <= self.INTERN_SIZE:
+            strings[value] = len(strings)
+            buf.append(self.STR_NEW)
+        else:
+            buf.append(self.STR)
+
+        self._write_varint(buf, len(data))
+        buf.extend(data)
+
+    def _decode(self, value):
+        reader = _BinaryReader(value)
+
+        try:
+            data = reader.read()
+        except IndexError:
+            raise ValueError("The value is truncated before the end of the encoded data.")
+
+        if reader.pos != len(value):
+            raise ValueError("The value has trailing bytes after the encoded data.")
+
+        return data
+
+
+class _BinaryReader(object):
+    def __init__(self, buf):
+        self.buf = buf
+        self.pos = 0
+        self.strings = []
+        self.keys = []
+
+    def read_varint(self):
+        n = 0
+        shift = 0
+
+        while True:
+            b = self.buf[self.pos]
+            self.pos += 1
+            n |= (b & 0x7F) << shift
+            shift += 7
+
+            if not b & 0x80:
+                return n
+
+    def read_int(self):
+        n = self.read_varint()
+
+        return n // 2 if not n & 1 else -(n + 1) // 2
+
+    def read_bytes(self, length):
+        if self.pos + length > len(self.buf):
+            raise IndexError("The end of the buffer is reached.")
+
+        value = bytes(self.buf[self.pos : self.pos + length])
+        self.pos += length
+
+        return value
+
+    def read_str(self):
+        return self.read_bytes(self.read_varint()).decode("utf-8")
+
+    def read(self):
+        tag = self.buf[self.pos]
+        self.pos += 1
+
+        if tag == BinaryCodec.NONE:
+            return None
+
+        if tag == BinaryCodec.TRUE:
+            return True
+
+        if tag == BinaryCodec.FALSE:
+            return False
+
+        if tag == BinaryCodec.INT:
+            return self.read_int()
+
+        if tag == BinaryCodec.FLOAT:
+            return struct.unpack(">d", self.read_bytes(8))[0]
+
+        if tag == BinaryCodec.STR:
+            return self.read_str()
+
+        if tag == BinaryCodec.STR_NEW:
+            value = self.read_str()
+            self.strings.append(value)
+            return value
+
+        if tag == BinaryCodec.STR_REF:
+            return self.strings[self.read_varint()]
+
+        if tag == BinaryCodec.INT_LIST:
+            value = []
+            prev = 0
+
+            for _ in range(0, self.read_varint()):
+                prev += self.read_int()
+                value.append(prev)
+
+            return value
+
+        if tag in (BinaryCodec.KEYS_NEW, BinaryCodec.KEYS_REF):
+            if tag == BinaryCodec.KEYS_NEW:
+                self.keys.append([self.read() for _ in range(0, self.read_varint())])
+
+            keys = self.keys[-1] if tag == BinaryCodec.KEYS_NEW else self.keys[self.read_varint()]
+
+            return {k: self.read() for k in keys}
+
+        if tag == BinaryCodec.LIST:
+            return [self.read() for _ in range(0, self.read_varint())]
+
+        if tag == BinaryCodec.DICT:
+            value = {}
+
+            for _ in range(0, self.read_varint()):
+                k = self.read()
+                value[k] = self.read()
+
+            return value
+
+        raise ValueError('The tag "%s" at position %s is not valid.' % (tag, self.pos - 1))
+
+
+CODECS = {JSONCodec.name: JSONCodec, BinaryCodec.name: BinaryCodec}
+
+
+def register_codec(codec_cls):
+    if not issubclass(codec_cls, Codec) or not codec_cls.name:
+        raise ValueError('The codec "%s" is not a named subclass of Codec.' % str(codec_cls))
+
+    CODECS[codec_cls.name] = codec_cls
+
+
+def get_codec(codec, **kwargs):
+    # Returns the codec as is if it is a codec instance. Otherwise, look up the codec by name
+    # and instantiate it with the given options such as compress.
+    if isinstance(codec, Codec):
+        return codec
+
+    if codec not in CODECS:
+        raise ValueError('The codec "%s" is not supported.' % str(codec))
+
+    return CODECS[codec](**kwargs)
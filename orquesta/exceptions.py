@@ -154,3 +154,9 @@ class UnreachableJoinError(OrquestaException):
 
 class WorkflowRehearsalError(OrquestaException):
     pass
+
+
+class ActionExecutorNotFound(OrquestaException):
+    def __init__(self, action):
+        message = 'There is no executor for action "%s".' % action
+        super(ActionExecutorNotFound, self).__init__(message)
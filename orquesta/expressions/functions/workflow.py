@@ -57,7 +57,21 @@ def task_status_(context, task_id, route=None):
     # If unable to identify the task flow entry and if there are other routes, then
     # use an earlier route before the split to find the specific task.
     if task_state_entry_idx is None:
-        if route > 0:
+        routes = workflow_state.get("routes")
+
+        # If the routes are stored as a trie, then look up the task from the nearest route
+        # where the current route is split from.
+        if route > 0 and hasattr(routes, "get_ancestors"):
+            for prev_route in routes.get_ancestors(route):
+                prev_task_state_entry_uid = constants.TASK_STATE_ROUTE_FORMAT % (
+                    task_id,
+                    str(prev_route),
+                )
+
+                if prev_task_state_entry_uid in task_state_pointers:
+                    return task_status_(context, task_id, route=prev_route)
+
+        elif route > 0:
             current_route_details = workflow_state["routes"][route]
             # Reverse the list because we want to start with the next longest route.
             for idx, prev_route_details in enumerate(reversed(workflow_state["routes"][:route])):
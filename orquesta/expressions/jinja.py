@@ -79,6 +79,8 @@ class JinjaEvaluator(expr_base.Evaluator):
     _regex_raw_block_pattern = "{% raw %}.*?{% endraw %}"
     _regex_raw_block_parser = re.compile(_regex_raw_block_pattern)
 
+    # The jinja environment is shared but not changed once the functions are registered. The
+    # templates are compiled and cached by the environment which is safe to use concurrently.
     _jinja_env = jinja2.Environment(
         undefined=jinja2.StrictUndefined, trim_blocks=True, lstrip_blocks=True
     )
@@ -17,6 +17,7 @@ import itertools
 import logging
 import re
 import six
+import threading
 
 import yaql
 import yaql.language.exceptions as yaql_exc
@@ -74,6 +75,9 @@ class YAQLEvaluator(expr_base.Evaluator):
     ]
 
     _engine = yaql.language.factory.YaqlFactory().create()
+    _engine_lock = threading.Lock()
+    _parsed = {}
+    _parsed_max_count = 4096
     _root_ctx = yaql.create_context()
     _custom_functions = register_functions(_root_ctx)
 
@@ -95,6 +99,29 @@ class YAQLEvaluator(expr_base.Evaluator):
 
         return ctx
 
+    @classmethod
+    def parse(cls, expr):
+        # The yaql engine shares the ply lexer and parser which keep the parsing state between
+        # calls so the expressions are parsed one at a time. The root context is not changed
+        # once the functions are registered and the parsed statement is evaluated in a child
+        # context so the evaluation can run concurrently outside of the lock.
+        # The parsed statements are cached by expression since the same expressions are
+        # evaluated repeatedly while the workflows are running.
+        statement = cls._parsed.get(expr)
+
+        if statement is not None:
+            return statement
+
+        with cls._engine_lock:
+            statement = cls._engine(expr)
+
+            if len(cls._parsed) >= cls._parsed_max_count:
+                cls._parsed.clear()
+
+            cls._parsed[expr] = statement
+
+        return statement
+
     @classmethod
     def get_statement_regex(cls):
         return cls._regex_pattern
@@ -118,7 +145,7 @@ class YAQLEvaluator(expr_base.Evaluator):
 
         for expr in cls._regex_parser.findall(text):
             try:
-                cls._engine(cls.strip_delimiter(expr))
+                cls.parse(cls.strip_delimiter(expr))
             except (yaql_exc.YaqlException, ValueError, TypeError) as e:
                 errors.append(expr_util.format_error(cls._type, expr, e))
 
@@ -139,7 +166,7 @@ class YAQLEvaluator(expr_base.Evaluator):
         try:
             for expr in exprs:
                 stripped = cls.strip_delimiter(expr)
-                result = cls._engine(stripped).evaluate(context=ctx)
+                result = cls.parse(stripped).evaluate(context=ctx)
 
                 if inspect.isgenerator(result):
                     result = list(result)
@@ -50,6 +50,17 @@ class WorkflowGraph(object):
         g = json_graph.adjacency_graph(json_util.deepcopy(data), directed=True, multigraph=True)
         return cls(graph=g)
 
+    def freeze(self):
+        # Freeze the graph model so the graph can be shared and the nodes and edges can no
+        # longer be added or removed.
+        nx.freeze(self._graph)
+
+        return self
+
+    @property
+    def frozen(self):
+        return nx.is_frozen(self._graph)
+
     @staticmethod
     def get_root_nodes(graph):
         nodes = [
@@ -72,6 +83,9 @@ class WorkflowGraph(object):
     def has_tasks(self):
         return len(self._graph) > 0
 
+    def get_task_ids(self):
+        return sorted(self._graph.nodes())
+
     def has_task(self, task_id):
         return self._graph.has_node(task_id)
 
@@ -197,8 +211,20 @@ class WorkflowGraph(object):
             for c in nx.simple_cycles(self._graph)
         ]
 
+    def is_split_task(self, task_id):
+        # The graphs composed before the split flag is recorded only list the split task in
+        # the splits of the task if the split task is not in a cycle.
+        task = self._graph.node[task_id]
+
+        return task.get("split", False) or task_id in task.get("splits", [])
+
     def in_cycle(self, task_id):
-        return [c for c in nx.simple_cycles(self._graph) if task_id in c]
+        # The composer flags the tasks in cycles. Otherwise, the task is in a cycle if the
+        # task can be reached from any of its next tasks.
+        if self._graph.node[task_id].get("cycle", False):
+            return True
+
+        return any(nx.has_path(self._graph, t, task_id) for t in self._graph.successors(task_id))
 
     def is_cycle_closed(self, cycle):
         # A cycle is closed, for a lack of better term, if there is no task
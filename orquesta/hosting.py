@@ -0,0 +1,187 @@
+# Copyright 2021 The StackStorm Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import logging
+import threading
+import ujson
+
+from orquesta import conducting
+
+LOG = logging.getLogger(__name__)
+
+
+class WorkflowConductorHost(object):
+    # Keeps the conductors of the workflow executions resident in memory by execution id so the
+    # conductor is not deserialized and serialized for each event. The least recently used
+    # conductors are evicted to the serialized form when there are more conductors than the max
+    # count or the total size of the serialized conductors is over the max size in bytes. The
+    # serialized conductor is passed to the writer on eviction and checkpoint if the conductor
+    # is changed since it is last written. The conductor that is not resident is deserialized
+    # from the serialized form kept by the host or returned by the loader. The conductor is
+    # closed when it is evicted or removed to release the local files of the item results.
+
+    def __init__(self, loader=None, writer=None, max_count=None, max_size=None, thread_safe=False):
+        if max_count is not None and max_count < 1:
+            raise ValueError('The value of "max_count" is not a positive integer.')
+
+        if max_size is not None and max_size < 1:
+            raise ValueError('The value of "max_size" is not a positive integer.')
+
+        self.loader = loader
+        self.writer = writer
+        self.max_count = max_count
+        self.max_size = max_size
+        self.thread_safe = thread_safe
+        self.size = 0
+        self.metrics = {"hits": 0, "misses": 0, "loads": 0, "writes": 0, "evictions": 0}
+        self._conductors = collections.OrderedDict()
+        self._serialized = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._conductors)
+
+    def __contains__(self, execution_id):
+        return execution_id in self._conductors
+
+    def put(self, execution_id, conductor):
+        if not isinstance(conductor, conducting.WorkflowConductor):
+            raise ValueError('The value of "conductor" is not type of WorkflowConductor.')
+
+        with self._lock:
+            self._remove(execution_id)
+            self._serialized.pop(execution_id, None)
+            self._add(execution_id, conductor, version=None)
+            self._evict(keep=execution_id)
+
+    def get(self, execution_id):
+        with self._lock:
+            entry = self._conductors.get(execution_id)
+
+            if entry:
+                self.metrics["hits"] += 1
+                self._conductors[execution_id] = self._conductors.pop(execution_id)
+                return entry["conductor"]
+
+            self.metrics["misses"] += 1
+            data = self._serialized.pop(execution_id, None)
+
+            if data is None and self.loader:
+                data = self.loader(execution_id)
+                self.metrics["loads"] += 1
+
+            if data is None:
+                raise KeyError(execution_id)
+
+            conductor = conducting.WorkflowConductor.deserialize(data, thread_safe=self.thread_safe)
+
+            # The conductor is not changed since it is loaded from the serialized form.
+            self._add(execution_id, conductor, version=conductor.workflow_state.version, data=data)
+            self._evict(keep=execution_id)
+
+            return conductor
+
+    def checkpoint(self, execution_id=None):
+        # Write the serialized conductor for the given execution or for all the resident
+        # conductors if it is changed since it is last written.
+        with self._lock:
+            execution_ids = [execution_id] if execution_id else list(self._conductors.keys())
+
+            for k in execution_ids:
+                if k in self._conductors:
+                    self._write(k)
+
+    def evict(self, execution_id):
+        with self._lock:
+            if execution_id not in self._conductors:
+                return
+
+            data = self._write(execution_id, serialize=not self.writer)
+            self._conductors[execution_id]["conductor"].close()
+            self._remove(execution_id)
+            self.metrics["evictions"] += 1
+
+            # Keep the serialized conductor if there is no writer to write it back to.
+            if not self.writer:
+                self._serialized[execution_id] = data
+
+    def remove(self, execution_id):
+        # Remove the execution without writing it back, such as when the execution is completed.
+        with self._lock:
+            if execution_id in self._conductors:
+                self._conductors[execution_id]["conductor"].close()
+
+            self._remove(execution_id)
+            self._serialized.pop(execution_id, None)
+
+    def _add(self, execution_id, conductor, version=None, data=None):
+        entry = {"conductor": conductor, "version": version, "size": 0}
+
+        if self.max_size is not None:
+            data = data if data is not None else conductor.serialize(copy=False)
+            entry["size"] = len(ujson.dumps(data))  # pylint: disable=no-member
+            self.size += entry["size"]
+
+        self._conductors[execution_id] = entry
+
+    def _remove(self, execution_id):
+        entry = self._conductors.pop(execution_id, None)
+
+        if entry:
+            self.size -= entry["size"]
+
+    def _write(self, execution_id, serialize=False):
+        entry = self._conductors[execution_id]
+        conductor = entry["conductor"]
+        version = conductor.workflow_state.version
+        changed = entry["version"] != version
+
+        # Skip serializing the conductor if it is not changed and the data is not needed.
+        if not changed and not serialize:
+            return None
+
+        # The serialized conductor is copied since the writer or the host on eviction keeps it
+        # while the caller may still hold and change the conductor.
+        data = conductor.serialize()
+
+        # Update the size of the conductor since the conductor may have grown since then.
+        if self.max_size is not None:
+            size = len(ujson.dumps(data))  # pylint: disable=no-member
+            self.size += size - entry["size"]
+            entry["size"] = size
+
+        if self.writer and changed:
+            self.writer(execution_id, data)
+            self.metrics["writes"] += 1
+
+        entry["version"] = version
+
+        return data
+
+    def _evict(self, keep=None):
+        # Evict the least recently used conductors until the host is within the budget. The
+        # conductor that is just added is kept even if it is over the max size on its own.
+        for execution_id in list(self._conductors.keys()):
+            over_count = self.max_count is not None and len(self._conductors) > self.max_count
+            over_size = self.max_size is not None and self.size > self.max_size
+
+            if not over_count and not over_size:
+                break
+
+            if execution_id == keep:
+                continue
+
+            LOG.debug('Evicting conductor for workflow execution "%s".', execution_id)
+            self.evict(execution_id)
@@ -18,7 +18,6 @@ import logging
 from orquesta import events
 from orquesta import exceptions as exc
 from orquesta import statuses
-from orquesta.utils import jsonify as json_util
 
 
 LOG = logging.getLogger(__name__)
@@ -525,18 +524,18 @@ class TaskStateMachine(object):
         ]
 
         if ac_ex_event.status in requirements:
-            # Make a copy of the items and remove current item under evaluation.
-            staged_task = workflow_state.get_staged_task(task_id, task_route)
-            items = json_util.deepcopy(staged_task["items"])
-            del items[ac_ex_event.item_id]
-            items_status = [item.get("status", statuses.UNSET) for item in items]
+            # Count the status of the items excluding the current item under evaluation.
+            items = workflow_state.get_staged_task_items(task_id, task_route)
+            item_id = ac_ex_event.item_id
+            remaining = len(items.items) - 1
 
             # Assess various situations.
-            active = list(filter(lambda x: x in statuses.ACTIVE_STATUSES, items_status))
-            incomplete = list(filter(lambda x: x not in statuses.COMPLETED_STATUSES, items_status))
-            paused = list(filter(lambda x: x in [statuses.PENDING, statuses.PAUSED], items_status))
-            canceled = list(filter(lambda x: x == statuses.CANCELED, items_status))
-            failed = list(filter(lambda x: x in statuses.ABENDED_STATUSES, items_status))
+            active = items.count(statuses.ACTIVE_STATUSES, exclude=item_id)
+            completed = items.count(statuses.COMPLETED_STATUSES, exclude=item_id)
+            incomplete = remaining - completed
+            paused = items.count([statuses.PENDING, statuses.PAUSED], exclude=item_id)
+            canceled = items.count([statuses.CANCELED], exclude=item_id)
+            failed = items.count(statuses.ABENDED_STATUSES, exclude=item_id)
 
             # Attach info on whether task is still active or dormant.
             action_event += "_task_active" if active else "_task_dormant"
@@ -595,12 +594,11 @@ class TaskStateMachine(object):
     def add_context_to_workflow_event(cls, workflow_state, task_id, task_route, wf_ex_event):
         workflow_event = wf_ex_event.name
         requirements = statuses.PAUSE_STATUSES + statuses.CANCEL_STATUSES
-        staged_task = workflow_state.get_staged_task(task_id, task_route)
+        items = workflow_state.get_staged_task_items(task_id, task_route)
 
-        if wf_ex_event.status in requirements and staged_task and "items" in staged_task:
-            items_status = [item.get("status", statuses.UNSET) for item in staged_task["items"]]
-            active = list(filter(lambda x: x in statuses.ACTIVE_STATUSES, items_status))
-            incomplete = list(filter(lambda x: x not in statuses.COMPLETED_STATUSES, items_status))
+        if wf_ex_event.status in requirements and items:
+            active = items.count(statuses.ACTIVE_STATUSES)
+            incomplete = len(items.items) - items.count(statuses.COMPLETED_STATUSES)
             workflow_event += "_task_active" if active else "_task_dormant"
             workflow_event += "_items_incomplete" if incomplete else "_items_completed"
 
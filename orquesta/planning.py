@@ -0,0 +1,146 @@
+# Copyright 2021 The StackStorm Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+from orquesta import exceptions as exc
+from orquesta.expressions import base as expr_base
+from orquesta import graphing
+from orquesta.specs import base as spec_base
+from orquesta.utils import jsonify as json_util
+
+
+LOG = logging.getLogger(__name__)
+
+
+class ExecutionPlan(object):
+    # The execution plan is compiled from the workflow spec and graph so the conductor does not
+    # traverse the spec and graph to look up the task transitions and attributes while the
+    # workflow is running. The tasks are indexed by integer id and the attributes of the tasks
+    # are kept in tuples indexed by the task id. The outbound and inbound task transitions are
+    # presorted by task name in the same format as the transitions returned by the graph. The
+    # plan is read only once compiled and is shared by the conductors of the same workflow.
+
+    def __init__(self, tasks, outbounds, inbounds, barriers, retries, splits, cycles):
+        self.tasks = tuple(tasks)
+        self.task_ids = {task_name: i for i, task_name in enumerate(self.tasks)}
+        self.outbounds = tuple(tuple(tuple(t) for t in ts) for ts in outbounds)
+        self.inbounds = tuple(tuple(tuple(t) for t in ts) for ts in inbounds)
+        self.inbound_counts = tuple(len(set(t[0] for t in ts)) for ts in self.inbounds)
+        self.barriers = tuple(barriers)
+        self.barrier_tasks = frozenset(t for t, b in zip(self.tasks, self.barriers) if b)
+        self.retries = tuple(retries)
+        self.splits = tuple(splits)
+        self.cycles = tuple(cycles)
+
+    def __len__(self):
+        return len(self.tasks)
+
+    @classmethod
+    def compile(cls, spec, graph):
+        if not spec or not isinstance(spec, spec_base.Spec):
+            raise ValueError('The value of "spec" is not type of Spec.')
+
+        if not graph or not isinstance(graph, graphing.WorkflowGraph):
+            raise ValueError('The value of "graph" is not type of WorkflowGraph.')
+
+        tasks = graph.get_task_ids()
+        outbounds = [graph.get_next_transitions(t) for t in tasks]
+        inbounds = [graph.get_prev_transitions(t) for t in tasks]
+
+        # The plan keeps the task transition criteria as expression strings so the plan can be
+        # serialized. Validating the criteria here only warms the cache of parsed statements in
+        # the expression evaluators, which is keyed by expression and shared by the process.
+        for transitions in outbounds:
+            for transition in transitions:
+                expr_base.validate(transition[3].get("criteria") or [])
+
+        return cls(
+            tasks,
+            json_util.deepcopy(outbounds),
+            json_util.deepcopy(inbounds),
+            [graph.get_barrier(t) for t in tasks],
+            [graph.get_task_retry_spec(t) for t in tasks],
+            [graph.is_split_task(t) for t in tasks],
+            [graph.in_cycle(t) for t in tasks],
+        )
+
+    def get_task_id(self, task_name):
+        if task_name not in self.task_ids:
+            raise exc.InvalidTask(task_name)
+
+        return self.task_ids[task_name]
+
+    def has_task(self, task_name):
+        return task_name in self.task_ids
+
+    def get_next_transitions(self, task_name):
+        return self.outbounds[self.get_task_id(task_name)]
+
+    def get_prev_transitions(self, task_name):
+        return self.inbounds[self.get_task_id(task_name)]
+
+    def get_inbound_task_count(self, task_name):
+        return self.inbound_counts[self.get_task_id(task_name)]
+
+    def get_barriers(self):
+        return self.barrier_tasks
+
+    def get_barrier(self, task_name):
+        return self.barriers[self.get_task_id(task_name)]
+
+    def has_barrier(self, task_name):
+        b = self.get_barrier(task_name)
+
+        return b is not None and b != ""
+
+    def get_task_retry_spec(self, task_name):
+        # The retry spec is copied since the retry spec is shared by the conductors.
+        return json_util.deepcopy(self.retries[self.get_task_id(task_name)])
+
+    def task_has_retry(self, task_name):
+        r = self.retries[self.get_task_id(task_name)]
+
+        return r is not None and isinstance(r, dict) and "count" in r
+
+    def is_split_task(self, task_name):
+        return self.splits[self.get_task_id(task_name)]
+
+    def in_cycle(self, task_name):
+        return self.cycles[self.get_task_id(task_name)]
+
+    def serialize(self):
+        return {
+            "tasks": list(self.tasks),
+            "outbounds": json_util.deepcopy([list(map(list, ts)) for ts in self.outbounds]),
+            "inbounds": json_util.deepcopy([list(map(list, ts)) for ts in self.inbounds]),
+            "barriers": list(self.barriers),
+            "retries": json_util.deepcopy(list(self.retries)),
+            "splits": list(self.splits),
+            "cycles": list(self.cycles),
+        }
+
+    @classmethod
+    def deserialize(cls, data):
+        data = json_util.deepcopy(data)
+
+        return cls(
+            data["tasks"],
+            data["outbounds"],
+            data["inbounds"],
+            data["barriers"],
+            data["retries"],
+            data["splits"],
+            data["cycles"],
+        )
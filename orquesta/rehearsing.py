@@ -324,7 +324,7 @@ class WorkflowRehearsal(unittest.TestCase):
 
         run_q = queue.Queue()
         running_q = queue.Queue()
-        items_task_accum_result = {}
+        items_task_count = {}
 
         # Inspect workflow spec and check for errors.
         self.assert_spec_inspection()
@@ -410,25 +410,17 @@ class WorkflowRehearsal(unittest.TestCase):
                         current_fq_task_id,
                     )
                 else:
-                    if current_task_id not in items_task_accum_result:
-                        items_task_accum_result[current_task_id] = []
-
-                    len_accum_result = len(items_task_accum_result[current_task_id])
+                    # The conductor accumulates the item results so only the number of
+                    # items is tracked here to assign the item id if not given.
+                    items_count = items_task_count.get(current_task_id, 0)
 
                     if ac_ex.item_id is None:
-                        ac_ex.item_id = len_accum_result
-
-                    if ac_ex.item_id > len_accum_result - 1:
-                        placeholders = [None] * (ac_ex.item_id - len_accum_result + 1)
-                        items_task_accum_result[current_task_id].extend(placeholders)
+                        ac_ex.item_id = items_count
 
-                    items_task_accum_result[current_task_id][ac_ex.item_id] = ac_ex.result
+                    items_task_count[current_task_id] = max(items_count, ac_ex.item_id + 1)
 
                     ac_ex_event = events.TaskItemActionExecutionEvent(
-                        ac_ex.item_id,
-                        ac_ex.status,
-                        result=ac_ex.result,
-                        accumulated_result=items_task_accum_result[current_task_id],
+                        ac_ex.item_id, ac_ex.status, result=ac_ex.result
                     )
 
                     LOG.debug(
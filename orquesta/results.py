@@ -0,0 +1,163 @@
+# Copyright 2021 The StackStorm Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import six
+import tempfile
+import ujson
+import weakref
+
+
+LOG = logging.getLogger(__name__)
+
+
+class ItemResultStore(object):
+    # Append-only store of the results of the items of a with items task. The results are
+    # kept in memory until the size of the results exceeds the spill size. The results are
+    # then moved to a local file and any result appended afterwards is written to the file.
+    # If the result of an item is appended again, the latest result is returned for the item.
+    # The file is local to the store and the spilled results are inlined when serialized. The
+    # file is kept open while the results are spilled and is removed when the store is closed
+    # or garbage collected.
+
+    def __init__(self, items_count, spill_size=None):
+        self.items_count = items_count
+        self.spill_size = spill_size
+        self.size = 0
+        self.path = None
+        self._file = None
+        self._finalizer = None
+        self._results = {}
+        self._offsets = {}
+
+    def __len__(self):
+        return len(self._results) + len(self._offsets)
+
+    def __contains__(self, item_id):
+        return item_id in self._results or item_id in self._offsets
+
+    @property
+    def spilled(self):
+        return self.path is not None
+
+    def append(self, item_id, result):
+        if item_id < 0 or item_id >= self.items_count:
+            raise IndexError('The item "%s" is out of range.' % str(item_id))
+
+        if self.spilled:
+            self._write(item_id, ujson.dumps(result))  # pylint: disable=no-member
+            return
+
+        self._results[item_id] = result
+
+        if self.spill_size is not None:
+            self.size += len(ujson.dumps(result))  # pylint: disable=no-member
+
+            if self.size > self.spill_size:
+                self.spill()
+
+    def spill(self):
+        if self.spilled:
+            return
+
+        fd, self.path = tempfile.mkstemp(prefix="orquesta-", suffix=".results")
+        self._file = os.fdopen(fd, "w+b")
+        self._finalizer = weakref.finalize(self, self._remove_file, self._file, self.path)
+
+        LOG.debug('Spilling results of %s items to "%s".', str(len(self._results)), self.path)
+
+        for item_id, result in sorted(six.iteritems(self._results), key=lambda x: x[0]):
+            self._write(item_id, ujson.dumps(result))  # pylint: disable=no-member
+
+        self._results = {}
+
+    @staticmethod
+    def _remove_file(f, path):
+        f.close()
+
+        if os.path.isfile(path):
+            os.remove(path)
+
+    def _write(self, item_id, data):
+        data = (data + "\n").encode("utf-8")
+
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(data)
+
+        self._offsets[item_id] = (offset, len(data))
+
+    def get(self, item_id):
+        if item_id in self._results:
+            return self._results[item_id]
+
+        if item_id not in self._offsets:
+            return None
+
+        return self._read(item_id)
+
+    def _read(self, item_id):
+        offset, length = self._offsets[item_id]
+        self._file.seek(offset)
+
+        return ujson.loads(self._file.read(length).decode("utf-8"))  # pylint: disable=no-member
+
+    def materialize(self):
+        # Returns the list of results up to the last item with result. The result is None for
+        # the items without result.
+        count = max(list(self._results.keys()) + list(self._offsets.keys()) + [-1]) + 1
+
+        return [
+            self._read(i) if i in self._offsets else self._results.get(i) for i in range(0, count)
+        ]
+
+    def close(self):
+        # Close and remove the file where the results are spilled.
+        if self._finalizer:
+            self._finalizer()
+
+        self.path = None
+        self._file = None
+        self._finalizer = None
+        self._results = {}
+        self._offsets = {}
+        self.size = 0
+
+    def serialize(self):
+        data = {"items_count": self.items_count}
+
+        # The spilled results are read back and inlined so the serialized store does not
+        # depend on the local file, which is removed once the task is no longer staged.
+        results = dict(self._results)
+        results.update({k: self._read(k) for k in self._offsets})
+
+        if results:
+            data["results"] = [[k, v] for k, v in sorted(six.iteritems(results))]
+
+        if self.spill_size is not None:
+            data["spill_size"] = self.spill_size
+            data["size"] = self.size
+
+        return data
+
+    @classmethod
+    def deserialize(cls, data):
+        # The results are kept in memory and are spilled again on the next append if the size
+        # of the results exceeds the spill size so restoring the store does not create a file.
+        instance = cls(data["items_count"], spill_size=data.get("spill_size"))
+        instance.size = data.get("size", 0)
+        instance._results = {k: v for k, v in data.get("results", [])}
+
+        return instance
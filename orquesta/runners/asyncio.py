@@ -0,0 +1,173 @@
+# Copyright 2021 The StackStorm Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+
+from orquesta import conducting
+from orquesta import constants
+from orquesta import events
+from orquesta import exceptions as exc
+from orquesta import statuses
+
+
+LOG = logging.getLogger(__name__)
+
+
+class WorkflowRunner(object):
+    # Runs a workflow in an asyncio event loop. The actions are run by the coroutine executors
+    # registered by action name which are called with the action spec and the task. The result
+    # returned by the executor is reported as succeeded, any exception raised is reported as
+    # failed, and the cancellation of the executor is reported as canceled. The actions are run
+    # concurrently up to the given concurrency while the events are applied to the conductor one
+    # at a time in the order the executions are completed.
+
+    def __init__(self, conductor, executors=None, default_executor=None, concurrency=None):
+        if not isinstance(conductor, conducting.WorkflowConductor):
+            raise ValueError('The value of "conductor" is not type of WorkflowConductor.')
+
+        if concurrency is not None and (not isinstance(concurrency, int) or concurrency < 1):
+            raise ValueError('The value of "concurrency" is not a positive integer.')
+
+        self.conductor = conductor
+        self.executors = executors or {}
+        self.default_executor = default_executor
+        self.concurrency = concurrency
+        self._events = None
+        self._semaphore = None
+        self._inflight = 0
+        self._tasks = set()
+
+    async def run(self):
+        self._events = asyncio.Queue()
+        self._semaphore = asyncio.Semaphore(self.concurrency) if self.concurrency else None
+        self._inflight = 0
+        self._tasks = set()
+
+        if self.conductor.get_workflow_status() == statuses.UNSET:
+            self.conductor.request_workflow_status(statuses.RUNNING)
+
+        self._dispatch()
+
+        # Apply the events as they come in and dispatch the tasks that are ready afterwards.
+        while self._inflight > 0:
+            task_id, route, event, completed = await self._events.get()
+
+            if completed:
+                self._inflight -= 1
+
+            self.conductor.update_task_state(task_id, route, event)
+            self._dispatch()
+
+        self.conductor.render_workflow_output()
+
+        return self.conductor.get_workflow_status()
+
+    def _dispatch(self):
+        for task in self.conductor.get_next_tasks():
+            task_id = task["id"]
+            route = task["route"]
+            delay = task.get("delay") or 0
+
+            LOG.debug(
+                'Dispatching task "%s".', constants.TASK_STATE_ROUTE_FORMAT % (task_id, str(route))
+            )
+
+            # The task with an empty list of items is completed without running any action.
+            if task.get("items_count") == 0:
+                self.conductor.update_task_state(
+                    task_id, route, events.ActionExecutionEvent(statuses.RUNNING)
+                )
+
+                event = events.ActionExecutionEvent(statuses.SUCCEEDED, result=[])
+                self._put_event(task_id, route, event, completed=True)
+                self._inflight += 1
+                continue
+
+            # The actions are set to running before the actions are scheduled so the actions
+            # are not returned again in the next tasks. The delay is waited on by the action.
+            # The scheduled tasks are referenced until done so they are not garbage collected.
+            for action in task["actions"]:
+                event = self._make_event(action, statuses.RUNNING)
+                self.conductor.update_task_state(task_id, route, event)
+                self._inflight += 1
+                future = asyncio.ensure_future(self._execute(task, action, delay))
+                self._tasks.add(future)
+                future.add_done_callback(self._tasks.discard)
+
+    def _make_event(self, action, status, result=None):
+        if action.get("item_id") is None:
+            return events.ActionExecutionEvent(status, result=result)
+
+        return events.TaskItemActionExecutionEvent(action["item_id"], status, result=result)
+
+    def _put_event(self, task_id, route, event, completed=False):
+        self._events.put_nowait((task_id, route, event, completed))
+
+    async def _execute(self, task, action, delay=0):
+        # The completion event is always posted so the run does not wait on the action forever.
+        # If the action is cancelled, the action is reported as canceled and the cancellation is
+        # propagated. If the action is interrupted by any other exception, it is reported as failed.
+        event = None
+
+        try:
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if self._semaphore:
+                async with self._semaphore:
+                    result = await self._run_action(task, action)
+            else:
+                result = await self._run_action(task, action)
+
+            event = self._make_event(action, statuses.SUCCEEDED, result=result)
+        except asyncio.CancelledError:
+            LOG.warning('Action "%s" of task "%s" is canceled.', action["action"], task["id"])
+            event = self._make_event(action, statuses.CANCELED)
+            raise
+        except Exception as e:
+            LOG.warning('Action "%s" of task "%s" failed. %s', action["action"], task["id"], e)
+            event = self._make_event(action, statuses.FAILED, result={"error": str(e)})
+        finally:
+            if event is None:
+                result = {"error": "The action execution is interrupted."}
+                event = self._make_event(action, statuses.FAILED, result=result)
+
+            self._put_event(task["id"], task["route"], event, completed=True)
+
+    async def _run_action(self, task, action):
+        # The task without action is completed without calling any executor.
+        if action.get("action") is None:
+            return None
+
+        executor = self.executors.get(action["action"], self.default_executor)
+
+        if not executor:
+            raise exc.ActionExecutorNotFound(action["action"])
+
+        return await executor(action, task)
+
+
+def run(conductor, executors=None, default_executor=None, concurrency=None):
+    # Run the workflow to completion in a new event loop and return the workflow status.
+    runner = WorkflowRunner(
+        conductor, executors=executors, default_executor=default_executor, concurrency=concurrency
+    )
+
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(runner.run())
+    finally:
+        loop.close()
@@ -153,56 +153,70 @@ class TaskSpec(native_v1_specs.Spec):
     def has_retry(self):
         return hasattr(self, "retry") and self.retry
 
-    def render(self, in_ctx):
-        action_specs = []
+    def get_items_keys(self):
+        items_spec = self.get_items_spec()
 
-        if not self.has_items():
-            action_spec = {
-                "action": expr_base.evaluate(self.action, in_ctx),
-                "input": expr_base.evaluate(getattr(self, "input", {}), in_ctx),
-            }
+        if " in " not in items_spec.items:
+            return None
 
-            action_specs.append(action_spec)
+        return items_spec.items[: items_spec.items.index(" in ")].replace(" ", "").split(",")
+
+    def get_items(self, in_ctx):
+        items_spec = self.get_items_spec()
+
+        if " in " not in items_spec.items:
+            items_expr = items_spec.items.strip()
         else:
-            items_spec = self.get_items_spec()
+            start_idx = items_spec.items.index(" in ") + 4
+            items_expr = items_spec.items[start_idx:].strip()
 
-            if " in " not in items_spec.items:
-                items_expr = items_spec.items.strip()
-            else:
-                start_idx = items_spec.items.index(" in ") + 4
-                items_expr = items_spec.items[start_idx:].strip()
+        items = expr_base.evaluate(items_expr, in_ctx)
 
-            items = expr_base.evaluate(items_expr, in_ctx)
+        if not isinstance(items, list):
+            raise TypeError('The value of "%s" is not type of list.' % items_expr)
 
-            if not isinstance(items, list):
-                raise TypeError('The value of "%s" is not type of list.' % items_expr)
+        return items
 
-            item_keys = (
-                None
-                if " in " not in items_spec.items
-                else items_spec.items[: items_spec.items.index(" in ")].replace(" ", "").split(",")
-            )
+    def render_item(self, in_ctx, item_id, item, item_keys=None):
+        if item_keys and (isinstance(item, tuple) or isinstance(item, list)):
+            item = dict(zip(item_keys, list(item)))
+        elif item_keys and len(item_keys) == 1:
+            item = {item_keys[0]: item}
 
-            for idx, item in enumerate(items):
-                if item_keys and (isinstance(item, tuple) or isinstance(item, list)):
-                    item = dict(zip(item_keys, list(item)))
-                elif item_keys and len(item_keys) == 1:
-                    item = {item_keys[0]: item}
+        item_ctx_value = ctx_util.set_current_item(in_ctx, item)
 
-                item_ctx_value = ctx_util.set_current_item(in_ctx, item)
+        action_spec = {
+            "action": expr_base.evaluate(self.action, item_ctx_value),
+            "input": expr_base.evaluate(getattr(self, "input", {}), item_ctx_value),
+            "item_id": item_id,
+        }
 
-                action_spec = {
-                    "action": expr_base.evaluate(self.action, item_ctx_value),
-                    "input": expr_base.evaluate(getattr(self, "input", {}), item_ctx_value),
-                    "item_id": idx,
-                }
+        return action_spec
+
+    def render_items(self, in_ctx, items, item_ids=None):
+        # Render the action specs lazily so only the items that are consumed are rendered.
+        item_keys = self.get_items_keys()
 
-                action_specs.append(action_spec)
+        for item_id in range(0, len(items)) if item_ids is None else item_ids:
+            yield self.render_item(in_ctx, item_id, items[item_id], item_keys=item_keys)
+
+    def render(self, in_ctx):
+        action_specs = []
+
+        if not self.has_items():
+            action_spec = {
+                "action": expr_base.evaluate(self.action, in_ctx),
+                "input": expr_base.evaluate(getattr(self, "input", {}), in_ctx),
+            }
+
+            action_specs.append(action_spec)
+        else:
+            action_specs = list(self.render_items(in_ctx, self.get_items(in_ctx)))
 
         return self, action_specs
 
     def finalize_context(self, next_task_name, task_transition_meta, in_ctx):
-        rolling_ctx = json_util.deepcopy(in_ctx)
+        rolling_ctx = ctx_util.derive_context(in_ctx)
         new_ctx = {}
         errors = []
 
@@ -222,7 +236,7 @@ class TaskSpec(native_v1_specs.Spec):
                 except exc.ExpressionEvaluationException as e:
                     errors.append(e)
 
-        out_ctx = dict_util.merge_dicts(in_ctx, new_ctx, overwrite=True)
+        out_ctx = dict_util.merge_dicts_copy(in_ctx, new_ctx, overwrite=True)
 
         for key in list(out_ctx.keys()):
             if key.startswith("__"):
@@ -624,7 +638,7 @@ class WorkflowSpec(native_v1_specs.Spec):
         super(WorkflowSpec, self).__init__(spec, name=name, member=member)
 
     def render_input(self, runtime_inputs, in_ctx=None):
-        rolling_ctx = json_util.deepcopy(in_ctx) if in_ctx else {}
+        rolling_ctx = ctx_util.derive_context(in_ctx)
         errors = []
 
         for input_spec in getattr(self, "input") or []:
@@ -646,7 +660,7 @@ class WorkflowSpec(native_v1_specs.Spec):
         return rolling_ctx, errors
 
     def render_vars(self, in_ctx):
-        rolling_ctx = json_util.deepcopy(in_ctx)
+        rolling_ctx = ctx_util.derive_context(in_ctx)
         rendered_vars = {}
         errors = []
 
@@ -665,7 +679,7 @@ class WorkflowSpec(native_v1_specs.Spec):
 
     def render_output(self, in_ctx):
         output_specs = getattr(self, "output") or []
-        rolling_ctx = json_util.deepcopy(in_ctx)
+        rolling_ctx = ctx_util.derive_context(in_ctx)
         rendered_outputs = {}
         errors = []
 
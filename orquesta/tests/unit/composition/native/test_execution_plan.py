@@ -0,0 +1,104 @@
+# Copyright 2021 The StackStorm Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from orquesta import exceptions as exc
+from orquesta import graphing
+from orquesta import planning
+from orquesta.tests.unit.composition.native import base
+
+
+class ExecutionPlanTest(base.OrchestraWorkflowComposerTest):
+    def compile_plan(self, wf_name):
+        wf_def = self.get_wf_def(wf_name)
+        wf_spec = self.spec_module.instantiate(wf_def)
+        wf_graph = self.composer.compose(wf_spec)
+
+        return planning.ExecutionPlan.compile(wf_spec, wf_graph), wf_graph
+
+    def test_compile(self):
+        plan, graph = self.compile_plan("join")
+
+        self.assertTupleEqual(plan.tasks, tuple("task%s" % i for i in range(1, 8)))
+        self.assertEqual(plan.get_task_id("task6"), 5)
+        self.assertRaises(exc.InvalidTask, plan.get_task_id, "task9")
+
+        for task_id in plan.tasks:
+            self.assertListEqual(
+                list(map(list, plan.get_next_transitions(task_id))),
+                list(map(list, graph.get_next_transitions(task_id))),
+            )
+
+        self.assertEqual(plan.get_barrier("task6"), "*")
+        self.assertTrue(plan.has_barrier("task6"))
+        self.assertFalse(plan.has_barrier("task5"))
+        self.assertSetEqual(set(plan.get_barriers()), {"task6"})
+        self.assertEqual(plan.get_inbound_task_count("task6"), 2)
+        self.assertEqual(plan.get_inbound_task_count("task1"), 0)
+
+        # Check the compiled plan is the same after serialization.
+        other = planning.ExecutionPlan.deserialize(plan.serialize())
+        self.assertDictEqual(other.serialize(), plan.serialize())
+        self.assertTupleEqual(other.outbounds, plan.outbounds)
+
+    def test_compile_splits_and_cycles(self):
+        plan, _ = self.compile_plan("splits")
+
+        self.assertListEqual([t for t in plan.tasks if plan.is_split_task(t)], ["task4", "task8"])
+        self.assertFalse(any(plan.in_cycle(t) for t in plan.tasks))
+
+        plan, _ = self.compile_plan("cycle-fork")
+
+        self.assertListEqual(
+            [t for t in plan.tasks if plan.in_cycle(t)], ["decide_work", "query", "toil"]
+        )
+        self.assertTrue(plan.is_split_task("query"))
+
+    def test_compile_graph_without_flags(self):
+        for wf_name in ["splits", "cycle-fork", "cycles"]:
+            plan, graph = self.compile_plan(wf_name)
+
+            # Remove the split and cycle flags like the graphs composed before the flags.
+            data = graph.serialize()
+
+            for node in data["nodes"]:
+                node.pop("split", None)
+                node.pop("cycle", None)
+
+            graph = graphing.WorkflowGraph.deserialize(data)
+            other = planning.ExecutionPlan.compile(self.get_wf_spec(wf_name), graph)
+
+            self.assertTupleEqual(other.cycles, plan.cycles)
+
+            self.assertListEqual(
+                [s and not c for s, c in zip(other.splits, other.cycles)],
+                [s and not c for s, c in zip(plan.splits, plan.cycles)],
+            )
+
+    def test_compile_retry(self):
+        plan, _ = self.compile_plan("task-retry-spec")
+
+        self.assertTrue(plan.task_has_retry("task1"))
+        self.assertFalse(plan.task_has_retry("task2"))
+
+        # Check the retry spec returned is a copy.
+        retry_spec = plan.get_task_retry_spec("task1")
+        self.assertDictEqual(retry_spec, {"when": "<% failed() %>", "delay": 1, "count": 3})
+        retry_spec["count"] = 1
+        self.assertEqual(plan.get_task_retry_spec("task1")["count"], 3)
+
+    def test_bad_compile_args(self):
+        plan, graph = self.compile_plan("sequential")
+
+        self.assertRaises(ValueError, planning.ExecutionPlan.compile, None, graph)
+        self.assertRaises(ValueError, planning.ExecutionPlan.compile, graph, graph)
@@ -22,7 +22,12 @@ class CyclicWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
         expected_wf_graph = {
             "directed": True,
             "graph": {},
-            "nodes": [{"id": "prep"}, {"id": "task1"}, {"id": "task2"}, {"id": "task3"}],
+            "nodes": [
+                {"id": "prep"},
+                {"id": "task1", "split": True, "cycle": True},
+                {"id": "task2", "cycle": True},
+                {"id": "task3", "cycle": True},
+            ],
             "adjacency": [
                 [{"id": "task1", "key": 0, "ref": 0, "criteria": ["<% succeeded() %>"]}],
                 [{"id": "task2", "key": 0, "ref": 0, "criteria": ["<% succeeded() %>"]}],
@@ -44,7 +49,12 @@ class CyclicWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
         expected_wf_ex_graph = {
             "directed": True,
             "graph": {},
-            "nodes": [{"id": "prep"}, {"id": "task1"}, {"id": "task2"}, {"id": "task3"}],
+            "nodes": [
+                {"id": "prep"},
+                {"id": "task1", "split": True, "cycle": True},
+                {"id": "task2", "cycle": True},
+                {"id": "task3", "cycle": True},
+            ],
             "adjacency": [
                 [{"id": "task1", "key": 0, "ref": 0, "criteria": ["<% succeeded() %>"]}],
                 [{"id": "task2", "key": 0, "ref": 0, "criteria": ["<% succeeded() %>"]}],
@@ -71,11 +81,11 @@ class CyclicWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
             "graph": {},
             "nodes": [
                 {"id": "prep"},
-                {"id": "task1"},
-                {"id": "task2"},
-                {"id": "task3"},
-                {"id": "task4"},
-                {"id": "task5"},
+                {"id": "task1", "split": True, "cycle": True},
+                {"id": "task2", "split": True, "cycle": True},
+                {"id": "task3", "cycle": True},
+                {"id": "task4", "cycle": True},
+                {"id": "task5", "cycle": True},
             ],
             "adjacency": [
                 [{"id": "task1", "key": 0, "ref": 0, "criteria": ["<% succeeded() %>"]}],
@@ -115,11 +125,11 @@ class CyclicWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
             "graph": {},
             "nodes": [
                 {"id": "prep"},
-                {"id": "task1"},
-                {"id": "task2"},
-                {"id": "task3"},
-                {"id": "task4"},
-                {"id": "task5"},
+                {"id": "task1", "split": True, "cycle": True},
+                {"id": "task2", "split": True, "cycle": True},
+                {"id": "task3", "cycle": True},
+                {"id": "task4", "cycle": True},
+                {"id": "task5", "cycle": True},
             ],
             "adjacency": [
                 [{"id": "task1", "key": 0, "ref": 0, "criteria": ["<% succeeded() %>"]}],
@@ -163,8 +173,8 @@ class CyclicWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
             "nodes": [
                 {"id": "init"},
                 {"id": "create"},
-                {"id": "rollback"},
-                {"id": "check"},
+                {"id": "rollback", "cycle": True},
+                {"id": "check", "split": True, "cycle": True},
                 {"id": "delete"},
             ],
             "adjacency": [
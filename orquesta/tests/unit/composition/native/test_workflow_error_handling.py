@@ -22,7 +22,11 @@ class ErrorHandlingWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
         expected_wf_graph = {
             "directed": True,
             "graph": {},
-            "nodes": [{"id": "task1"}, {"id": "task2"}, {"id": "continue", "splits": ["continue"]}],
+            "nodes": [
+                {"id": "task1"},
+                {"id": "task2"},
+                {"id": "continue", "split": True, "splits": ["continue"]},
+            ],
             "adjacency": [
                 [
                     {"id": "continue", "key": 0, "ref": 1, "criteria": ["<% failed() %>"]},
@@ -39,7 +43,11 @@ class ErrorHandlingWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
         expected_wf_ex_graph = {
             "directed": True,
             "graph": {},
-            "nodes": [{"id": "task1"}, {"id": "task2"}, {"id": "continue", "splits": ["continue"]}],
+            "nodes": [
+                {"id": "task1"},
+                {"id": "task2"},
+                {"id": "continue", "split": True, "splits": ["continue"]},
+            ],
             "adjacency": [
                 [
                     {"id": "continue", "key": 0, "ref": 1, "criteria": ["<% failed() %>"]},
@@ -92,7 +92,7 @@ class JoinWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
                 {"id": "task6"},
                 {"id": "task7"},
                 {"id": "task8", "barrier": 2},
-                {"id": "noop", "splits": ["noop"]},
+                {"id": "noop", "split": True, "splits": ["noop"]},
             ],
             "adjacency": [
                 [
@@ -138,7 +138,7 @@ class JoinWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
                 {"id": "task6"},
                 {"id": "task7"},
                 {"id": "task8", "barrier": 2},
-                {"id": "noop", "splits": ["noop"]},
+                {"id": "noop", "split": True, "splits": ["noop"]},
             ],
             "adjacency": [
                 [
@@ -26,7 +26,7 @@ class SplitWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
                 {"id": "task1"},
                 {"id": "task2"},
                 {"id": "task3"},
-                {"id": "task4", "splits": ["task4"]},
+                {"id": "task4", "split": True, "splits": ["task4"]},
                 {"id": "task5", "splits": ["task4"]},
                 {"id": "task6", "splits": ["task4"]},
                 {"id": "task7", "barrier": "*", "splits": ["task4"]},
@@ -58,7 +58,7 @@ class SplitWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
                 {"id": "task1"},
                 {"id": "task2"},
                 {"id": "task3"},
-                {"id": "task4", "splits": ["task4"]},
+                {"id": "task4", "split": True, "splits": ["task4"]},
                 {"id": "task5", "splits": ["task4"]},
                 {"id": "task6", "splits": ["task4"]},
                 {"id": "task7", "barrier": "*", "splits": ["task4"]},
@@ -93,11 +93,11 @@ class SplitWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
                 {"id": "task1"},
                 {"id": "task2"},
                 {"id": "task3"},
-                {"id": "task4", "splits": ["task4"]},
+                {"id": "task4", "split": True, "splits": ["task4"]},
                 {"id": "task5", "splits": ["task4"]},
                 {"id": "task6", "splits": ["task4"]},
                 {"id": "task7", "barrier": "*", "splits": ["task4"]},
-                {"id": "task8", "splits": ["task4", "task8"]},
+                {"id": "task8", "split": True, "splits": ["task4", "task8"]},
             ],
             "adjacency": [
                 [
@@ -128,11 +128,11 @@ class SplitWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
                 {"id": "task1"},
                 {"id": "task2"},
                 {"id": "task3"},
-                {"id": "task4", "splits": ["task4"]},
+                {"id": "task4", "split": True, "splits": ["task4"]},
                 {"id": "task5", "splits": ["task4"]},
                 {"id": "task6", "splits": ["task4"]},
                 {"id": "task7", "barrier": "*", "splits": ["task4"]},
-                {"id": "task8", "splits": ["task4", "task8"]},
+                {"id": "task8", "split": True, "splits": ["task4", "task8"]},
             ],
             "adjacency": [
                 [
@@ -166,10 +166,10 @@ class SplitWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
                 {"id": "task1"},
                 {"id": "task2"},
                 {"id": "task3"},
-                {"id": "task4", "splits": ["task4"]},
+                {"id": "task4", "split": True, "splits": ["task4"]},
                 {"id": "task5", "splits": ["task4"]},
                 {"id": "task6", "splits": ["task4"]},
-                {"id": "task7", "splits": ["task4", "task7"]},
+                {"id": "task7", "split": True, "splits": ["task4", "task7"]},
                 {"id": "task8", "splits": ["task4", "task7"]},
                 {"id": "task9", "splits": ["task4", "task7"]},
                 {"id": "task10", "barrier": "*", "splits": ["task4", "task7"]},
@@ -207,10 +207,10 @@ class SplitWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
                 {"id": "task1"},
                 {"id": "task2"},
                 {"id": "task3"},
-                {"id": "task4", "splits": ["task4"]},
+                {"id": "task4", "split": True, "splits": ["task4"]},
                 {"id": "task5", "splits": ["task4"]},
                 {"id": "task6", "splits": ["task4"]},
-                {"id": "task7", "splits": ["task4", "task7"]},
+                {"id": "task7", "split": True, "splits": ["task4", "task7"]},
                 {"id": "task8", "splits": ["task4", "task7"]},
                 {"id": "task9", "splits": ["task4", "task7"]},
                 {"id": "task10", "barrier": "*", "splits": ["task4", "task7"]},
@@ -249,15 +249,20 @@ class SplitWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
             "graph": [],
             "nodes": [
                 {"id": "task1"},
-                {"splits": ["task2"], "id": "task2"},
+                {"splits": ["task2"], "id": "task2", "split": True},
                 {"splits": ["task2"], "id": "task3"},
                 {"splits": ["task2"], "id": "task4"},
-                {"splits": ["task2", "task5"], "id": "task5"},
+                {"splits": ["task2", "task5"], "id": "task5", "split": True},
                 {"splits": ["task2", "task5"], "id": "task6"},
                 {"splits": ["task2", "task5"], "id": "task7"},
-                {"splits": ["task2", "task5", "task8"], "id": "task8"},
-                {"splits": ["task2", "task5", "task8", "task9"], "id": "task9"},
-                {"splits": ["task2", "task14", "task17"], "id": "task18"},
+                {"splits": ["task2", "task5", "task8"], "id": "task8", "split": True},
+                {"splits": ["task2", "task5", "task8", "task9"], "id": "task9", "split": True},
+                {
+                    "splits": ["task2", "task14", "task17"],
+                    "id": "task18",
+                    "split": True,
+                    "cycle": True,
+                },
                 {"id": "init"},
                 {"splits": ["task2", "task14", "task17"], "id": "task19"},
                 {
@@ -272,19 +277,26 @@ class SplitWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
                         "notify",
                     ],
                     "id": "notify",
+                    "split": True,
                 },
                 {"splits": ["task2", "task5", "task8", "task9", "task11"], "id": "task12"},
                 {"splits": ["task2", "task5", "task8", "task9", "task11"], "id": "task13"},
                 {"splits": ["task2", "task5", "task8", "task9"], "id": "task10"},
-                {"splits": ["task2", "task5", "task8", "task9", "task11"], "id": "task11"},
-                {"splits": ["task2", "task14"], "id": "task16"},
+                {
+                    "splits": ["task2", "task5", "task8", "task9", "task11"],
+                    "id": "task11",
+                    "split": True,
+                },
+                {"splits": ["task2", "task14"], "id": "task16", "split": True, "cycle": True},
                 {
                     "splits": ["task2", "task5", "task8", "task9", "task11", "task14", "task17"],
                     "id": "task17",
+                    "split": True,
                 },
                 {
                     "splits": ["task2", "task5", "task8", "task9", "task11", "task14"],
                     "id": "task14",
+                    "split": True,
                 },
                 {
                     "splits": ["task2", "task5", "task8", "task9", "task11", "task14"],
@@ -431,15 +443,20 @@ class SplitWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
             "graph": [],
             "nodes": [
                 {"id": "task1"},
-                {"splits": ["task2"], "id": "task2"},
+                {"splits": ["task2"], "id": "task2", "split": True},
                 {"splits": ["task2"], "id": "task3"},
                 {"splits": ["task2"], "id": "task4"},
-                {"splits": ["task2", "task5"], "id": "task5"},
+                {"splits": ["task2", "task5"], "id": "task5", "split": True},
                 {"splits": ["task2", "task5"], "id": "task6"},
                 {"splits": ["task2", "task5"], "id": "task7"},
-                {"splits": ["task2", "task5", "task8"], "id": "task8"},
-                {"splits": ["task2", "task5", "task8", "task9"], "id": "task9"},
-                {"splits": ["task2", "task14", "task17"], "id": "task18"},
+                {"splits": ["task2", "task5", "task8"], "id": "task8", "split": True},
+                {"splits": ["task2", "task5", "task8", "task9"], "id": "task9", "split": True},
+                {
+                    "splits": ["task2", "task14", "task17"],
+                    "id": "task18",
+                    "split": True,
+                    "cycle": True,
+                },
                 {"id": "init"},
                 {"splits": ["task2", "task14", "task17"], "id": "task19"},
                 {
@@ -454,19 +471,26 @@ class SplitWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
                         "notify",
                     ],
                     "id": "notify",
+                    "split": True,
                 },
                 {"splits": ["task2", "task5", "task8", "task9", "task11"], "id": "task12"},
                 {"splits": ["task2", "task5", "task8", "task9", "task11"], "id": "task13"},
                 {"splits": ["task2", "task5", "task8", "task9"], "id": "task10"},
-                {"splits": ["task2", "task5", "task8", "task9", "task11"], "id": "task11"},
-                {"splits": ["task2", "task14"], "id": "task16"},
+                {
+                    "splits": ["task2", "task5", "task8", "task9", "task11"],
+                    "id": "task11",
+                    "split": True,
+                },
+                {"splits": ["task2", "task14"], "id": "task16", "split": True, "cycle": True},
                 {
                     "splits": ["task2", "task5", "task8", "task9", "task11", "task14", "task17"],
                     "id": "task17",
+                    "split": True,
                 },
                 {
                     "splits": ["task2", "task5", "task8", "task9", "task11", "task14"],
                     "id": "task14",
+                    "split": True,
                 },
                 {
                     "splits": ["task2", "task5", "task8", "task9", "task11", "task14"],
@@ -96,7 +96,7 @@ class TaskTransitionWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
         expected_wf_graph = {
             "directed": True,
             "graph": {},
-            "nodes": [{"id": "task1"}, {"id": "task2", "splits": ["task2"]}],
+            "nodes": [{"id": "task1"}, {"id": "task2", "split": True, "splits": ["task2"]}],
             "adjacency": [
                 [
                     {"id": "task2", "key": 0, "ref": 0, "criteria": ["<% succeeded() %>"]},
@@ -112,7 +112,7 @@ class TaskTransitionWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
         expected_wf_ex_graph = {
             "directed": True,
             "graph": {},
-            "nodes": [{"id": "task1"}, {"id": "task2", "splits": ["task2"]}],
+            "nodes": [{"id": "task1"}, {"id": "task2", "split": True, "splits": ["task2"]}],
             "adjacency": [
                 [
                     {"id": "task2", "key": 0, "ref": 0, "criteria": ["<% succeeded() %>"]},
@@ -172,7 +172,7 @@ class TaskTransitionWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
         expected_wf_graph = {
             "directed": True,
             "graph": {},
-            "nodes": [{"id": "task1"}, {"id": "task2", "splits": ["task2"]}],
+            "nodes": [{"id": "task1"}, {"id": "task2", "split": True, "splits": ["task2"]}],
             "adjacency": [
                 [
                     {"id": "task2", "key": 0, "ref": 0, "criteria": []},
@@ -189,7 +189,7 @@ class TaskTransitionWorkflowComposerTest(base.OrchestraWorkflowComposerTest):
         expected_wf_ex_graph = {
             "directed": True,
             "graph": {},
-            "nodes": [{"id": "task1"}, {"id": "task2", "splits": ["task2"]}],
+            "nodes": [{"id": "task1"}, {"id": "task2", "split": True, "splits": ["task2"]}],
             "adjacency": [
                 [
                     {"id": "task2", "key": 0, "ref": 0, "criteria": []},
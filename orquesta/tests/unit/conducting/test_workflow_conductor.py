@@ -12,6 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import mock
+import ujson
+
 from orquesta import conducting
 from orquesta import exceptions as exc
 from orquesta import graphing
@@ -302,6 +305,77 @@ class WorkflowConductorTest(test_base.WorkflowConductorTest):
         self.assertEqual(len(conductor.workflow_state.tasks), 5)
         self.assertEqual(len(conductor.workflow_state.sequence), 5)
 
+    def test_serialization_without_copy(self):
+        inputs = {"a": 123, "b": True}
+        conductor = self._prep_conductor(inputs=inputs, status=statuses.RUNNING)
+        self.forward_task_statuses(conductor, "task1", [statuses.RUNNING, statuses.SUCCEEDED])
+
+        # Check the serialized conductor is the same but shares the live structures.
+        data = conductor.serialize(copy=False)
+        self.assertDictEqual(data, conductor.serialize())
+        self.assertIs(data["input"], conductor.get_workflow_input(copy=False))
+        self.assertIs(data["context"], conductor.get_workflow_parent_context(copy=False))
+        self.assertIs(data["log"], conductor.log)
+        self.assertIs(data["errors"], conductor.errors)
+        self.assertIs(data["state"]["contexts"], conductor.workflow_state.contexts)
+        self.assertIs(data["state"]["sequence"], conductor.workflow_state.sequence)
+        self.assertIs(data["state"]["tasks"], conductor.workflow_state.tasks)
+
+        # Check the serialized conductor is copied by default.
+        data = conductor.serialize()
+        self.assertIsNot(data["input"], conductor.get_workflow_input(copy=False))
+        self.assertIsNot(data["state"]["tasks"], conductor.workflow_state.tasks)
+        self.assertIsNot(conductor.get_workflow_input(), conductor.get_workflow_input(copy=False))
+
+        # Check the conductor deserialized without copy owns the data.
+        other = conducting.WorkflowConductor.deserialize(data, copy=False)
+        self.assertIs(other.workflow_state.tasks, data["state"]["tasks"])
+        self.assertDictEqual(other.serialize(), conductor.serialize())
+
+    def test_deserialization_shares_definition(self):
+        conducting.DEFINITIONS.clear()
+        data = self._prep_conductor(status=statuses.RUNNING).serialize()
+
+        conductor1 = conducting.WorkflowConductor.deserialize(data)
+        conductor2 = conducting.WorkflowConductor.deserialize(data)
+
+        # Check the spec and graph are shared but the workflow state is not.
+        self.assertEqual(len(conducting.DEFINITIONS), 1)
+        self.assertIs(conductor1.spec, conductor2.spec)
+        self.assertIs(conductor1.graph, conductor2.graph)
+        self.assertIs(conductor1.plan, conductor2.plan)
+        self.assertTrue(conductor1.graph.frozen)
+        self.assertIsNot(conductor1.workflow_state, conductor2.workflow_state)
+
+        self.forward_task_statuses(conductor1, "task1", [statuses.RUNNING])
+        self.assertEqual(conductor1.get_task_state_entry("task1", 0)["status"], statuses.RUNNING)
+        self.assertIsNone(conductor2.get_task_state_entry("task1", 0))
+
+        # Check the cached definition is not changed if the serialized data is changed.
+        data["spec"]["spec"]["tasks"]["task1"]["action"] = "core.foobar"
+        self.assertEqual(conductor1.spec.tasks.get_task("task1").action, "core.noop")
+
+        # Check a different definition is cached separately.
+        data["spec"]["spec"]["tasks"]["task1"]["action"] = "core.noop"
+        data["spec"]["spec"]["output"] = [{"x": 1}]
+        conductor3 = conducting.WorkflowConductor.deserialize(data)
+        self.assertIsNot(conductor3.spec, conductor1.spec)
+        self.assertEqual(len(conducting.DEFINITIONS), 2)
+
+    def test_definition_cache_max_count(self):
+        cache = conducting.WorkflowDefinitionCache(max_count=1)
+        data = self._prep_conductor().serialize()
+
+        spec, graph, plan = cache.get(data["spec"], data["graph"])
+        self.assertIs(cache.get(data["spec"], data["graph"])[0], spec)
+
+        data["spec"]["spec"]["output"] = [{"x": 1}]
+        self.assertIsNot(cache.get(data["spec"], data["graph"])[0], spec)
+        self.assertEqual(len(cache), 1)
+        self.assertDictEqual(cache.metrics, {"hits": 1, "misses": 2})
+
+        self.assertRaises(ValueError, conducting.WorkflowDefinitionCache, max_count=0)
+
     def test_get_workflow_initial_context(self):
         conductor = self._prep_conductor()
         expected_init_ctx = {"a": None, "b": False}
@@ -371,6 +445,72 @@ class WorkflowConductorTest(test_base.WorkflowConductorTest):
         self.assertEqual(task["route"], task_route)
         self.assertDictEqual(task["ctx"], expected_ctx)
 
+    def test_get_task_context_is_copied(self):
+        inputs = {"a": {"x": 1}}
+        conductor = self._prep_conductor(inputs=inputs, status=statuses.RUNNING)
+
+        # Check modifying the context of the task does not change the workflow state.
+        task = conductor.get_task("task1", 0)
+        task["ctx"]["a"]["x"] = 2
+        self.assertDictEqual(conductor.workflow_state.contexts[0]["a"], {"x": 1})
+
+        next_task = conductor.get_next_tasks()[0]
+        next_task["ctx"]["a"]["x"] = 3
+        self.assertDictEqual(conductor.workflow_state.contexts[0]["a"], {"x": 1})
+
+        self.forward_task_statuses(conductor, "task1", [statuses.RUNNING, statuses.SUCCEEDED])
+        self.assertDictEqual(conductor.get_task("task2", 0)["ctx"]["a"], {"x": 1})
+
+    def test_get_task_context_is_serializable(self):
+        inputs = {"a": 123}
+        conductor = self._prep_conductor(inputs=inputs, status=statuses.RUNNING)
+
+        # Check the workflow state in the task context is a snapshot that is plain JSON.
+        task = conductor.get_next_tasks()[0]
+        self.assertIsInstance(task["ctx"]["__state"], dict)
+        self.assertEqual(ujson.loads(ujson.dumps(task["ctx"])), task["ctx"])
+
+        state = json_util.deepcopy(task["ctx"]["__state"])
+        self.forward_task_statuses(conductor, "task1", [statuses.RUNNING, statuses.SUCCEEDED])
+        self.assertDictEqual(task["ctx"]["__state"], state)
+        self.assertNotEqual(task["ctx"]["__state"], conductor.workflow_state.serialize())
+
+    def test_get_next_tasks_serializes_state_once(self):
+        wf_def = """
+        version: 1.0
+
+        tasks:
+          init:
+            action: core.noop
+            next:
+              - do: task1, task2, task3
+          task1:
+            action: core.noop
+          task2:
+            action: core.noop
+          task3:
+            action: core.noop
+        """
+
+        spec = native_specs.WorkflowSpec(wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        conductor = conducting.WorkflowConductor(spec)
+        conductor.request_workflow_status(statuses.RUNNING)
+        self.forward_task_statuses(conductor, "init", [statuses.RUNNING, statuses.SUCCEEDED])
+        serialize = conductor.workflow_state.serialize
+
+        with mock.patch.object(
+            conducting.WorkflowState, "serialize", mock.MagicMock(side_effect=serialize)
+        ) as mocked:
+            next_tasks = conductor.get_next_tasks()
+
+        # Check the workflow state is serialized once and shared by the returned tasks.
+        self.assertEqual(len(next_tasks), 3)
+        self.assertEqual(mocked.call_count, 1)
+        self.assertIs(next_tasks[0]["ctx"]["__state"], next_tasks[2]["ctx"]["__state"])
+        self.assertDictEqual(next_tasks[0]["ctx"]["__state"], conductor.workflow_state.serialize())
+
     def test_get_next_tasks(self):
         inputs = {"a": 123}
         conductor = self._prep_conductor(inputs=inputs, status=statuses.RUNNING)
@@ -896,3 +1036,67 @@ class WorkflowConductorTest(test_base.WorkflowConductorTest):
 
         self.assertListEqual(conductor.log, expected_log_entries)
         self.assertListEqual(conductor.errors, expected_errors)
+
+    def test_append_log_entries_with_limits(self):
+        inputs = {"a": 123, "b": True}
+        conductor = self._prep_conductor(inputs=inputs, status=statuses.RUNNING)
+        conductor.log_limits = {"info": 2, "error": 1}
+
+        for i in range(0, 3):
+            conductor.log_entry("info", "The workflow is running %s." % i)
+            conductor.log_entry("warn", "The task may be running %s." % i)
+            conductor.log_entry("error", "This is baloney %s." % i)
+
+        expected_log_entries = [
+            {"type": "warn", "message": "The task may be running 0."},
+            {"type": "info", "message": "The workflow is running 1."},
+            {"type": "warn", "message": "The task may be running 1."},
+            {"type": "info", "message": "The workflow is running 2."},
+            {"type": "warn", "message": "The task may be running 2."},
+        ]
+
+        expected_errors = [{"type": "error", "message": "This is baloney 2."}]
+
+        self.assertListEqual(conductor.log, expected_log_entries)
+        self.assertListEqual(conductor.errors, expected_errors)
+
+        # Entries removed from the log are no longer considered duplicates.
+        conductor.log_entry("error", "This is baloney 0.")
+        expected_errors = [{"type": "error", "message": "This is baloney 0."}]
+        self.assertListEqual(conductor.errors, expected_errors)
+
+        # Ensure the log limits are retained after the conductor is restored.
+        data = conductor.serialize()
+        self.assertDictEqual(data["log_limits"], {"info": 2, "error": 1})
+        conductor = conducting.WorkflowConductor.deserialize(data)
+        self.assertDictEqual(conductor.log_limits, {"info": 2, "error": 1})
+        self.assertListEqual(conductor.log, expected_log_entries)
+
+        # Ensure the delta includes the entire log when entries are removed.
+        version = conductor.workflow_state.version
+        conductor.log_entry("info", "The workflow is running 3.")
+        delta = conductor.serialize_delta(since=version)
+        self.assertListEqual([i for i, _ in delta["log"]], list(range(0, 5)))
+
+    def test_append_log_entries_with_result_refs(self):
+        inputs = {"a": 123, "b": True}
+        spec = self._prep_conductor(inputs=inputs).spec
+        conductor = conducting.WorkflowConductor(spec, inputs=inputs, log_result_refs=True)
+        conductor.request_workflow_status(statuses.RUNNING)
+
+        result = {"stdout": "x" * 1024}
+        self.forward_task_statuses(conductor, "task1", [statuses.RUNNING])
+        self.forward_task_statuses(conductor, "task1", [statuses.FAILED], result=result)
+
+        # The result of a task that is not a task item is not kept elsewhere and is logged.
+        expected_errors = [
+            {
+                "type": "error",
+                "message": "Execution failed. See result for details.",
+                "task_id": "task1",
+                "result": result,
+            }
+        ]
+
+        self.assertListEqual(conductor.errors, expected_errors)
+        self.assertTrue(conductor.serialize()["log_result_refs"])
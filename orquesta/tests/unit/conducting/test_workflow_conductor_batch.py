@@ -0,0 +1,274 @@
+# Copyright 2021 The StackStorm Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+
+from orquesta import conducting
+from orquesta import events
+from orquesta import machines
+from orquesta.specs import native as native_specs
+from orquesta import statuses
+from orquesta.tests.unit import base as test_base
+
+
+class WorkflowConductorBatchTest(test_base.WorkflowConductorTest):
+    wf_def = """
+    version: 1.0
+
+    input:
+      - xs
+
+    tasks:
+      task1:
+        with: <% ctx(xs) %>
+        action: core.echo message=<% item() %>
+        next:
+          - when: <% succeeded() %>
+            publish: y=<% result() %>
+            do: task2
+      task2:
+        action: core.noop
+
+    output:
+      - y: <% ctx(y) %>
+    """
+
+    def _prep_conductor(self, xs):
+        spec = native_specs.WorkflowSpec(self.wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        conductor = conducting.WorkflowConductor(spec, inputs={"xs": xs})
+        conductor.request_workflow_status(statuses.RUNNING)
+        conductor.get_next_tasks()
+
+        return conductor
+
+    def _make_item_events(self, task_id, xs, status):
+        task_events = []
+
+        for item_id in range(0, len(xs)):
+            ac_ex_event = events.TaskItemActionExecutionEvent(item_id, statuses.RUNNING)
+            task_events.append((task_id, 0, ac_ex_event))
+
+        for item_id, x in enumerate(xs):
+            ac_ex_event = events.TaskItemActionExecutionEvent(item_id, status, result=x)
+            ac_ex_event.accumulated_result = xs[: item_id + 1]
+            task_events.append((task_id, 0, ac_ex_event))
+
+        return task_events
+
+    def test_update_task_states(self):
+        xs = ["a", "b", "c", "d"]
+
+        expected = self._prep_conductor(xs)
+        conductor = self._prep_conductor(xs)
+
+        for task_id, route, event in self._make_item_events("task1", xs, statuses.SUCCEEDED):
+            expected.update_task_state(task_id, route, event)
+
+        task_events = self._make_item_events("task1", xs, statuses.SUCCEEDED)
+        task_state_entries = conductor.update_task_states(task_events)
+
+        self.assertEqual(len(task_state_entries), len(task_events))
+        self.assertEqual(task_state_entries[-1]["status"], statuses.SUCCEEDED)
+        self.assertDictEqual(conductor.serialize(), expected.serialize())
+
+        # Complete the workflow in a single batch of events.
+        task_events = [
+            ("task2", 0, events.ActionExecutionEvent(statuses.RUNNING)),
+            ("task2", 0, events.ActionExecutionEvent(statuses.SUCCEEDED)),
+        ]
+
+        conductor.get_next_tasks()
+        conductor.update_task_states(task_events)
+        conductor.render_workflow_output()
+
+        self.assertEqual(conductor.get_workflow_status(), statuses.SUCCEEDED)
+        self.assertDictEqual(conductor.get_workflow_output(), {"y": xs})
+
+    def test_update_task_states_defers_workflow_status(self):
+        xs = ["a", "b", "c", "d"]
+        conductor = self._prep_conductor(xs)
+        task_events = self._make_item_events("task1", xs, statuses.SUCCEEDED)[:-1]
+        process_event = machines.WorkflowStateMachine.process_event
+
+        with mock.patch.object(
+            machines.WorkflowStateMachine,
+            "process_event",
+            mock.MagicMock(side_effect=process_event),
+        ) as mocked:
+            conductor.update_task_states(task_events)
+
+        # Leave the last item running. The workflow status is evaluated once at the end of the
+        # batch since none of the events can change the status of the running workflow.
+        self.assertEqual(mocked.call_count, 1)
+        self.assertEqual(conductor.get_workflow_status(), statuses.RUNNING)
+
+    def test_update_task_states_evaluates_workflow_status_once(self):
+        wf_def = """
+        version: 1.0
+
+        tasks:
+          init:
+            action: core.noop
+            next:
+              - do: task1, task2, task3, task4, task5
+          task1:
+            action: core.noop
+          task2:
+            action: core.noop
+          task3:
+            action: core.noop
+          task4:
+            action: core.noop
+          task5:
+            action: core.noop
+        """
+
+        spec = native_specs.WorkflowSpec(wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        expected = conducting.WorkflowConductor(spec)
+        conductor = conducting.WorkflowConductor(spec)
+
+        for c in [expected, conductor]:
+            c.request_workflow_status(statuses.RUNNING)
+            self.forward_task_statuses(c, "init", [statuses.RUNNING, statuses.SUCCEEDED])
+            self.assertEqual(len(c.get_next_tasks()), 5)
+
+        task_ids = ["task%s" % i for i in range(1, 6)]
+        task_events = [(t, 0, events.ActionExecutionEvent(statuses.RUNNING)) for t in task_ids]
+        task_events += [(t, 0, events.ActionExecutionEvent(statuses.SUCCEEDED)) for t in task_ids]
+
+        for task_id, route, event in task_events:
+            expected.update_task_state(task_id, route, event)
+
+        process_event = machines.WorkflowStateMachine.process_event
+
+        with mock.patch.object(
+            machines.WorkflowStateMachine,
+            "process_event",
+            mock.MagicMock(side_effect=process_event),
+        ) as mocked:
+            conductor.update_task_states(task_events)
+
+        # Check the workflow status is evaluated once for the batch of task completions.
+        self.assertEqual(mocked.call_count, 1)
+        self.assertEqual(conductor.get_workflow_status(), statuses.SUCCEEDED)
+        self.assertDictEqual(conductor.serialize(), expected.serialize())
+
+    def test_update_task_states_marks_terminal_tasks(self):
+        wf_def = """
+        version: 1.0
+
+        vars:
+          - a: 0
+
+        tasks:
+          task1:
+            action: core.noop
+            next:
+              - when: <% succeeded() %>
+                publish: x=1
+                do: task2
+              - when: <% succeeded() %>
+                publish: y=2
+                do: task3
+          task2:
+            action: core.noop
+            next:
+              - when: <% failed() %>
+                do: task4
+          task3:
+            action: core.noop
+          task4:
+            action: core.noop
+
+        output:
+          - a: <% ctx(a) %>
+          - x: <% ctx().get('x') %>
+          - y: <% ctx().get('y') %>
+        """
+
+        spec = native_specs.WorkflowSpec(wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        expected = conducting.WorkflowConductor(spec)
+        conductor = conducting.WorkflowConductor(spec)
+
+        task_events = [
+            (task_id, 0, events.ActionExecutionEvent(status))
+            for task_id in ["task1", "task2", "task3"]
+            for status in [statuses.RUNNING, statuses.SUCCEEDED]
+        ]
+
+        expected.request_workflow_status(statuses.RUNNING)
+
+        for task_id, route, event in task_events:
+            expected.update_task_state(task_id, route, event)
+
+        conductor.request_workflow_status(statuses.RUNNING)
+        conductor.update_task_states(task_events)
+
+        # Check only the task that completes the workflow is terminal as when the events are
+        # applied one at a time, so the terminal context and the output are the same.
+        for c in [expected, conductor]:
+            c.render_workflow_output()
+            term_tasks = [t["id"] for _, t in c.workflow_state.get_terminal_tasks()]
+            self.assertEqual(c.get_workflow_status(), statuses.SUCCEEDED)
+            self.assertListEqual(term_tasks, ["task3"])
+            self.assertDictEqual(c.get_workflow_output(), {"a": 0, "x": None, "y": 2})
+
+        self.assertDictEqual(
+            conductor.get_workflow_terminal_context(), expected.get_workflow_terminal_context()
+        )
+
+        self.assertDictEqual(conductor.serialize(), expected.serialize())
+
+    def test_update_task_states_with_failure_in_batch(self):
+        conductor = self._prep_conductor(["a", "b"])
+        process_event = machines.WorkflowStateMachine.process_event
+
+        task_events = self._make_item_events("task1", ["a"], statuses.SUCCEEDED)
+        task_events += [("task1", 0, events.TaskItemActionExecutionEvent(1, statuses.RUNNING))]
+        task_events += [("task1", 0, events.TaskItemActionExecutionEvent(1, statuses.FAILED))]
+
+        with mock.patch.object(
+            machines.WorkflowStateMachine,
+            "process_event",
+            mock.MagicMock(side_effect=process_event),
+        ) as mocked:
+            conductor.update_task_states(task_events)
+
+        # Check the task failure is evaluated in place and it supersedes the deferred events
+        # of the same task so the workflow status is only evaluated once.
+        self.assertEqual(mocked.call_count, 1)
+        self.assertEqual(conductor.get_workflow_status(), statuses.FAILED)
+
+    def test_update_task_states_with_failure(self):
+        xs = ["a", "b"]
+        conductor = self._prep_conductor(xs)
+        task_events = self._make_item_events("task1", xs, statuses.FAILED)
+
+        conductor.update_task_states(task_events)
+
+        self.assertEqual(conductor.get_workflow_status(), statuses.FAILED)
+        self.assertEqual(conductor.get_task_state_entry("task1", 0)["status"], statuses.FAILED)
+        self.assertTrue(conductor.get_task_state_entry("task1", 0)["term"])
+
+    def test_update_task_states_bad_event_type(self):
+        conductor = self._prep_conductor(["a"])
+        task_events = [("task1", 0, object())]
+
+        self.assertRaises(TypeError, conductor.update_task_states, task_events)
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from orquesta import conducting
+from orquesta import constants
 from orquesta.specs import native as native_specs
 from orquesta import statuses
 from orquesta.tests.unit import base as test_base
@@ -101,6 +102,69 @@ class WorkflowConductorExtendedTest(test_base.WorkflowConductorTest):
         self.assertEqual(conductor.get_workflow_status(), statuses.SUCCEEDED)
         self.assertDictEqual(conductor.get_workflow_terminal_context(), expected_term_ctx)
 
+    def test_join_inbound_evaluation(self):
+        wf_def = """
+        version: 1.0
+
+        tasks:
+          task1:
+            action: core.noop
+            next:
+              - when: <% succeeded() %>
+                do: task4
+          task2:
+            action: core.noop
+            next:
+              - when: <% succeeded() %>
+                do: task4
+          task3:
+            action: core.noop
+            next:
+              - when: <% succeeded() %>
+                do: task4
+          task4:
+            join: 2
+            action: core.noop
+        """
+
+        spec = native_specs.WorkflowSpec(wf_def)
+        conductor = conducting.WorkflowConductor(spec)
+        conductor.request_workflow_status(statuses.RUNNING)
+
+        self.assertEqual(conductor.workflow_state.get_inbound_task_count("task4"), 3)
+
+        # Fail task1 and succeed task2 then check the inbound criteria is in progress.
+        self.forward_task_statuses(conductor, "task1", [statuses.RUNNING, statuses.FAILED])
+        self.forward_task_statuses(conductor, "task2", [statuses.RUNNING, statuses.SUCCEEDED])
+        self.forward_task_statuses(conductor, "task3", [statuses.RUNNING])
+        inbound_evaluation = conductor.workflow_state.get_inbound_evaluation("task4", 0)
+        expected_inbound_evaluation = {
+            "tasks": {"task1": False, "task2": True, "task3": False},
+            "satisfied": 1,
+        }
+
+        self.assertDictEqual(inbound_evaluation, expected_inbound_evaluation)
+
+        self.assertEqual(
+            conductor.get_inbound_criteria_status("task4", 0),
+            constants.INBOUND_CRITERIA_NOT_SATISFIED,
+        )
+
+        # Ensure the inbound evaluation is rebuilt after the conductor is restored.
+        conductor = conducting.WorkflowConductor.deserialize(conductor.serialize())
+        inbound_evaluation = conductor.workflow_state.get_inbound_evaluation("task4", 0)
+        self.assertDictEqual(inbound_evaluation, expected_inbound_evaluation)
+
+        # Succeed task3 and check the inbound criteria is satisfied.
+        self.forward_task_statuses(conductor, "task3", [statuses.SUCCEEDED])
+        inbound_evaluation = conductor.workflow_state.get_inbound_evaluation("task4", 0)
+        self.assertEqual(inbound_evaluation["satisfied"], 2)
+
+        self.assertEqual(
+            conductor.get_inbound_criteria_status("task4", 0),
+            constants.INBOUND_CRITERIA_SATISFIED,
+        )
+
     def test_join_with_no_input_and_no_context_changes(self):
         wf_def = """
         version: 1.0
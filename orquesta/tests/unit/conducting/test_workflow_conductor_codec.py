@@ -0,0 +1,175 @@
+# Copyright 2021 The StackStorm Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import unittest
+import ujson
+
+from orquesta import conducting
+from orquesta import encoding
+from orquesta.specs import native as native_specs
+from orquesta import statuses
+from orquesta.tests.unit import base as test_base
+
+
+class BinaryCodecTest(unittest.TestCase):
+    def test_encode(self):
+        data = {
+            "a": [None, True, False, 0, 1, -1, 127, 128, -129, 1.5, -0.25],
+            "i": [int("1" * 30), -int("1" * 30)],
+            "b": {"x": "fee", "y": ["fi", "fee"], "": ""},
+            "c": "z" * 1000,
+            "d": [[], {}, ["z" * 1000]],
+            "e": [[0, 2, 3, 1, -5, int("1" * 30)], [True, 1], {1: "a", "b": 2}],
+            "f": [{"id": "task1", "route": 0}, {"id": "task2", "route": 1}, {"route": 2}],
+        }
+
+        for compress in [False, True]:
+            codec = encoding.BinaryCodec(compress=compress)
+            value = codec.encode(data)
+            self.assertIsInstance(value, bytes)
+            self.assertDictEqual(codec.decode(value), data)
+
+            # Check the value is decoded regardless of the compress option of the codec.
+            self.assertDictEqual(encoding.BinaryCodec().decode(value), data)
+
+    def test_encode_bad_value(self):
+        codec = encoding.BinaryCodec()
+
+        self.assertRaises(ValueError, codec.encode, {"a": object()})
+        self.assertRaises(ValueError, codec.decode, b"foobar")
+
+        value = codec.encode({"a": "foobar"})
+        self.assertRaises(ValueError, codec.decode, value[:-1])
+        self.assertRaises(ValueError, codec.decode, value + b"\x00")
+
+    def test_get_codec(self):
+        codec = encoding.BinaryCodec()
+
+        self.assertIs(encoding.get_codec(codec), codec)
+        self.assertIsInstance(encoding.get_codec("json"), encoding.JSONCodec)
+        self.assertTrue(encoding.get_codec("binary", compress=True).compress)
+        self.assertRaises(ValueError, encoding.get_codec, "foobar")
+        self.assertRaises(ValueError, encoding.register_codec, dict)
+
+
+class WorkflowConductorCodecTest(test_base.WorkflowConductorTest):
+    wf_def = """
+    version: 1.0
+
+    vars:
+      - count: 0
+
+    tasks:
+      init:
+        action: core.noop
+        next:
+          - do: task1
+      task1:
+        action: core.noop
+        next:
+          - when: <% succeeded() %>
+            publish: count=<% ctx(count) + 1 %> result=<% result() %>
+            do: task2, task3
+      task2:
+        action: core.noop
+      task3:
+        action: core.noop
+        next:
+          - when: <% ctx(count) < 50 %>
+            do: task1
+
+    output:
+      - count: <% ctx(count) %>
+    """
+
+    def _prep_conductor(self):
+        spec = native_specs.WorkflowSpec(self.wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        conductor = conducting.WorkflowConductor(spec)
+        conductor.request_workflow_status(statuses.RUNNING)
+        next_tasks = conductor.get_next_tasks()
+
+        while next_tasks:
+            for task in next_tasks:
+                self.forward_task_statuses(
+                    conductor,
+                    task["id"],
+                    [statuses.RUNNING, statuses.SUCCEEDED],
+                    route=task["route"],
+                    result={"fee": "fi", "fo": -1.5},
+                )
+
+            next_tasks = conductor.get_next_tasks()
+
+        conductor.render_workflow_output()
+
+        return conductor
+
+    def test_serialize_with_codec(self):
+        conductor = self._prep_conductor()
+        self.assertDictEqual(conductor.get_workflow_output(), {"count": 50})
+
+        data = conductor.serialize()
+        json_size = len(ujson.dumps(data))
+
+        for codec in ["json", "binary"]:
+            for compress in [False, True]:
+                value = conductor.serialize(codec=codec, compress=compress)
+                self.assertIsInstance(value, bytes)
+
+                other = conducting.WorkflowConductor.deserialize(
+                    value, codec=codec, compress=compress
+                )
+
+                self.assertDictEqual(other.serialize(), data)
+                self.assertEqual(other.get_workflow_status(), statuses.SUCCEEDED)
+
+        # Check the binary encoding is several times smaller than the json encoding.
+        self.assertLess(len(conductor.serialize(codec="binary")), json_size / 3)
+        self.assertLess(len(conductor.serialize(codec="binary", compress=True)), json_size / 10)
+
+    def test_serialize_to_stream(self):
+        conductor = self._prep_conductor()
+        data = conductor.serialize()
+
+        fp = io.BytesIO()
+        conductor.serialize_to(fp)
+
+        # Check the list sections are written one entry per line.
+        lines = fp.getvalue().splitlines()
+        self.assertGreater(len(lines), len(data["state"]["sequence"]))
+        self.assertIn(["state.sequence[]", data["state"]["sequence"][0]], map(ujson.loads, lines))
+
+        fp.seek(0)
+        other = conducting.WorkflowConductor.deserialize_from(fp)
+
+        self.assertDictEqual(other.serialize(), data)
+        self.assertEqual(other.get_workflow_status(), statuses.SUCCEEDED)
+        self.assertDictEqual(other.get_workflow_output(), {"count": 50})
+
+    def test_serialize_to_stream_and_resume(self):
+        spec = native_specs.WorkflowSpec(self.wf_def)
+        conductor = conducting.WorkflowConductor(spec)
+        conductor.request_workflow_status(statuses.RUNNING)
+        self.forward_task_statuses(conductor, "init", [statuses.RUNNING, statuses.SUCCEEDED])
+
+        fp = io.BytesIO()
+        conductor.serialize_to(fp)
+        fp.seek(0)
+        other = conducting.WorkflowConductor.deserialize_from(fp)
+
+        self.assertDictEqual(other.serialize(), conductor.serialize())
+        self.assertListEqual([t["id"] for t in other.get_next_tasks()], ["task1"])
@@ -15,6 +15,7 @@
 # limitations under the License.
 
 import six
+import ujson
 
 from orquesta import conducting
 from orquesta.specs import native as native_specs
@@ -200,3 +201,38 @@ class WorkflowConductorDataFlowTest(test_base.WorkflowConductorTest):
 
     def test_data_flow_unicode(self):
         self.assert_unicode_data_flow("光合作用")
+
+    def test_data_flow_with_context_dedup(self):
+        value = {"items": [self._get_combined_value() for i in range(0, 50)]}
+        spec = native_specs.WorkflowSpec(self.wf_def_yaql)
+        conductor = conducting.WorkflowConductor(
+            spec, inputs={"a1": value}, context_dedup_size=1024
+        )
+        conductor.request_workflow_status(statuses.RUNNING)
+
+        for task_name in ["task1", "task2"]:
+            forward_statuses = [statuses.RUNNING, statuses.SUCCEEDED]
+            self.forward_task_statuses(conductor, task_name, forward_statuses)
+
+        # Check the value published to many variables is stored once in the serialized state.
+        data = conductor.serialize()
+        state = data["state"]
+        self.assertEqual(len(state["blobs"]), 1)
+        self.assertEqual(len(state["context_refs"]), 8)
+        self.assertEqual(data["context_dedup_size"], 1024)
+
+        conductor.context_dedup_size = None
+        expected_data = conductor.serialize()
+        self.assertNotIn("blobs", expected_data["state"])
+        self.assertLess(len(ujson.dumps(data)) * 3, len(ujson.dumps(expected_data)))
+
+        # Check the contexts are rehydrated on deserialization and the workflow completes.
+        conductor = conducting.WorkflowConductor.deserialize(data)
+        self.assertDictEqual(conductor.workflow_state.serialize(), expected_data["state"])
+
+        forward_statuses = [statuses.RUNNING, statuses.SUCCEEDED]
+        self.forward_task_statuses(conductor, "task3", forward_statuses)
+        conductor.render_workflow_output()
+
+        self.assertEqual(conductor.get_workflow_status(), statuses.SUCCEEDED)
+        self.assertDictEqual(conductor.get_workflow_output(), {"a5": value, "b5": value})
@@ -0,0 +1,167 @@
+# Copyright 2021 The StackStorm Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from orquesta import conducting
+from orquesta import requests
+from orquesta.specs import native as native_specs
+from orquesta import statuses
+from orquesta.tests.unit import base as test_base
+
+
+class WorkflowConductorDeltaTest(test_base.WorkflowConductorTest):
+    wf_def = """
+    version: 1.0
+
+    input:
+      - xs
+
+    tasks:
+      task1:
+        action: core.noop
+        next:
+          - when: <% succeeded() %>
+            publish: x=123
+            do: task2, task3
+      task2:
+        action: core.noop
+        next:
+          - do: task4
+      task3:
+        with: <% ctx(xs) %>
+        action: core.echo message=<% item() %>
+        next:
+          - when: <% succeeded() %>
+            publish: y=<% result() %>
+            do: task4
+          - when: <% failed() %>
+            do: task4
+      task4:
+        join: all
+        action: core.noop
+
+    output:
+      - y: <% ctx(y) %>
+    """
+
+    def _prep_conductor(self):
+        spec = native_specs.WorkflowSpec(self.wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        conductor = conducting.WorkflowConductor(spec, inputs={"xs": ["a", "b"]})
+        conductor.request_workflow_status(statuses.RUNNING)
+
+        return conductor
+
+    def _restore(self, data, deltas):
+        conductor = conducting.WorkflowConductor.deserialize(data)
+
+        for delta in deltas:
+            conductor.apply_delta(delta)
+
+        return conductor
+
+    def test_serialize_delta(self):
+        conductor = self._prep_conductor()
+        data = conductor.serialize()
+        version = conductor.workflow_state.version
+        deltas = []
+
+        # Complete task1 and record the delta.
+        self.forward_task_statuses(conductor, "task1", [statuses.RUNNING, statuses.SUCCEEDED])
+        delta = conductor.serialize_delta(since=version)
+        version = delta["version"]
+        deltas.append(delta)
+
+        # The initial context is not changed and should not be included in the delta.
+        self.assertListEqual([i for i, _ in delta["state"]["contexts"]], [1, 2])
+        self.assertListEqual([i for i, _ in delta["state"]["sequence"]], [0])
+        self.assertNotIn("routes", delta["state"])
+
+        # Run the with items task and record the delta for each event.
+        self.assertEqual(len(conductor.get_next_tasks()), 2)
+        delta = conductor.serialize_delta(since=version)
+        version = delta["version"]
+        deltas.append(delta)
+
+        for item_id in range(0, 2):
+            self.forward_task_item_statuses(
+                conductor, "task3", item_id, [statuses.RUNNING, statuses.SUCCEEDED]
+            )
+
+            delta = conductor.serialize_delta(since=version)
+            version = delta["version"]
+            deltas.append(delta)
+
+        # Assert the restored conductor matches before the workflow completes.
+        restored = self._restore(data, deltas)
+        self.assertDictEqual(restored.serialize(), conductor.serialize())
+        self.assertEqual(restored.workflow_state.version, version)
+
+        # Complete the rest of the workflow and render the workflow output.
+        self.forward_task_statuses(conductor, "task2", [statuses.RUNNING, statuses.SUCCEEDED])
+        self.forward_task_statuses(conductor, "task4", [statuses.RUNNING, statuses.SUCCEEDED])
+        conductor.render_workflow_output()
+        self.assertEqual(conductor.get_workflow_status(), statuses.SUCCEEDED)
+
+        delta = conductor.serialize_delta(since=version)
+        deltas.append(delta)
+
+        self.assertIn("output", delta)
+        self.assertEqual(delta["state"]["status"], statuses.SUCCEEDED)
+
+        restored = self._restore(data, deltas)
+        self.assertDictEqual(restored.serialize(), conductor.serialize())
+
+        # Ensure the restored conductor continues to track changes from the delta version.
+        expected_delta = {"version": delta["version"]}
+        actual_delta = restored.workflow_state.serialize_delta(since=delta["version"])
+        self.assertDictEqual(actual_delta, expected_delta)
+
+    def test_serialize_delta_on_failure_and_rerun(self):
+        conductor = self._prep_conductor()
+        self.forward_task_statuses(conductor, "task1", [statuses.RUNNING, statuses.FAILED])
+        self.assertEqual(conductor.get_workflow_status(), statuses.FAILED)
+
+        data = conductor.serialize()
+        version = conductor.workflow_state.version
+
+        # Rerun task1 which removes the errors and adds new entries in the sequence.
+        conductor.request_workflow_rerun([requests.TaskRerunRequest.new("task1", route=0)])
+        self.forward_task_statuses(conductor, "task1", [statuses.RUNNING, statuses.SUCCEEDED])
+
+        delta = conductor.serialize_delta(since=version)
+
+        self.assertListEqual(delta["errors"], [])
+        self.assertIn("reruns", delta["state"])
+        self.assertListEqual([i for i, _ in delta["state"]["sequence"]], [0, 1])
+
+        restored = self._restore(data, [delta])
+        self.assertDictEqual(restored.serialize(), conductor.serialize())
+
+    def test_apply_delta_not_contiguous(self):
+        conductor = self._prep_conductor()
+        self.forward_task_statuses(conductor, "task1", [statuses.RUNNING, statuses.SUCCEEDED])
+        data = conductor.serialize()
+        version = conductor.workflow_state.version
+
+        self.assertEqual(len(conductor.get_next_tasks()), 2)
+        self.forward_task_statuses(conductor, "task2", [statuses.RUNNING, statuses.SUCCEEDED])
+        delta = conductor.serialize_delta(since=version)
+
+        # Skip the delta for the second task and apply the delta for the third task.
+        self.forward_task_item_statuses(conductor, "task3", 0, [statuses.RUNNING])
+        next_delta = conductor.serialize_delta(since=delta["version"])
+
+        restored = self._restore(data, [])
+        self.assertRaises(ValueError, restored.apply_delta, next_delta)
@@ -0,0 +1,139 @@
+# Copyright 2021 The StackStorm Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from orquesta import conducting
+from orquesta import hosting
+from orquesta.specs import native as native_specs
+from orquesta import statuses
+from orquesta.tests.unit import base as test_base
+
+
+class WorkflowConductorHostTest(test_base.WorkflowConductorTest):
+    wf_def = """
+    version: 1.0
+
+    tasks:
+      task1:
+        action: core.noop
+        next:
+          - do: task2
+      task2:
+        action: core.noop
+    """
+
+    def _prep_conductor(self):
+        spec = native_specs.WorkflowSpec(self.wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        conductor = conducting.WorkflowConductor(spec)
+        conductor.request_workflow_status(statuses.RUNNING)
+
+        return conductor
+
+    def test_get_resident(self):
+        host = hosting.WorkflowConductorHost()
+        conductor = self._prep_conductor()
+        host.put("wf1", conductor)
+
+        self.assertIn("wf1", host)
+        self.assertIs(host.get("wf1"), conductor)
+        self.assertIs(host.get("wf1"), conductor)
+        self.assertEqual(host.metrics["hits"], 2)
+        self.assertEqual(host.metrics["misses"], 0)
+        self.assertRaises(KeyError, host.get, "wf2")
+
+    def test_evict_by_count(self):
+        store = {}
+
+        def writer(execution_id, data):
+            store[execution_id] = data
+
+        host = hosting.WorkflowConductorHost(loader=store.get, writer=writer, max_count=2)
+
+        for i in range(0, 3):
+            host.put("wf%s" % i, self._prep_conductor())
+
+        # Check the least recently used conductor is written back and evicted.
+        self.assertEqual(len(host), 2)
+        self.assertNotIn("wf0", host)
+        self.assertListEqual(list(store.keys()), ["wf0"])
+        self.assertEqual(host.metrics["evictions"], 1)
+        self.assertEqual(host.metrics["writes"], 1)
+
+        # Check the conductor is loaded on miss and evicts wf1 which is least recently used.
+        host.get("wf2")
+        conductor = host.get("wf0")
+        self.assertNotIn("wf1", host)
+        self.assertEqual(host.metrics["misses"], 1)
+        self.assertEqual(host.metrics["loads"], 1)
+
+        # Check the conductor loaded from the serialized form can continue.
+        self.forward_task_statuses(conductor, "task1", [statuses.RUNNING, statuses.SUCCEEDED])
+        self.assertListEqual([t["id"] for t in conductor.get_next_tasks()], ["task2"])
+
+        # Check only the changed conductors are written on checkpoint.
+        host.checkpoint()
+        self.assertEqual(host.metrics["writes"], 4)
+        self.assertEqual(store["wf0"], conductor.serialize())
+
+        host.checkpoint()
+        self.assertEqual(host.metrics["writes"], 4)
+
+    def test_evict_by_size(self):
+        host = hosting.WorkflowConductorHost(max_size=1)
+        host.put("wf1", self._prep_conductor())
+        host.put("wf2", self._prep_conductor())
+
+        # Check the conductor is kept in serialized form without a writer.
+        self.assertNotIn("wf1", host)
+        self.assertIn("wf2", host)
+        self.assertGreater(host.size, 0)
+
+        conductor = host.get("wf1")
+        self.assertEqual(conductor.get_workflow_status(), statuses.RUNNING)
+        self.assertNotIn("wf2", host)
+        self.assertEqual(host.metrics["loads"], 0)
+        self.assertEqual(host.metrics["evictions"], 2)
+
+    def test_evict_without_writer_copies_conductor(self):
+        host = hosting.WorkflowConductorHost(max_count=1)
+        conductor = self._prep_conductor()
+        host.put("wf1", conductor)
+        host.put("wf2", self._prep_conductor())
+        self.assertNotIn("wf1", host)
+
+        # Check the serialized conductor kept by the host is not changed by the evicted conductor.
+        self.forward_task_statuses(conductor, "task1", [statuses.RUNNING, statuses.SUCCEEDED])
+        restored = host.get("wf1")
+        self.assertIsNot(restored, conductor)
+        self.assertIsNone(restored.get_task_state_entry("task1", 0))
+        self.assertListEqual([t["id"] for t in restored.get_next_tasks()], ["task1"])
+
+    def test_remove(self):
+        host = hosting.WorkflowConductorHost(max_count=1)
+        host.put("wf1", self._prep_conductor())
+        host.put("wf2", self._prep_conductor())
+        host.remove("wf1")
+        host.remove("wf2")
+
+        self.assertEqual(len(host), 0)
+        self.assertEqual(host.size, 0)
+        self.assertRaises(KeyError, host.get, "wf1")
+
+    def test_bad_host_args(self):
+        self.assertRaises(ValueError, hosting.WorkflowConductorHost, max_count=0)
+        self.assertRaises(ValueError, hosting.WorkflowConductorHost, max_size=0)
+
+        host = hosting.WorkflowConductorHost()
+        self.assertRaises(ValueError, host.put, "wf1", object())
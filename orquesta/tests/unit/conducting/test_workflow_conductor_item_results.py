@@ -0,0 +1,278 @@
+# Copyright 2021 The StackStorm Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import glob
+import os
+import tempfile
+import unittest
+
+from orquesta import conducting
+from orquesta import hosting
+from orquesta import results as results_util
+from orquesta.specs import native as native_specs
+from orquesta import statuses
+from orquesta.tests.unit import base as test_base
+
+
+class ItemResultStoreTest(unittest.TestCase):
+    def test_append(self):
+        store = results_util.ItemResultStore(4)
+        store.append(1, {"k": "b"})
+        store.append(0, "a")
+
+        self.assertEqual(len(store), 2)
+        self.assertIn(1, store)
+        self.assertNotIn(2, store)
+        self.assertFalse(store.spilled)
+        self.assertListEqual(store.materialize(), ["a", {"k": "b"}])
+
+        # Check the latest result is returned if the result of the item is appended again.
+        store.append(0, "c")
+        self.assertEqual(store.get(0), "c")
+        self.assertIsNone(store.get(3))
+
+        self.assertRaises(IndexError, store.append, 4, "d")
+
+    def test_spill(self):
+        store = results_util.ItemResultStore(4, spill_size=10)
+        store.append(0, "a")
+        self.assertFalse(store.spilled)
+
+        store.append(2, {"k": "x" * 10})
+        self.assertTrue(store.spilled)
+        self.assertTrue(os.path.isfile(store.path))
+
+        store.append(3, [1, 2])
+        store.append(0, "b")
+
+        self.assertEqual(store.get(0), "b")
+        self.assertListEqual(store.materialize(), ["b", None, {"k": "x" * 10}, [1, 2]])
+
+        # Check the spilled results are inlined when the store is serialized.
+        data = store.serialize()
+        self.assertNotIn("path", data)
+        self.assertListEqual(data["results"], [[0, "b"], [2, {"k": "x" * 10}], [3, [1, 2]]])
+
+        # Check the deserialized store only spills to its own file on the next append.
+        other = results_util.ItemResultStore.deserialize(data)
+        self.assertFalse(other.spilled)
+        self.assertListEqual(other.materialize(), store.materialize())
+        self.assertDictEqual(other.serialize(), data)
+
+        path = store.path
+        store.close()
+        self.assertFalse(os.path.isfile(path))
+
+        other.append(1, "c")
+        self.assertTrue(other.spilled)
+        self.assertNotEqual(other.path, path)
+        self.assertListEqual(other.materialize(), ["b", "c", {"k": "x" * 10}, [1, 2]])
+
+        # Check the file is removed when the store is garbage collected.
+        path = other.path
+        del other
+        gc.collect()
+        self.assertFalse(os.path.isfile(path))
+
+
+class WorkflowConductorItemResultsTest(test_base.WorkflowConductorTest):
+    wf_def = """
+    version: 1.0
+
+    input:
+      - xs
+
+    tasks:
+      task1:
+        with: <% ctx(xs) %>
+        action: core.echo message=<% item() %>
+        next:
+          - when: <% succeeded() %>
+            publish: y=<% result() %>
+
+    output:
+      - y: <% ctx(y) %>
+    """
+
+    def _prep_conductor(self, xs, results_spill_size=None):
+        spec = native_specs.WorkflowSpec(self.wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        conductor = conducting.WorkflowConductor(
+            spec, inputs={"xs": xs}, results_spill_size=results_spill_size
+        )
+
+        conductor.request_workflow_status(statuses.RUNNING)
+        conductor.get_next_tasks()
+
+        return conductor
+
+    def _forward_items(self, conductor, xs, start=0):
+        for item_id, x in enumerate(xs, start):
+            self.forward_task_item_statuses(conductor, "task1", item_id, [statuses.RUNNING])
+            self.forward_task_item_statuses(
+                conductor, "task1", item_id, [statuses.SUCCEEDED], result=x.upper()
+            )
+
+    def test_accumulate_item_results(self):
+        xs = ["fee", "fi", "fo", "fum"]
+        conductor = self._prep_conductor(xs)
+
+        # Serialize and deserialize the conductor in the middle of the items.
+        self._forward_items(conductor, xs[:2])
+        data = conductor.serialize()
+        self.assertListEqual(data["item_results"][0][2]["results"], [[0, "FEE"], [1, "FI"]])
+
+        conductor = conducting.WorkflowConductor.deserialize(data)
+        self._forward_items(conductor, xs[2:], start=2)
+        conductor.render_workflow_output()
+
+        self.assertEqual(conductor.get_workflow_status(), statuses.SUCCEEDED)
+        self.assertDictEqual(conductor.get_workflow_output(), {"y": [x.upper() for x in xs]})
+
+        # Check the item results are removed once the task is no longer staged.
+        conductor.get_next_tasks()
+        self.assertNotIn("item_results", conductor.serialize())
+
+    def test_accumulate_item_results_with_spill(self):
+        xs = ["x" * 10 for i in range(0, 10)]
+        conductor = self._prep_conductor(xs, results_spill_size=50)
+
+        self._forward_items(conductor, xs[:5])
+        store = conductor._item_results[("task1", 0)]
+        self.assertTrue(store.spilled)
+
+        conductor = conducting.WorkflowConductor.deserialize(conductor.serialize())
+        store.close()
+
+        # Check the results are spilled to a new file on the next item.
+        self._forward_items(conductor, xs[5:6], start=5)
+        path = conductor._item_results[("task1", 0)].path
+        self.assertTrue(os.path.isfile(path))
+        self.assertNotEqual(path, store.path)
+
+        self._forward_items(conductor, xs[6:], start=6)
+        conductor.render_workflow_output()
+
+        self.assertEqual(conductor.get_workflow_status(), statuses.SUCCEEDED)
+        self.assertDictEqual(conductor.get_workflow_output(), {"y": [x.upper() for x in xs]})
+
+        # Check the spilled results are removed once the task is no longer staged.
+        conductor.get_next_tasks()
+        self.assertFalse(os.path.isfile(path))
+
+    def test_restore_item_results_with_spill_after_pruning(self):
+        xs = ["x" * 10 for i in range(0, 10)]
+        conductor = self._prep_conductor(xs, results_spill_size=50)
+
+        # Checkpoint the conductor after the results are spilled.
+        self._forward_items(conductor, xs[:5])
+        self.assertTrue(conductor._item_results[("task1", 0)].spilled)
+        checkpoint = conductor.serialize()
+
+        # Complete the items and prune the item results of the task.
+        self._forward_items(conductor, xs[5:], start=5)
+        conductor.get_next_tasks()
+        self.assertNotIn("item_results", conductor.serialize())
+
+        # Check the workflow can be resumed from the checkpoint after the results are pruned.
+        conductor = conducting.WorkflowConductor.deserialize(checkpoint)
+        self._forward_items(conductor, xs[5:], start=5)
+        conductor.render_workflow_output()
+
+        self.assertEqual(conductor.get_workflow_status(), statuses.SUCCEEDED)
+        self.assertDictEqual(conductor.get_workflow_output(), {"y": [x.upper() for x in xs]})
+        conductor.get_next_tasks()
+
+    def test_no_spill_files_left_after_restore_and_eviction(self):
+        pattern = os.path.join(tempfile.gettempdir(), "orquesta-*.results")
+        existing = set(glob.glob(pattern))
+        xs = ["x" * 10 for i in range(0, 10)]
+        conductor = self._prep_conductor(xs, results_spill_size=50)
+        self._forward_items(conductor, xs[:5])
+        data = conductor.serialize()
+        conductor.close()
+
+        # Restore the conductor repeatedly as if the conductor is loaded for each event.
+        for item_id in range(5, 9):
+            conductor = conducting.WorkflowConductor.deserialize(data)
+            self._forward_items(conductor, xs[item_id : item_id + 1], start=item_id)
+            data = conductor.serialize()
+            conductor.close()
+
+        # Evict and remove the conductor from the host.
+        host = hosting.WorkflowConductorHost(max_count=1)
+        host.put("wf1", conducting.WorkflowConductor.deserialize(data))
+        self._forward_items(host.get("wf1"), xs[9:], start=9)
+        host.put("wf2", self._prep_conductor(xs, results_spill_size=50))
+        self._forward_items(host.get("wf2"), xs)
+        host.remove("wf2")
+
+        self.assertSetEqual(set(glob.glob(pattern)) - existing, set())
+
+        conductor = host.get("wf1")
+        conductor.render_workflow_output()
+        self.assertDictEqual(conductor.get_workflow_output(), {"y": [x.upper() for x in xs]})
+        host.remove("wf1")
+
+    def test_log_result_refs_to_item_results(self):
+        xs = ["fee", "fi"]
+        spec = native_specs.WorkflowSpec(self.wf_def)
+        conductor = conducting.WorkflowConductor(spec, inputs={"xs": xs}, log_result_refs=True)
+        conductor.request_workflow_status(statuses.RUNNING)
+        conductor.get_next_tasks()
+
+        result = {"stdout": "x" * 1024}
+        self._forward_items(conductor, xs[:1])
+        self.forward_task_item_statuses(conductor, "task1", 1, [statuses.RUNNING])
+        self.forward_task_item_statuses(conductor, "task1", 1, [statuses.FAILED], result=result)
+
+        expected_errors = [
+            {
+                "type": "error",
+                "message": "Execution failed. See item result for details.",
+                "task_id": "task1",
+                "data": {"result_ref": {"task_id": "task1", "route": 0, "item_id": 1}},
+            }
+        ]
+
+        self.assertEqual(conductor.get_workflow_status(), statuses.FAILED)
+        self.assertListEqual(conductor.errors[:1], expected_errors)
+
+        # Check the result ref resolves to the result of the item, including after restore.
+        result_ref = conductor.errors[0]["data"]["result_ref"]
+        self.assertDictEqual(conductor.get_task_item_result(**result_ref), result)
+        conductor = conducting.WorkflowConductor.deserialize(conductor.serialize())
+        self.assertDictEqual(conductor.get_task_item_result(**result_ref), result)
+
+    def test_accumulate_item_results_with_delta(self):
+        xs = ["fee", "fi", "fo"]
+        conductor = self._prep_conductor(xs)
+        data = conductor.serialize()
+        version = conductor.workflow_state.version
+
+        self._forward_items(conductor, xs[:2])
+        delta = conductor.serialize_delta(since=version)
+        self.assertListEqual(
+            delta["item_results"], [["task1", 0, 3, 0, "FEE"], ["task1", 0, 3, 1, "FI"]]
+        )
+
+        other = conducting.WorkflowConductor.deserialize(data)
+        other.apply_delta(delta)
+        self.assertDictEqual(other.serialize(), conductor.serialize())
+
+        self._forward_items(other, xs[2:], start=2)
+        other.render_workflow_output()
+        self.assertDictEqual(other.get_workflow_output(), {"y": [x.upper() for x in xs]})
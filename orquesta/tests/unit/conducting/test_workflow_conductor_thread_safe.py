@@ -0,0 +1,246 @@
+# Copyright 2021 The StackStorm Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import threading
+
+from orquesta import conducting
+from orquesta import events
+from orquesta import exceptions as exc
+from orquesta.specs import native as native_specs
+from orquesta import statuses
+from orquesta.tests.unit import base as test_base
+
+
+class WorkflowConductorThreadSafeTest(test_base.WorkflowConductorTest):
+    wf_def = """
+    version: 1.0
+
+    input:
+      - xs
+
+    tasks:
+      task1:
+        with: <% ctx(xs) %>
+        action: core.echo message=<% item() %>
+        next:
+          - when: <% succeeded() %>
+            publish: y=<% result() %>
+            do: task2
+      task2:
+        action: core.noop
+
+    output:
+      - y: <% ctx(y) %>
+    """
+
+    def _prep_conductor(self, xs, thread_safe=True):
+        spec = native_specs.WorkflowSpec(self.wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        conductor = conducting.WorkflowConductor(spec, inputs={"xs": xs}, thread_safe=thread_safe)
+        conductor.request_workflow_status(statuses.RUNNING)
+        conductor.get_next_tasks()
+
+        return conductor
+
+    def _run_item(self, conductor, item_id, x):
+        for status in [statuses.RUNNING, statuses.SUCCEEDED]:
+            event = events.TaskItemActionExecutionEvent(item_id, status, result=x)
+            conductor.update_task_state("task1", 0, event)
+
+    def test_update_task_state_concurrently(self):
+        xs = ["x%s" % i for i in range(0, 100)]
+        conductor = self._prep_conductor(xs)
+        errors = []
+
+        def run_items(item_ids):
+            try:
+                for item_id in item_ids:
+                    self._run_item(conductor, item_id, xs[item_id])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=run_items, args=(range(i, len(xs), 4),)) for i in range(0, 4)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertListEqual(errors, [])
+
+        next_tasks = conductor.get_next_tasks()
+        self.assertListEqual([t["id"] for t in next_tasks], ["task2"])
+        self.forward_task_statuses(conductor, "task2", [statuses.RUNNING, statuses.SUCCEEDED])
+        conductor.render_workflow_output()
+
+        self.assertEqual(conductor.get_workflow_status(), statuses.SUCCEEDED)
+        self.assertDictEqual(conductor.get_workflow_output(), {"y": xs})
+
+        # Compare the workflow state with the same events applied from a single thread.
+        expected = self._prep_conductor(xs, thread_safe=False)
+
+        for item_id, x in enumerate(xs):
+            self._run_item(expected, item_id, x)
+
+        expected.get_next_tasks()
+        self.forward_task_statuses(expected, "task2", [statuses.RUNNING, statuses.SUCCEEDED])
+        expected.render_workflow_output()
+
+        self.assertEqual(
+            conductor.serialize()["state"]["status"], expected.serialize()["state"]["status"]
+        )
+
+        self.assertEqual(len(conductor.workflow_state.sequence), 2)
+        self.assertDictEqual(conductor.get_workflow_output(), expected.get_workflow_output())
+
+    def test_render_tasks_outside_lock(self):
+        conductor = self._prep_conductor(["a", "b"])
+        render_task = conductor._render_task
+        locked = []
+
+        def try_lock():
+            acquired = conductor._lock.acquire(False)
+            locked.append(not acquired)
+
+            if acquired:
+                conductor._lock.release()
+
+        def render_task_in_thread(*args, **kwargs):
+            thread = threading.Thread(target=try_lock)
+            thread.start()
+            thread.join()
+
+            return render_task(*args, **kwargs)
+
+        with mock.patch.object(conductor, "_render_task", side_effect=render_task_in_thread):
+            next_tasks = conductor.get_next_tasks()
+            task = conductor.get_task("task1", 0, item_ids=[1])
+
+        # Check the lock is not held by the conductor while the tasks are rendered.
+        self.assertListEqual(locked, [False, False])
+        self.assertListEqual([a["item_id"] for a in next_tasks[0]["actions"]], [0, 1])
+        self.assertListEqual([a["item_id"] for a in task["actions"]], [1])
+        self.assertIsInstance(task["ctx"]["__state"], dict)
+
+    def test_render_tasks_from_state_snapshot(self):
+        conductor = self._prep_conductor(["a", "b"])
+
+        # Check the workflow state is not serialized in whole to render and return the tasks.
+        with mock.patch.object(conducting.WorkflowState, "serialize") as serialize:
+            next_tasks = conductor.get_next_tasks()
+
+        serialize.assert_not_called()
+
+        # Check the tasks share the snapshot of the workflow state in the task context.
+        state = next_tasks[0]["ctx"]["__state"]
+        self.assertListEqual(sorted(state.keys()), ["routes", "sequence", "status", "tasks"])
+        self.assertListEqual(state["routes"], [[]])
+        self.assertEqual(state["status"], statuses.RUNNING)
+
+    def test_workflow_state_without_lock(self):
+        conductor = self._prep_conductor(["a"])
+        workflow_state = conductor.workflow_state
+
+        # Check the lock is not taken to access the workflow state once it is initialized.
+        with mock.patch.object(conductor, "_lock") as lock:
+            self.assertIs(conductor.workflow_state, workflow_state)
+
+        lock.__enter__.assert_not_called()
+
+    def test_update_task_state_concurrently_marks_terminal_tasks(self):
+        wf_def = """
+        version: 1.0
+
+        vars:
+          - a: 0
+
+        tasks:
+          task1:
+            action: core.noop
+            next:
+              - when: <% succeeded() %>
+                publish: x=1
+                do: task2
+              - when: <% succeeded() %>
+                publish: y=2
+                do: task3
+          task2:
+            action: core.noop
+            next:
+              - when: <% failed() %>
+                do: task4
+          task3:
+            action: core.noop
+          task4:
+            action: core.noop
+
+        output:
+          - a: <% ctx(a) %>
+          - x: <% ctx().get('x') %>
+          - y: <% ctx().get('y') %>
+        """
+
+        spec = native_specs.WorkflowSpec(wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        conductor = conducting.WorkflowConductor(spec, thread_safe=True)
+        conductor.request_workflow_status(statuses.RUNNING)
+        self.forward_task_statuses(conductor, "task1", [statuses.RUNNING, statuses.SUCCEEDED])
+
+        task_events = [
+            (task_id, 0, events.ActionExecutionEvent(status))
+            for task_id in ["task2", "task3"]
+            for status in [statuses.RUNNING, statuses.SUCCEEDED]
+        ]
+
+        # Queue the events as if submitted by other callers while the lock is held so the
+        # events are applied in one batch by the last caller.
+        requests = [{"event": task_event} for task_event in task_events[:-1]]
+        conductor._pending_events.extend(requests)
+        conductor.update_task_state(*task_events[-1])
+        conductor.render_workflow_output()
+
+        # Check only the task that completes the workflow is terminal.
+        term_tasks = [t["id"] for _, t in conductor.workflow_state.get_terminal_tasks()]
+        self.assertListEqual([r.get("error") for r in requests], [None] * 3)
+        self.assertEqual(conductor.get_workflow_status(), statuses.SUCCEEDED)
+        self.assertListEqual(term_tasks, ["task3"])
+        self.assertDictEqual(conductor.get_workflow_output(), {"a": 0, "x": None, "y": 2})
+
+    def test_update_task_state_error(self):
+        conductor = self._prep_conductor(["a"])
+        event = events.ActionExecutionEvent(statuses.RUNNING)
+
+        self.assertRaises(exc.InvalidTask, conductor.update_task_state, "task3", 0, event)
+
+        # Check the error is returned to the caller only and the next event is applied.
+        self._run_item(conductor, 0, "a")
+        self.assertEqual(conductor.get_task_state_entry("task1", 0)["status"], statuses.SUCCEEDED)
+
+    def test_deserialize_thread_safe(self):
+        conductor = self._prep_conductor(["a"], thread_safe=False)
+        self.assertIsNone(conductor._lock)
+
+        conductor = conducting.WorkflowConductor.deserialize(
+            conductor.serialize(), thread_safe=True
+        )
+
+        self.assertTrue(conductor.thread_safe)
+        self.assertIsNotNone(conductor._lock)
+        self.assertNotIn("thread_safe", conductor.serialize())
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import mock
+
 from orquesta import conducting
 from orquesta.specs import native as native_specs
 from orquesta import statuses
@@ -649,3 +651,133 @@ class WorkflowConductorWithItemsTest(test_base.WorkflowConductorWithItemsTest):
 
         # Assert the workflow succeeded.
         self.assertEqual(conductor.get_workflow_status(), statuses.SUCCEEDED)
+
+    def test_items_rendered_per_concurrency(self):
+        wf_def = """
+        version: 1.0
+
+        vars:
+          - xs: <% range(0, 20).select(str($)) %>
+
+        tasks:
+          task1:
+            with:
+              items: <% ctx(xs) %>
+              concurrency: 2
+            action: core.echo message=<% item() %>
+        """
+
+        spec = native_specs.WorkflowSpec(wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        conductor = conducting.WorkflowConductor(spec)
+        conductor.request_workflow_status(statuses.RUNNING)
+
+        task_spec_cls = type(spec.tasks.get_task("task1"))
+        get_items = task_spec_cls.get_items
+        render_item = task_spec_cls.render_item
+
+        with mock.patch.object(
+            task_spec_cls, "get_items", autospec=True, side_effect=get_items
+        ) as mock_get_items, mock.patch.object(
+            task_spec_cls, "render_item", autospec=True, side_effect=render_item
+        ) as mock_render_item:
+            next_tasks = conductor.get_next_tasks()
+            self.assertEqual(next_tasks[0]["items_count"], 20)
+            self.assertListEqual([a["item_id"] for a in next_tasks[0]["actions"]], [0, 1])
+            self.forward_task_item_statuses(conductor, "task1", 0, [statuses.RUNNING])
+            self.forward_task_item_statuses(conductor, "task1", 1, [statuses.RUNNING])
+
+            # Complete an item and check only the next item is returned.
+            for i in range(0, 18):
+                self.forward_task_item_statuses(conductor, "task1", i, [statuses.SUCCEEDED])
+                next_tasks = conductor.get_next_tasks()
+                self.assertListEqual([a["item_id"] for a in next_tasks[0]["actions"]], [i + 2])
+                self.forward_task_item_statuses(conductor, "task1", i + 2, [statuses.RUNNING])
+
+        # The items are rendered once and the action spec is rendered once for each item.
+        self.assertEqual(mock_get_items.call_count, 1)
+        self.assertEqual(mock_render_item.call_count, 20)
+
+    def test_items_not_staged_on_rendering_error(self):
+        wf_def = """
+        version: 1.0
+
+        vars:
+          - xs:
+              - fee
+              - fi
+          - ys:
+              - foo
+              - fu
+          - foobar: fubar
+
+        tasks:
+          task1:
+            with:
+              items: x, y in <% zip(ctx(xs), ctx(ys)) %>
+              concurrency: <% ctx().foobar.fubar %>
+            action: core.echo message=<% item(x) + item(y) %>
+        """
+
+        spec = native_specs.WorkflowSpec(wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        conductor = conducting.WorkflowConductor(spec)
+        conductor.request_workflow_status(statuses.RUNNING)
+
+        # The get_next_tasks method should not return any tasks.
+        self.assert_next_task(conductor, has_next_task=False)
+
+        # The workflow should fail and the task is not staged to track the items.
+        self.assertEqual(conductor.get_workflow_status(), statuses.FAILED)
+        self.assertEqual(len(conductor.errors), 1)
+        self.assertEqual(conductor.errors[0]["task_id"], "task1")
+        staged_task = conductor.workflow_state.get_staged_task("task1", 0)
+        self.assertNotIn("items", staged_task)
+
+    def test_items_with_compact_items(self):
+        wf_def = """
+        version: 1.0
+
+        vars:
+          - xs:
+              - fee
+              - fi
+              - fo
+              - fum
+
+        tasks:
+          task1:
+            with: <% ctx(xs) %>
+            action: core.echo message=<% item() %>
+        """
+
+        spec = native_specs.WorkflowSpec(wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        conductor = conducting.WorkflowConductor(spec, compact_items=True)
+        conductor.request_workflow_status(statuses.RUNNING)
+        conductor.get_next_tasks()
+
+        for i in range(0, 2):
+            self.forward_task_item_statuses(conductor, "task1", i, [statuses.RUNNING])
+            self.forward_task_item_statuses(conductor, "task1", i, [statuses.SUCCEEDED])
+
+        # Assert the item statuses are serialized in the compact form.
+        data = conductor.serialize()
+        expected_runs = [[statuses.SUCCEEDED, 2], [statuses.UNSET, 2]]
+        self.assertTrue(data["compact_items"])
+        self.assertDictEqual(data["state"]["staged"][0]["items"], {"runs": expected_runs})
+
+        # Assert the remaining items are run after the conductor is deserialized.
+        conductor = conducting.WorkflowConductor.deserialize(data)
+        next_tasks = conductor.get_next_tasks()
+        self.assertListEqual([a["item_id"] for a in next_tasks[0]["actions"]], [2, 3])
+
+        for i in range(2, 4):
+            self.forward_task_item_statuses(conductor, "task1", i, [statuses.RUNNING])
+            self.forward_task_item_statuses(conductor, "task1", i, [statuses.SUCCEEDED])
+
+        self.assertIsNone(conductor.workflow_state.get_staged_task("task1", 0))
+        self.assertEqual(conductor.get_workflow_status(), statuses.SUCCEEDED)
@@ -264,3 +264,326 @@ class WorkflowStateTest(unittest.TestCase):
         actual_task_sequence = state.get_tasks_by_status(statuses.SUCCEEDED, last_occurrence=True)
 
         self.assertListEqual(actual_task_sequence, expected_task_sequence)
+
+    def test_get_staged_tasks(self):
+        data = copy.deepcopy(MOCK_WORKFLOW_STATE)
+
+        staged = [
+            {"id": "task1", "route": 0, "ctxs": {"in": [0]}, "prev": {}, "ready": True},
+            {"id": "task2", "route": 0, "ctxs": {"in": [0]}, "prev": {}, "ready": False},
+            {"id": "task3", "route": 1, "ctxs": {"in": [0]}, "prev": {}, "ready": True},
+            {
+                "id": "task4",
+                "route": 0,
+                "ctxs": {"in": [0]},
+                "prev": {},
+                "ready": True,
+                "completed": True,
+            },
+        ]
+
+        data["staged"] = copy.deepcopy(staged)
+        state = conducting.WorkflowState.deserialize(data)
+
+        self.assertListEqual(state.get_staged_tasks(filtered=False), staged)
+        self.assertListEqual(state.get_staged_tasks(), [staged[0], staged[2]])
+        self.assertTrue(state.has_staged_tasks)
+        self.assertDictEqual(state.get_staged_task("task3", 1), staged[2])
+        self.assertIsNone(state.get_staged_task("task3", 0))
+        self.assertListEqual(state.serialize()["staged"], staged)
+
+    def test_staged_task_index(self):
+        state = conducting.WorkflowState()
+
+        state.add_staged_task("task1", 0, ready=True)
+        state.add_staged_task("task2", 0, ready=False)
+        state.add_staged_task("task3", 0, ready=True)
+
+        actual_staged_task_ids = [t["id"] for t in state.get_staged_tasks()]
+        self.assertListEqual(actual_staged_task_ids, ["task1", "task3"])
+
+        state.set_staged_task_ready("task2", 0)
+        state.set_staged_task_completed("task3", 0)
+
+        actual_staged_task_ids = [t["id"] for t in state.get_staged_tasks()]
+        self.assertListEqual(actual_staged_task_ids, ["task1", "task2"])
+        self.assertTrue(state.get_staged_task("task3", 0)["completed"])
+
+        state.set_staged_task_completed("task3", 0, completed=False)
+        state.remove_staged_task("task1", 0)
+
+        actual_staged_task_ids = [t["id"] for t in state.get_staged_tasks()]
+        self.assertListEqual(actual_staged_task_ids, ["task2", "task3"])
+        self.assertIsNone(state.get_staged_task("task1", 0))
+        self.assertNotIn("completed", state.get_staged_task("task3", 0))
+
+        state.remove_staged_task("task2", 0)
+        state.remove_staged_task("task3", 0)
+
+        self.assertFalse(state.has_staged_tasks)
+        self.assertListEqual(state.staged, [])
+
+    def test_staged_task_items(self):
+        state = conducting.WorkflowState()
+        state.add_staged_task("task1", 0)
+        state.get_staged_task("task1", 0)["items"] = [{"status": statuses.UNSET}] * 5
+        state.reindex_staged_task("task1", 0)
+
+        items = state.get_staged_task_items("task1", 0)
+        self.assertListEqual(items.get_notrun_items(), [0, 1, 2, 3, 4])
+        self.assertListEqual(items.get_notrun_items(limit=2), [0, 1])
+        self.assertListEqual(items.get_notrun_items(end=3), [0, 1, 2])
+
+        state.set_staged_task_item_status("task1", 0, 0, statuses.SUCCEEDED)
+        state.set_staged_task_item_status("task1", 0, 1, statuses.RUNNING)
+        state.set_staged_task_item_status("task1", 0, 3, statuses.FAILED)
+
+        self.assertIs(state.get_staged_task_items("task1", 0), items)
+        self.assertListEqual(items.get_notrun_items(), [2, 4])
+        self.assertEqual(items.count(statuses.ACTIVE_STATUSES), 1)
+        self.assertEqual(items.count(statuses.ACTIVE_STATUSES, exclude=1), 0)
+        self.assertEqual(items.count(statuses.COMPLETED_STATUSES), 2)
+        self.assertEqual(items.count(statuses.ABENDED_STATUSES, exclude=0), 1)
+
+        # The items should not be shared after the status of the items is changed.
+        expected_items = [
+            {"status": statuses.SUCCEEDED},
+            {"status": statuses.RUNNING},
+            {"status": statuses.UNSET},
+            {"status": statuses.FAILED},
+            {"status": statuses.UNSET},
+        ]
+
+        self.assertListEqual(state.get_staged_task("task1", 0)["items"], expected_items)
+
+        # Check the items with running status are not removed from staging.
+        state.remove_staged_task("task1", 0)
+        self.assertIsNotNone(state.get_staged_task("task1", 0))
+
+        # Check the tracker is rebuilt after the items are changed in place.
+        state.get_staged_task("task1", 0)["items"][3]["status"] = statuses.UNSET
+        state.reindex_staged_task("task1", 0)
+
+        items = state.get_staged_task_items("task1", 0)
+        self.assertListEqual(items.get_notrun_items(), [2, 3, 4])
+        self.assertEqual(items.count(statuses.ABENDED_STATUSES), 0)
+
+        state.set_staged_task_item_status("task1", 0, 1, statuses.SUCCEEDED)
+        state.remove_staged_task("task1", 0)
+        self.assertIsNone(state.get_staged_task("task1", 0))
+        self.assertIsNone(state.get_staged_task_items("task1", 0))
+
+    def test_serialize_compact_items(self):
+        state = conducting.WorkflowState()
+        state.add_staged_task("task1", 0)
+        state.get_staged_task("task1", 0)["items"] = [{"status": statuses.UNSET}] * 100
+        state.reindex_staged_task("task1", 0)
+
+        for i in range(0, 98):
+            state.set_staged_task_item_status("task1", 0, i, statuses.SUCCEEDED)
+
+        state.set_staged_task_item_status("task1", 0, 98, statuses.RUNNING)
+
+        data = state.serialize(compact_items=True)
+        expected_runs = [[statuses.SUCCEEDED, 98], [statuses.RUNNING, 1], [statuses.UNSET, 1]]
+        self.assertDictEqual(data["staged"][0]["items"], {"runs": expected_runs})
+
+        # Check the items are decoded when the workflow state is deserialized.
+        self.assertDictEqual(
+            conducting.WorkflowState.deserialize(data).serialize(), state.serialize()
+        )
+
+        # Check the delta is serialized with the compact form of items.
+        other = conducting.WorkflowState.deserialize(state.serialize())
+        version = state.version
+        state.set_staged_task_item_status("task1", 0, 99, statuses.RUNNING)
+
+        delta = state.serialize_delta(since=version, compact_items=True)
+        expected_runs = [[statuses.SUCCEEDED, 98], [statuses.RUNNING, 2]]
+        self.assertDictEqual(delta["staged"][0][2]["items"], {"runs": expected_runs})
+
+        other.apply_delta(delta)
+        self.assertDictEqual(other.serialize(), state.serialize())
+        self.assertEqual(other.get_staged_task_items("task1", 0).count([statuses.RUNNING]), 2)
+
+    def test_task_index(self):
+        state = conducting.WorkflowState()
+
+        state.add_task({"id": "task1", "route": 0, "status": statuses.SUCCEEDED})
+        state.add_task({"id": "task2", "route": 0, "status": statuses.RUNNING})
+        state.add_task({"id": "task3", "route": 0, "status": statuses.PAUSED})
+
+        self.assertTrue(state.has_active_tasks)
+        self.assertTrue(state.has_paused_tasks)
+        self.assertFalse(state.has_canceled_tasks)
+
+        # Change the status of the task state entries in place and update the index.
+        state.sequence[1]["status"] = statuses.SUCCEEDED
+        state.sequence[1]["term"] = True
+        state.reindex_task(1)
+
+        self.assertFalse(state.has_active_tasks)
+        self.assertListEqual(state.get_terminal_tasks(), [(1, state.sequence[1])])
+
+        # Add a new occurrence of task3 which replaces the previous one in the status index.
+        state.add_task({"id": "task3", "route": 0, "status": statuses.CANCELED})
+
+        self.assertFalse(state.has_paused_tasks)
+        self.assertTrue(state.has_canceled_tasks)
+
+        expected_task_sequence = [
+            (0, {"id": "task1", "route": 0, "status": statuses.SUCCEEDED}),
+            (1, {"id": "task2", "route": 0, "status": statuses.SUCCEEDED, "term": True}),
+        ]
+
+        actual_task_sequence = state.get_tasks_by_status([statuses.SUCCEEDED])
+
+        self.assertListEqual(actual_task_sequence, expected_task_sequence)
+
+        expected_task_sequence = [(3, {"id": "task3", "route": 0, "status": statuses.CANCELED})]
+
+        actual_task_sequence = state.get_tasks(task_id="task3")
+
+        self.assertListEqual(actual_task_sequence, expected_task_sequence)
+
+        # Ensure the index is rebuilt from the serialized workflow state.
+        state = conducting.WorkflowState.deserialize(state.serialize())
+
+        self.assertFalse(state.has_paused_tasks)
+        self.assertTrue(state.has_canceled_tasks)
+        self.assertEqual(len(state.get_tasks(task_id="task3", last_occurrence=False)), 2)
+        self.assertListEqual(state.get_terminal_tasks(), [(1, state.sequence[1])])
+
+    def test_get_task_sequence(self):
+        data = copy.deepcopy(MOCK_WORKFLOW_STATE)
+
+        task_sequence = [
+            {"id": "task1", "route": 0, "prev": {}},
+            {"id": "task2", "route": 0, "prev": {"task1__t0": 0}},
+            {"id": "task3", "route": 0, "prev": {"task1__t0": 0}},
+            {"id": "task4", "route": 0, "prev": {"task2__t0": 1, "task3__t0": 2}},
+            {"id": "task5", "route": 0, "prev": {"task4__t0": 3}},
+            {"id": "task6", "route": 0, "prev": {}},
+        ]
+
+        data["sequence"] = copy.deepcopy(task_sequence)
+
+        task_map = {"task%d__r0" % (i + 1): i for i in range(0, 6)}
+
+        data["tasks"] = copy.deepcopy(task_map)
+
+        state = conducting.WorkflowState.deserialize(data)
+
+        actual_task_sequence = state.get_task_sequence("task2", 0)
+        self.assertListEqual([i for i, t in actual_task_sequence], [1, 3, 4])
+
+        actual_task_sequence = state.get_task_sequence("task1", 0)
+        self.assertListEqual(sorted([i for i, t in actual_task_sequence]), [0, 1, 2, 3, 4])
+
+        # Ensure the successor index is updated when a task state entry is added.
+        state.add_task({"id": "task7", "route": 0, "prev": {"task5__t0": 4}})
+
+        actual_task_sequence = state.get_task_sequence("task4", 0)
+        self.assertListEqual([i for i, t in actual_task_sequence], [3, 4, 6])
+
+    def test_get_task_sequence_in_cycle(self):
+        data = copy.deepcopy(MOCK_WORKFLOW_STATE)
+
+        task_sequence = [
+            {"id": "init", "route": 0, "prev": {}},
+            {"id": "task1", "route": 0, "prev": {"init__t0": 0}},
+            {"id": "task2", "route": 0, "prev": {"task1__t0": 1}},
+            {"id": "task1", "route": 0, "prev": {"task2__t0": 2}},
+            {"id": "task2", "route": 0, "prev": {"task1__t0": 3}},
+        ]
+
+        data["sequence"] = copy.deepcopy(task_sequence)
+        data["tasks"] = {"init__r0": 0, "task1__r0": 3, "task2__r0": 4}
+
+        state = conducting.WorkflowState.deserialize(data)
+
+        actual_task_sequence = state.get_task_sequence("task1", 0)
+        self.assertListEqual(sorted([i for i, t in actual_task_sequence]), [2, 3, 4])
+
+    def test_routes(self):
+        data = copy.deepcopy(MOCK_WORKFLOW_STATE)
+        data["routes"] = [[], ["task1__t0"], ["task1__t0", "task2__t0"], ["task3__t0"]]
+
+        state = conducting.WorkflowState.deserialize(data)
+        self.assertIsInstance(state.routes, conducting.RouteTrie)
+        self.assertListEqual(state.routes.get_ancestors(2), [1, 0])
+        self.assertTrue(state.routes.has_transition(2, "task1__t0"))
+        self.assertFalse(state.routes.has_transition(3, "task1__t0"))
+
+        # Check the new route is split from the parent route.
+        idx = state.split_route(2, "task4__t0")
+        self.assertEqual(idx, 4)
+        self.assertListEqual(state.routes[idx], ["task1__t0", "task2__t0", "task4__t0"])
+        self.assertListEqual(state.routes.get_ancestors(idx), [2, 1, 0])
+
+        # Check the routes are serialized as the list of task transitions.
+        data["routes"].append(["task1__t0", "task2__t0", "task4__t0"])
+        self.assertEqual(state.routes, data["routes"])
+        self.assertListEqual(state.serialize()["routes"], data["routes"])
+        self.assertListEqual(state.serialize_delta(since=0)["routes"], [[4, data["routes"][4]]])
+
+        # Check the routes without parent route are kept as is.
+        routes = conducting.RouteTrie([["task1__t0"], ["task1__t0", "task2__t0"]])
+        self.assertListEqual(routes.get_ancestors(1), [])
+        self.assertEqual(routes, [["task1__t0"], ["task1__t0", "task2__t0"]])
+
+    def test_get_context(self):
+        data = copy.deepcopy(MOCK_WORKFLOW_STATE)
+
+        data["contexts"] = [
+            {"a": 1, "b": {"x": 1}},
+            {"b": {"y": 2}},
+            {"a": 3, "c": {"z": 3}},
+        ]
+
+        state = conducting.WorkflowState.deserialize(data)
+
+        expected_ctx = {"a": 1, "b": {"x": 1, "y": 2}}
+        self.assertDictEqual(state.get_context([0, 1]), expected_ctx)
+        self.assertIs(state.get_context([0, 1]), state.get_context([0, 1]))
+
+        # The merged context of the prefix is reused and the context entries are not changed.
+        expected_ctx = {"a": 3, "b": {"x": 1, "y": 2}, "c": {"z": 3}}
+        ctx = state.get_context([0, 1, 2])
+        self.assertDictEqual(ctx, expected_ctx)
+        self.assertIs(ctx["b"], state.get_context([0, 1])["b"])
+        self.assertIs(ctx["c"], state.contexts[2]["c"])
+        self.assertDictEqual(state.contexts[0], {"a": 1, "b": {"x": 1}})
+
+        # The nested dicts merged from many context entries don't change the context entries.
+        state.contexts.append({"b": {"z": 4}})
+        ctx = state.get_context([0, 1, 2, 3])
+        self.assertDictEqual(ctx["b"], {"x": 1, "y": 2, "z": 4})
+        self.assertDictEqual(state.contexts[0], {"a": 1, "b": {"x": 1}})
+        self.assertDictEqual(state.contexts[1], {"b": {"y": 2}})
+        self.assertDictEqual(state.get_context([0, 1])["b"], {"x": 1, "y": 2})
+
+        # The cache is invalidated when the contexts are replaced.
+        state.contexts = [{"a": 4}]
+        self.assertDictEqual(state.get_context([0]), {"a": 4})
+
+    def test_get_context_cache_size(self):
+        data = copy.deepcopy(MOCK_WORKFLOW_STATE)
+        data["contexts"] = [{"k%s" % i: i} for i in range(10)]
+
+        state = conducting.WorkflowState.deserialize(data)
+        state.CONTEXT_CACHE_SIZE = 4
+
+        for i in range(1, 11):
+            ctx = state.get_context(list(range(i)))
+
+        # Check only the merged context of the full tuple of indices is cached.
+        self.assertDictEqual(ctx, {"k%s" % i: i for i in range(10)})
+        self.assertEqual(len(state._context_cache), 4)
+        self.assertListEqual(
+            list(state._context_cache.keys()), [tuple(range(i)) for i in [7, 8, 9, 10]]
+        )
+
+        state.get_context([9, 0])
+        self.assertEqual(len(state._context_cache), 4)
+        self.assertNotIn((9,), state._context_cache)
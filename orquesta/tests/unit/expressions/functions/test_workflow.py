@@ -14,6 +14,7 @@
 
 import unittest
 
+from orquesta import conducting
 from orquesta import constants
 from orquesta import exceptions as exc
 from orquesta.expressions.functions import workflow as funcs
@@ -114,6 +115,21 @@ class WorkflowFunctionTest(unittest.TestCase):
         actual_task_status = funcs.task_status_(context, task_name, route=task_route)
         self.assertEqual(actual_task_status, statuses.RUNNING)
 
+    def test_task_status_from_workflow_state_view(self):
+        task_route = 0
+        task_name = "t1"
+
+        workflow_state = conducting.WorkflowState()
+        workflow_state.add_task({"id": task_name, "route": task_route, "status": statuses.RUNNING})
+        context = {"__state": conducting.WorkflowStateView(workflow_state)}
+        actual_task_status = funcs.task_status_(context, task_name, route=task_route)
+        self.assertEqual(actual_task_status, statuses.RUNNING)
+
+        # The view reflects changes to the workflow state without being recreated.
+        workflow_state.sequence[0]["status"] = statuses.SUCCEEDED
+        actual_task_status = funcs.task_status_(context, task_name, route=task_route)
+        self.assertEqual(actual_task_status, statuses.SUCCEEDED)
+
     def test_task_status_route_from_current_task(self):
         task_route = 0
         task_name = "t1"
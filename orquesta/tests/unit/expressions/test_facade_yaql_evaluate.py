@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
 import unittest
 
 from orquesta import exceptions as exc
@@ -187,3 +188,20 @@ class YAQLFacadeEvaluationTest(unittest.TestCase):
         ]
         for case in test_cases:
             self.assertEqual(case["expect"], expr_base.evaluate(case["expr"], case["input"]))
+
+    def test_eval_concurrently(self):
+        expr = "<% ctx().x + ctx().y.len() %>"
+        results = {}
+
+        def evaluate(i):
+            results[i] = [expr_base.evaluate(expr, {"x": i, "y": "abc"}) for j in range(0, 50)]
+
+        threads = [threading.Thread(target=evaluate, args=(i,)) for i in range(0, 8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertDictEqual(results, {i: [i + 3] * 50 for i in range(0, 8)})
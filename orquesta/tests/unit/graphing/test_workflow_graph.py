@@ -144,6 +144,12 @@ class WorkflowGraphTest(test_base.WorkflowGraphTest):
         expected = {"id": "task1"}
         self.assertDictEqual(wf_graph.get_task("task1"), expected)
 
+    def test_get_task_ids(self):
+        wf_graph = self._prep_graph()
+
+        expected = ["task%s" % i for i in range(1, 10)]
+        self.assertListEqual(wf_graph.get_task_ids(), expected)
+
     def test_get_nonexistent_task(self):
         wf_graph = self._prep_graph()
 
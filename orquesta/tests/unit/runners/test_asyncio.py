@@ -0,0 +1,276 @@
+# Copyright 2021 The StackStorm Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import mock
+import unittest
+
+from orquesta import conducting
+from orquesta.runners import asyncio as asyncio_runner
+from orquesta.specs import native as native_specs
+from orquesta import statuses
+
+
+async def echo(action, task):
+    await asyncio.sleep(0)
+    return action["input"]["message"]
+
+
+async def fail(action, task):
+    raise Exception("Action failed.")
+
+
+async def cancel(action, task):
+    future = asyncio.get_event_loop().create_future()
+    future.cancel()
+    await future
+
+
+class AsyncioWorkflowRunnerTest(unittest.TestCase):
+    def _prep_conductor(self, wf_def, inputs=None):
+        spec = native_specs.WorkflowSpec(wf_def)
+        self.assertDictEqual(spec.inspect(), {})
+
+        return conducting.WorkflowConductor(spec, inputs=inputs)
+
+    def test_run(self):
+        wf_def = """
+        version: 1.0
+
+        tasks:
+          task1:
+            action: core.echo message="fee"
+            next:
+              - when: <% succeeded() %>
+                publish: x=<% result() %>
+                do: task2, task3
+          task2:
+            action: core.echo message="fi"
+            next:
+              - when: <% succeeded() %>
+                publish: y=<% result() %>
+                do: task4
+          task3:
+            action: core.noop
+            next:
+              - do: task4
+          task4:
+            join: all
+
+        output:
+          - x: <% ctx(x) %>
+          - y: <% ctx(y) %>
+        """
+
+        conductor = self._prep_conductor(wf_def)
+        noop = mock.MagicMock()
+
+        async def noop_executor(action, task):
+            noop(action["action"], task["id"])
+
+        executors = {"core.echo": echo, "core.noop": noop_executor}
+        status = asyncio_runner.run(conductor, executors=executors)
+
+        self.assertEqual(status, statuses.SUCCEEDED)
+        self.assertDictEqual(conductor.get_workflow_output(), {"x": "fee", "y": "fi"})
+        noop.assert_called_once_with("core.noop", "task3")
+
+        actual_task_seq = [t["id"] for t in conductor.workflow_state.sequence]
+        self.assertListEqual(sorted(actual_task_seq), ["task1", "task2", "task3", "task4"])
+
+    def test_run_with_items_and_concurrency(self):
+        wf_def = """
+        version: 1.0
+
+        input:
+          - xs
+
+        tasks:
+          task1:
+            with: <% ctx(xs) %>
+            action: core.echo message=<% item() %>
+            next:
+              - when: <% succeeded() %>
+                publish: xs=<% result() %>
+
+        output:
+          - xs: <% ctx(xs) %>
+        """
+
+        xs = ["x%s" % i for i in range(0, 20)]
+        conductor = self._prep_conductor(wf_def, inputs={"xs": xs})
+        running = {"count": 0, "max": 0}
+
+        async def counted_echo(action, task):
+            running["count"] += 1
+            running["max"] = max(running["max"], running["count"])
+            await asyncio.sleep(0.001)
+            running["count"] -= 1
+            return action["input"]["message"]
+
+        status = asyncio_runner.run(conductor, executors={"core.echo": counted_echo}, concurrency=3)
+
+        self.assertEqual(status, statuses.SUCCEEDED)
+        self.assertDictEqual(conductor.get_workflow_output(), {"xs": xs})
+        self.assertEqual(running["max"], 3)
+
+    def test_run_with_empty_items(self):
+        wf_def = """
+        version: 1.0
+
+        tasks:
+          task1:
+            with: <% [] %>
+            action: core.echo message=<% item() %>
+            next:
+              - publish: xs=<% result() %>
+
+        output:
+          - xs: <% ctx(xs) %>
+        """
+
+        conductor = self._prep_conductor(wf_def)
+        status = asyncio_runner.run(conductor, executors={"core.echo": echo})
+
+        self.assertEqual(status, statuses.SUCCEEDED)
+        self.assertDictEqual(conductor.get_workflow_output(), {"xs": []})
+
+    def test_run_with_delay_and_retry(self):
+        wf_def = """
+        version: 1.0
+
+        tasks:
+          task1:
+            delay: 2
+            action: core.fail
+            retry:
+              count: 2
+              delay: 3
+        """
+
+        conductor = self._prep_conductor(wf_def)
+        delays = []
+        sleep = asyncio.sleep
+
+        async def mock_sleep(delay):
+            delays.append(delay)
+            await sleep(0)
+
+        with mock.patch.object(asyncio, "sleep", mock_sleep):
+            status = asyncio_runner.run(conductor, executors={"core.fail": fail})
+
+        self.assertEqual(status, statuses.FAILED)
+        self.assertListEqual(delays, [2, 3, 3])
+
+        task_state_entry = conductor.get_task_state_entry("task1", 0)
+        self.assertEqual(task_state_entry["status"], statuses.FAILED)
+        self.assertEqual(task_state_entry["retry"]["tally"], 2)
+
+    def test_run_with_executor_not_found(self):
+        wf_def = """
+        version: 1.0
+
+        tasks:
+          task1:
+            action: core.foobar
+        """
+
+        conductor = self._prep_conductor(wf_def)
+        status = asyncio_runner.run(conductor, executors={"core.echo": echo})
+
+        self.assertEqual(status, statuses.FAILED)
+
+        expected_error = 'There is no executor for action "core.foobar".'
+        self.assertEqual(conductor.errors[0]["result"], {"error": expected_error})
+
+    def test_run_with_cancelled_executor(self):
+        wf_def = """
+        version: 1.0
+
+        tasks:
+          task1:
+            action: core.cancel
+            next:
+              - do: task2
+          task2:
+            action: core.echo message="fee"
+        """
+
+        conductor = self._prep_conductor(wf_def)
+        executors = {"core.cancel": cancel, "core.echo": echo}
+        status = asyncio_runner.run(conductor, executors=executors)
+
+        # Check the run is completed and the cancelled action is reported as canceled.
+        self.assertEqual(status, statuses.CANCELED)
+        task_state_entry = conductor.get_task_state_entry("task1", 0)
+        self.assertEqual(task_state_entry["status"], statuses.CANCELED)
+        self.assertIsNone(conductor.get_task_state_entry("task2", 0))
+
+    def test_run_with_default_executor(self):
+        wf_def = """
+        version: 1.0
+
+        tasks:
+          task1:
+            action: core.echo message="fee"
+            next:
+              - publish: x=<% result() %>
+
+        output:
+          - x: <% ctx(x) %>
+        """
+
+        conductor = self._prep_conductor(wf_def)
+        status = asyncio_runner.run(conductor, default_executor=echo)
+
+        self.assertEqual(status, statuses.SUCCEEDED)
+        self.assertDictEqual(conductor.get_workflow_output(), {"x": "fee"})
+
+    def test_run_keeps_references_to_actions(self):
+        wf_def = """
+        version: 1.0
+
+        tasks:
+          task1:
+            with: <% range(0, 3) %>
+            action: core.echo message=<% item() %>
+        """
+
+        conductor = self._prep_conductor(wf_def)
+        tracked = []
+
+        async def tracked_echo(action, task):
+            tracked.append(len(runner._tasks))
+            await asyncio.sleep(0)
+            return action["input"]["message"]
+
+        runner = asyncio_runner.WorkflowRunner(conductor, executors={"core.echo": tracked_echo})
+        loop = asyncio.new_event_loop()
+
+        try:
+            status = loop.run_until_complete(runner.run())
+        finally:
+            loop.close()
+
+        # Check the actions are referenced while running and are released when done.
+        self.assertEqual(status, statuses.SUCCEEDED)
+        self.assertListEqual(tracked, [3, 3, 3])
+        self.assertEqual(len(runner._tasks), 0)
+
+    def test_bad_runner_args(self):
+        self.assertRaises(ValueError, asyncio_runner.WorkflowRunner, None)
+
+        conductor = self._prep_conductor("version: 1.0\ntasks:\n  task1:\n    action: core.noop")
+
+        self.assertRaises(ValueError, asyncio_runner.WorkflowRunner, conductor, concurrency=0)
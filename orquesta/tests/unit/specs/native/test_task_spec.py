@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import six
+import types
 
 from orquesta.specs import native as native_specs
 from orquesta.tests.unit.specs.native import base as test_base
@@ -688,3 +689,37 @@ class TaskSpecTest(test_base.OrchestraWorkflowSpecTest):
         wf_spec = self.instantiate(wf_def)
 
         self.assertDictEqual(wf_spec.inspect(), expected_errors)
+
+    def test_render_items(self):
+        wf_def = """
+            version: 1.0
+            description: A basic workflow with items in task.
+            vars:
+              - xs:
+                  - fee
+                  - fi
+              - ys:
+                  - fo
+                  - fum
+            tasks:
+              task1:
+                with: x, y in <% zip(ctx(xs), ctx(ys)) %>
+                action: core.echo message=<% item(x) + item(y) %>
+        """
+
+        wf_spec = self.instantiate(wf_def)
+        task_spec = wf_spec.tasks.get_task("task1")
+        in_ctx = {"xs": ["fee", "fi"], "ys": ["fo", "fum"]}
+
+        items = task_spec.get_items(in_ctx)
+        self.assertEqual(len(items), 2)
+
+        # The action specs are rendered on demand for the given items.
+        rendered = task_spec.render_items(in_ctx, items, item_ids=[1])
+        self.assertIsInstance(rendered, types.GeneratorType)
+
+        expected_action_specs = [
+            {"action": "core.echo", "input": {"message": "fifum"}, "item_id": 1}
+        ]
+
+        self.assertListEqual(list(rendered), expected_action_specs)
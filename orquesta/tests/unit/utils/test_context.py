@@ -68,3 +68,28 @@ class ContextUtilTest(unittest.TestCase):
         self.assertRaises(TypeError, ctx_util.set_current_task, "foobar", task)
 
         self.assertRaises(TypeError, ctx_util.set_current_task, dict(), "foobar")
+
+    def test_derive_context(self):
+        context = {"var1": {"foo": "bar"}, "var2": [1, 2, 3]}
+
+        ctx = ctx_util.derive_context(context, {"var2": [4], "var3": "fubar"})
+
+        self.assertDictEqual(ctx, {"var1": {"foo": "bar"}, "var2": [4], "var3": "fubar"})
+        self.assertDictEqual(context, {"var1": {"foo": "bar"}, "var2": [1, 2, 3]})
+        self.assertIs(ctx["var1"], context["var1"])
+
+    def test_derive_context_nonetype_context(self):
+        self.assertDictEqual(ctx_util.derive_context(None), {})
+        self.assertDictEqual(ctx_util.derive_context(None, {"var1": 1}), {"var1": 1})
+
+    def test_derive_context_bad_type(self):
+        self.assertRaises(TypeError, ctx_util.derive_context, "foobar")
+
+    def test_set_current_task_shares_context_values(self):
+        context = {"var1": {"foo": "bar"}}
+        task = {"id": "t1", "route": 0}
+
+        ctx = ctx_util.set_current_task(context, task)
+
+        self.assertNotIn("__current_task", context)
+        self.assertIs(ctx["var1"], context["var1"])
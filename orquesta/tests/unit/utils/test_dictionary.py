@@ -54,6 +54,26 @@ class DictUtilsTest(unittest.TestCase):
 
         self.assertDictEqual(left, expected)
 
+    def test_dict_merge_copy(self):
+        left = json_util.deepcopy(LEFT)
+        right = json_util.deepcopy(RIGHT)
+
+        merged = dict_util.merge_dicts_copy(left, right)
+
+        expected = {
+            "k1": "123",
+            "k2": "def",
+            "k3": {"k31": True, "k32": 2.0, "k33": {"k331": "foo"}},
+            "k4": "bar",
+        }
+
+        self.assertDictEqual(merged, expected)
+
+        # Check the inputs are not changed and the values not merged are shared.
+        self.assertDictEqual(left, LEFT)
+        self.assertDictEqual(right, RIGHT)
+        self.assertIs(merged["k3"]["k33"], right["k3"]["k33"])
+
     def test_dict_dot_notation_access(self):
         data = {
             "a": "foo",
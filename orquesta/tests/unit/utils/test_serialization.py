@@ -29,6 +29,8 @@ MOCK_JSON = {
     "k6": {"a": 1, "b": 2, "c": 3},
 }
 
+MOCK_JSON_SUBSET = {"k1": "abc", "k6": {"a": 1, "b": 2, "c": 3}}
+
 MOCK_JSON_UNSERIALIZEABLE = {"k1": object()}
 
 
@@ -78,3 +80,14 @@ class SerializationTest(unittest.TestCase):
         obj = json_util.deserialize(FakeModel, MOCK_JSON_UNSERIALIZEABLE)
 
         self.assertIsNone(obj.k1)
+
+    def test_digest(self):
+        value = {"k6": {"c": 3, "b": 2, "a": 1}, "k1": "abc"}
+
+        self.assertEqual(json_util.digest(value), json_util.digest(MOCK_JSON_SUBSET))
+        self.assertNotEqual(json_util.digest(value), json_util.digest(MOCK_JSON))
+
+    def test_digest_unsupported_type(self):
+        value = {"k1": date_util.parse(MOCK_DATETIME_STR), "k2": 1 << 80}
+
+        self.assertEqual(json_util.digest(value), json_util.digest(dict(value)))
@@ -14,12 +14,27 @@
 
 import logging
 
-from orquesta.utils import jsonify as json_util
-
 
 LOG = logging.getLogger(__name__)
 
 
+def derive_context(context, values=None):
+    # The contexts are treated as persistent values that are not modified in place once they
+    # are created. A new context is derived by copying only the top level of the given context
+    # and setting the given values on the copy. The values that are not set are shared with
+    # the given context so deriving a context costs the size of the top level and not the size
+    # of the entire context.
+    if context and not isinstance(context, dict):
+        raise TypeError("The context is not type of dict.")
+
+    ctx = dict(context) if context else dict()
+
+    if values:
+        ctx.update(values)
+
+    return ctx
+
+
 def set_current_task(context, task):
     if context and not isinstance(context, dict):
         raise TypeError("The context is not type of dict.")
@@ -30,21 +45,16 @@ def set_current_task(context, task):
     if not isinstance(task, dict):
         raise TypeError("The task is not type of dict.")
 
-    ctx = json_util.deepcopy(context) if context else dict()
-
-    ctx["__current_task"] = {"id": task.get("id"), "route": task.get("route")}
+    current_task = {"id": task.get("id"), "route": task.get("route")}
 
     if "result" in task:
-        ctx["__current_task"]["result"] = task.get("result")
+        current_task["result"] = task.get("result")
 
-    return ctx
+    return derive_context(context, {"__current_task": current_task})
 
 
 def set_current_item(context, item):
     if context and not isinstance(context, dict):
         raise TypeError("The context is not type of dict.")
 
-    ctx = json_util.deepcopy(context) if context else dict()
-    ctx["__current_item"] = item
-
-    return ctx
+    return derive_context(context, {"__current_item": item})
@@ -36,6 +36,31 @@ def merge_dicts(left, right, overwrite=True):
     return left
 
 
+def merge_dicts_copy(left, right, overwrite=True):
+    # Merge the dicts into a new dict without changing either of them. Only the dicts
+    # along the merged keys are copied and the other values are shared with the inputs.
+    if left is None:
+        return right
+
+    if right is None:
+        return left
+
+    merged = dict(left)
+
+    for k, v in six.iteritems(right):
+        if k not in merged:
+            merged[k] = v
+        else:
+            left_v = merged[k]
+
+            if isinstance(left_v, dict) and isinstance(v, dict):
+                merged[k] = merge_dicts_copy(left_v, v, overwrite=overwrite)
+            elif overwrite:
+                merged[k] = v
+
+    return merged
+
+
 def get_dict_value(obj, path, raise_key_error=False):
     item = obj
     traversed = ""
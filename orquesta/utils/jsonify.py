@@ -14,6 +14,8 @@
 
 import copy
 import datetime
+import hashlib
+import json
 import logging
 import six
 import ujson
@@ -67,3 +69,14 @@ def deepcopy(value):
         value = copy.deepcopy(value)
 
     return value
+
+
+def digest(value):
+    # NOTE: The keys are sorted so equal dicts have the same digest. If the value is not JSON
+    # serializable by ujson, fallback to json which serializes the unknown types as string.
+    try:
+        data = ujson.dumps(value, sort_keys=True)  # pylint: disable=no-member
+    except (OverflowError, ValueError, TypeError):
+        data = json.dumps(value, sort_keys=True, default=repr)
+
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
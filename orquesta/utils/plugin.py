@@ -21,13 +21,22 @@ from orquesta import exceptions as exc
 
 LOG = logging.getLogger(__name__)
 
+# The plugin modules are cached by namespace and name since looking up the entry points
+# is expensive and the modules don't change for the life of the process.
+_MODULES = {}
+
 
 def get_module(namespace, name):
+    if (namespace, name) in _MODULES:
+        return _MODULES[(namespace, name)]
+
     try:
         mgr = driver.DriverManager(namespace=namespace, name=name, invoke_on_load=False)
     except RuntimeError as e:
         raise exc.PluginFactoryError("Unable to load plugin %s.%s. %s" % (namespace, name, str(e)))
 
+    _MODULES[(namespace, name)] = mgr.driver
+
     return mgr.driver
 
 